@@ -0,0 +1,83 @@
+import io
+import wave
+
+try:
+    import soundfile as sf
+except ImportError:  # FLAC/Opus need libsndfile via the soundfile package
+    sf = None
+
+
+def encode_wav(pcm, sample_rate, channels=1):
+    """Encode int16 PCM frames into an in-memory WAV file."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+    return buf.getvalue()
+
+
+# ========== ENCODERS ==========
+
+class WavEncoder:
+    """Uncompressed 16-bit PCM WAV (what the scripts always uploaded)."""
+
+    name = "wav"
+    mime_type = "audio/wav"
+    extension = "wav"
+
+    def encode(self, pcm, sample_rate, channels=1):
+        return encode_wav(pcm, sample_rate, channels)
+
+
+class FlacEncoder:
+    """Lossless FLAC, roughly a third of the WAV size for recorded speech."""
+
+    name = "flac"
+    mime_type = "audio/flac"
+    extension = "flac"
+
+    def encode(self, pcm, sample_rate, channels=1):
+        buf = io.BytesIO()
+        sf.write(buf, pcm, sample_rate, format="FLAC", subtype="PCM_16")
+        return buf.getvalue()
+
+
+class OpusEncoder:
+    """Lossy Opus in an OGG container, an order of magnitude smaller than WAV.
+
+    Opus only runs at 8/12/16/24/48 kHz, which matches TARGET_SAMPLE_RATE.
+    """
+
+    name = "opus"
+    mime_type = "audio/ogg"
+    extension = "ogg"
+
+    def encode(self, pcm, sample_rate, channels=1):
+        buf = io.BytesIO()
+        sf.write(buf, pcm, sample_rate, format="OGG", subtype="OPUS")
+        return buf.getvalue()
+
+
+ENCODERS = {
+    "wav": WavEncoder,
+    "flac": FlacEncoder,
+    "opus": OpusEncoder,
+}
+
+
+def get_encoder(name):
+    """Return an encoder instance for ``name`` ("wav", "flac" or "opus").
+
+    Falls back to WAV with a warning if the soundfile package is missing.
+    """
+    try:
+        encoder_cls = ENCODERS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown upload codec '{name}', expected one of: {', '.join(ENCODERS)}")
+
+    if encoder_cls is not WavEncoder and sf is None:
+        print(f"⚠️ soundfile not installed, cannot encode {name}. Falling back to WAV uploads.")
+        return WavEncoder()
+    return encoder_cls()
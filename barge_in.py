@@ -0,0 +1,232 @@
+import collections
+import contextlib
+import threading
+import time
+
+import numpy as np
+
+from vad import ABS_THRESHOLD_DBFS, FRAME_SECONDS, band_energy_db
+import tracing
+
+# ====== CONFIG ======
+ONSET_SECONDS = 0.1             # Continuous voiced audio needed to cut playback (rejects clicks and coughs)
+MARGIN_DB = 12.0                # Speech must stand this far above the running noise floor
+FLOOR_RISE_DB_PER_SECOND = 3.0  # How fast the floor follows a louder room (it drops instantly)
+PREROLL_SECONDS = 0.3           # Audio before the cut that becomes the start of the answer
+ECHO_MARGIN_DB = 6.0            # ... and this far above the echo expected from the playback reference
+ECHO_WINDOW_SECONDS = 0.3       # Echo path span: the loudest reference frame this recent sets the expected echo
+COUPLING_INITIAL_DB = 0.0       # Echo level vs. playback assumed before any is measured
+COUPLING_HOLD_SECONDS = 4.0     # It follows the loudest echo measured this recently (a canceller's residual
+                                # dips for seconds, then comes back) ...
+COUPLING_DECAY_DB_PER_SECOND = 12.0  # ... coming down to it this fast
+COUPLING_RISE_DB_PER_SECOND = 1.0   # ... and going up (slowly, so a soft-spoken candidate can't pass for echo)
+REFERENCE_ACTIVE_DBFS = -60.0   # Quieter reference frames count as silence (no echo expected)
+# ====================
+
+
+class BargeInDetector:
+    """Streaming energy VAD for the mic while the interviewer is speaking.
+
+    Blocks are cut into ``FRAME_SECONDS`` frames and their speech-band
+    energy (see :func:`vad.band_energy_db`) is compared with the larger of
+    ``ABS_THRESHOLD_DBFS``, a running noise floor plus ``margin_db`` and,
+    when the playback ``reference`` is given, the echo expected from it
+    plus ``ECHO_MARGIN_DB``. ``onset_seconds`` of consecutive voiced
+    frames make an onset. The last ``preroll_seconds`` of input are kept
+    so the answer can start before the moment of detection.
+
+    The floor follows quieter frames at once and louder ones only slowly,
+    and only while nothing plays. The expected echo is the loudest
+    reference frame of the last ``ECHO_WINDOW_SECONDS`` plus a coupling
+    estimate. That estimate starts at ``COUPLING_INITIAL_DB`` and, on
+    unvoiced frames while the playback is loud, moves towards the
+    loudest echo measured in the last ``COUPLING_HOLD_SECONDS``: down at
+    most ``COUPLING_DECAY_DB_PER_SECOND``, up at most
+    ``COUPLING_RISE_DB_PER_SECOND``. The speaker's own voice therefore
+    never passes for the candidate, even before the room has been
+    measured. Fed echo-cancelled audio, the estimate tracks the residual
+    echo, so detection is held back until the canceller has converged,
+    and the hold keeps it there while the residual dips and comes back.
+    Without a reference (headphones) only the floor applies.
+    """
+
+    def __init__(self, sample_rate, channels=1, onset_seconds=ONSET_SECONDS, margin_db=MARGIN_DB,
+                 preroll_seconds=PREROLL_SECONDS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_len = max(1, int(sample_rate * FRAME_SECONDS))
+        self.onset_frames = max(1, round(onset_seconds / FRAME_SECONDS))
+        self.margin_db = margin_db
+        self.rise_per_frame = FLOOR_RISE_DB_PER_SECOND * FRAME_SECONDS
+        self.decay_per_frame = COUPLING_DECAY_DB_PER_SECOND * FRAME_SECONDS
+        self.coupling_rise_per_frame = COUPLING_RISE_DB_PER_SECOND * FRAME_SECONDS
+        self.floor_db = None
+        self.coupling_db = COUPLING_INITIAL_DB
+        self._measured = collections.deque(maxlen=max(1, round(COUPLING_HOLD_SECONDS / FRAME_SECONDS)))
+        self._run = 0
+        self._partial = np.zeros((0, channels), dtype=np.float32)
+        self._ref_partial = np.zeros(0, dtype=np.float32)
+        self._ref_recent = collections.deque(maxlen=max(1, round(ECHO_WINDOW_SECONDS / FRAME_SECONDS)))
+        self._preroll = collections.deque(maxlen=max(1, int(preroll_seconds / FRAME_SECONDS)))
+
+    def reset(self):
+        self._run = 0
+
+    def _reference_energy(self, reference, n_frames):
+        """Speech-band energy of the reference over this block's mic frames (None without a reference)."""
+        if reference is None:
+            return None
+        ref = np.asarray(reference, dtype=np.float32)
+        if ref.ndim == 2:
+            ref = ref.mean(axis=1)
+        ref = np.concatenate((self._ref_partial, ref))
+        needed = n_frames * self.frame_len
+        if len(ref) < needed:
+            ref = np.concatenate((ref, np.zeros(needed - len(ref), dtype=np.float32)))
+        # Carry over as much as the mic side does, so both stay frame-aligned
+        self._ref_partial = ref[needed:needed + len(self._partial)]
+        return band_energy_db(ref[:needed].reshape(n_frames, self.frame_len), self.sample_rate)
+
+    def process(self, block, arrived_at=None, reference=None):
+        """Feed a float32 (frames, channels) block; returns the onset time if one completed, else None.
+
+        ``arrived_at`` (``time.perf_counter()``, default now) is when the
+        block's last sample was captured; the onset time is that of the
+        first voiced frame of the run. ``reference`` is what the speaker
+        played over the same samples, at the same rate.
+        """
+        arrived_at = arrived_at if arrived_at is not None else time.perf_counter()
+        data = np.concatenate((self._partial, np.asarray(block, dtype=np.float32).reshape(len(block), -1)))
+        n_frames = len(data) // self.frame_len
+        self._partial = data[n_frames * self.frame_len:]
+        ref_energy = self._reference_energy(reference, n_frames)
+        if n_frames == 0:
+            return None
+
+        frames = data[:n_frames * self.frame_len]
+        self._preroll.extend(np.split(frames, n_frames))
+        energy = band_energy_db(frames.mean(axis=1).reshape(n_frames, self.frame_len), self.sample_rate)
+
+        onset = None
+        for i, e in enumerate(energy):
+            echo_db = None
+            if ref_energy is not None:
+                self._ref_recent.append(ref_energy[i])
+                loudest = max(self._ref_recent)
+                if loudest > REFERENCE_ACTIVE_DBFS:
+                    echo_db = loudest + self.coupling_db
+
+            if self.floor_db is None or e < self.floor_db:
+                self.floor_db = e
+            elif echo_db is None:
+                self.floor_db += self.rise_per_frame  # Only the room, never the echo, raises the floor
+            threshold = max(ABS_THRESHOLD_DBFS, self.floor_db + self.margin_db)
+            if echo_db is not None:
+                threshold = max(threshold, echo_db + ECHO_MARGIN_DB)
+
+            if e > threshold:
+                self._run += 1
+            else:
+                self._run = 0
+                if echo_db is not None and ref_energy[i] > loudest - ECHO_MARGIN_DB:
+                    # Not the candidate while the playback is loud: what reaches the mic is its echo
+                    self._measured.append(e - loudest)
+                    self.coupling_db += float(np.clip(max(self._measured) - self.coupling_db,
+                                                      -self.decay_per_frame, self.coupling_rise_per_frame))
+            if self._run == self.onset_frames and onset is None:
+                # Start of the first voiced frame of the run, counted back from the end of the block
+                first = (i + 1 - self.onset_frames) * self.frame_len
+                onset = arrived_at - (len(data) - first) / self.sample_rate
+        return onset
+
+    def preroll(self):
+        """The last ``preroll_seconds`` of input, including the unframed tail of the latest block."""
+        return np.concatenate(list(self._preroll) + [self._partial])
+
+
+class BargeInMonitor:
+    """Cuts interviewer speech as soon as the candidate talks over it.
+
+    The mic callback hands every block to :meth:`feed`. While a
+    :class:`~tts_pipeline.SpeechPipeline` is being watched (:meth:`watch`),
+    an onset first hands the pre-roll audio to the caller, which starts
+    capturing the answer, and then stops the pipeline, all from the
+    callback thread. Reaction time (speech onset to playback cut, plus
+    the device's output latency) is bounded by ``ONSET_SECONDS``, one
+    input block, one output block and that latency; each barge-in is
+    kept in :attr:`events`. With ``enabled=False`` it does nothing.
+    """
+
+    def __init__(self, sample_rate, channels=1, enabled=True, on_barge_in=None, **detector_kwargs):
+        self.enabled = enabled
+        self.on_barge_in = on_barge_in
+        self.detector = BargeInDetector(sample_rate, channels, **detector_kwargs)
+        self.events = []
+        self.fired = False  # Whether the last watched speech was cut
+        self._target = None
+        self._armed_at = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def watch(self, pipeline):
+        """Arm for the duration of the block: an onset stops ``pipeline``."""
+        with self._lock:
+            self.fired = False
+            self._armed_at = time.perf_counter()
+            self._target = pipeline if self.enabled else None
+            self.detector.reset()
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._target = None
+
+    def feed(self, block, start_answer, reference=None):
+        """Analyze one mic block; returns True if it cut the watched speech.
+
+        ``start_answer(preroll)`` runs before the cut, so capture is
+        already on when the speaking thread sees the pipeline stop.
+        ``reference`` is the playback over the same samples, if known
+        (see :class:`BargeInDetector`).
+        """
+        if not self.enabled:
+            return False
+        onset = self.detector.process(block, reference=reference)
+        if onset is None:
+            return False
+        with self._lock:
+            target, self._target = self._target, None
+            if target is None:
+                return False
+            self.fired = True
+        detected_at = time.perf_counter()
+        start_answer(self.detector.preroll())
+        target.stop()
+        cut_at = time.perf_counter()
+        player = getattr(target, "player", None)
+        latency = getattr(player, "output_latency", 0.0)
+        event = {
+            "onset_at": onset,
+            "after_seconds": onset - self._armed_at,
+            "detect": detected_at - onset,
+            "reaction": cut_at - onset + latency,
+        }
+        self.events.append(event)
+        tracing.record_interval("barge_in", int(onset * 1e9), int(cut_at * 1e9))
+        if self.on_barge_in:
+            self.on_barge_in(event)
+        return True
+
+    def summary(self):
+        reactions = sorted(e["reaction"] for e in self.events)
+        return {
+            "count": len(reactions),
+            "p50_reaction": reactions[len(reactions) // 2] if reactions else None,
+            "max_reaction": reactions[-1] if reactions else None,
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        if s["count"]:
+            print(f"✋ Barge-in: {s['count']} interruption(s), playback cut "
+                  f"{s['p50_reaction']*1000:.0f}ms p50 / {s['max_reaction']*1000:.0f}ms max after speech onset")
@@ -0,0 +1,144 @@
+import argparse
+import glob
+import json
+import time
+
+import numpy as np
+
+from bench_codec import load_wav
+from echo_canceller import BLOCK_SIZE, FILTER_SECONDS, STEP_SIZE, EchoCanceller
+
+# ====== CONFIG ======
+DEFAULT_FILES = "audio_2025*.wav"
+RATE = 16000               # TARGET_SAMPLE_RATE of clone_update5, where the canceller runs
+CALLBACK_FRAMES = 371      # 1024 device frames at 44.1 kHz after resampling to 16 kHz
+PLAYBACK_DBFS = -20.0      # Fixtures are normalized to this RMS before use as the playback
+NEAR_DBFS = -26.0          # ... and to this as the candidate talking over it
+ECHO_DELAY = 0.04          # Speaker -> mic delay of the simulated echo path (s), device latencies included
+ECHO_GAIN_DB = -12.0       # Echo level at the mic relative to the playback
+RT60 = 0.15                # Reverberation of the simulated room (s)
+NOISE_DBFS = -65.0         # Mic self-noise
+SETTLE_SECONDS = 1.0       # Convergence time excluded from ERLE
+PLAYBACK_HIGHPASS = 150.0  # Hz; the fixtures carry mains hum that synthesized playback never has
+# ====================
+
+
+def load(path):
+    pcm, channels = load_wav(path, RATE)
+    return pcm.astype(np.float64).mean(axis=1) / 32768
+
+
+def highpass(x, cutoff=PLAYBACK_HIGHPASS):
+    """Zero everything below ``cutoff`` (offline, whole clip)."""
+    spectrum = np.fft.rfft(x)
+    spectrum[np.fft.rfftfreq(len(x), 1 / RATE) < cutoff] = 0
+    return np.fft.irfft(spectrum, len(x))
+
+
+def normalize(x, dbfs):
+    return x * (10 ** (dbfs / 20) / (np.sqrt(np.mean(x * x)) + 1e-12))
+
+
+def room_response(rng, delay=ECHO_DELAY, gain_db=ECHO_GAIN_DB, rt60=RT60):
+    """Synthetic speaker-to-mic impulse response: pure delay, then exponentially decaying noise."""
+    d, length = int(delay * RATE), int(rt60 * RATE)
+    h = np.zeros(d + length)
+    h[d:] = rng.normal(0, 1, length) * 10 ** (-3 * np.arange(length) / length)  # -60 dB at rt60
+    return h * (10 ** (gain_db / 20) / np.sqrt(np.sum(h * h)))
+
+
+def run(mic, ref, filter_seconds, step):
+    """Stream mic/ref through a canceller in callback-sized blocks; returns (output, CPU seconds)."""
+    aec = EchoCanceller(RATE, filter_seconds=filter_seconds, step_size=step)
+    out = []
+    start = time.process_time()
+    for i in range(0, len(mic), CALLBACK_FRAMES):
+        out.append(aec.process(mic[i:i + CALLBACK_FRAMES, None], ref[i:i + CALLBACK_FRAMES, None]))
+    cpu = time.process_time() - start
+    # Undo the canceller's one-block latency so output lines up with the input
+    out = np.concatenate(out)[:, 0].astype(np.float64)[aec.block_size:]
+    return out, cpu
+
+
+def db(num, den):
+    return 10 * np.log10(np.sum(num * num) / (np.sum(den * den) + 1e-20) + 1e-20)
+
+
+def scenario(ref, near, rng, args):
+    """Echo-only ERLE over the first half, near-end preservation with double talk in the second."""
+    n = len(ref)
+    echo = np.convolve(ref, room_response(rng, args.delay, args.echo_gain))[:n]
+    talk = np.zeros(n)
+    half = n // 2
+    if near is not None:
+        talk[half:] = np.resize(near, n - half)  # Repeated if shorter than the playback
+    noise = rng.normal(0, 10 ** (NOISE_DBFS / 20), n)
+    mic = echo + talk + noise
+
+    out, cpu = run(mic, ref, args.filter_seconds, args.step)
+    m = len(out)
+    settle = int(SETTLE_SECONDS * RATE)
+    result = {
+        "seconds": n / RATE,
+        "cpu_ms_per_second": cpu * 1000 / (n / RATE),
+        "erle_db": db(mic[settle:half], out[settle:half]),
+    }
+    if near is not None:
+        # Double talk: how much of the candidate survives vs. what is left of the echo
+        result["near_snr_in_db"] = db(talk[half:m], echo[half:m])
+        result["near_snr_out_db"] = db(talk[half:m], out[half:m] - talk[half:m])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Echo canceller CPU cost and echo return loss enhancement")
+    parser.add_argument("files", nargs="*", help=f"Fixture WAVs used as playback and candidate (default: {DEFAULT_FILES})")
+    parser.add_argument("--mic", help="Real capture made during playback (WAV); with --ref, skips the simulation")
+    parser.add_argument("--ref", help="The playback signal of that capture (WAV)")
+    parser.add_argument("--filter-seconds", type=float, default=FILTER_SECONDS)
+    parser.add_argument("--step", type=float, default=STEP_SIZE)
+    parser.add_argument("--delay", type=float, default=ECHO_DELAY, help="Simulated echo delay (s)")
+    parser.add_argument("--echo-gain", type=float, default=ECHO_GAIN_DB, help="Simulated echo gain (dB)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    print(f"🔁 FDAF: {args.filter_seconds * 1000:.0f} ms filter, {BLOCK_SIZE}-sample blocks, step {args.step}")
+    results = {}
+    if args.mic and args.ref:
+        mic, ref = load(args.mic), load(args.ref)
+        n = min(len(mic), len(ref))
+        out, cpu = run(mic[:n], ref[:n], args.filter_seconds, args.step)
+        settle = int(SETTLE_SECONDS * RATE)
+        results[args.mic] = {"seconds": n / RATE, "cpu_ms_per_second": cpu * 1000 / (n / RATE),
+                             "erle_db": db(mic[settle:len(out)], out[settle:])}
+    else:
+        files = args.files or sorted(glob.glob(DEFAULT_FILES))
+        if not files:
+            print("No WAV files found.")
+            return
+        rng = np.random.default_rng(args.seed)
+        clips = [load(f) for f in files]
+        for i, path in enumerate(files):
+            # Each fixture plays as the interviewer; the next one, as recorded, is the candidate talking over it
+            near = clips[(i + 1) % len(clips)] if len(clips) > 1 else None
+            results[path] = scenario(normalize(highpass(clips[i]), PLAYBACK_DBFS),
+                                     None if near is None else normalize(near, NEAR_DBFS), rng, args)
+
+    header = f"{'file':<28}{'audio':>8}{'CPU/s':>10}{'ERLE':>9}{'DT in':>9}{'DT out':>9}"
+    print(header)
+    print("-" * len(header))
+    for path, r in results.items():
+        line = f"{path[-28:]:<28}{r['seconds']:>7.1f}s{r['cpu_ms_per_second']:>8.1f}ms{r['erle_db']:>7.1f}dB"
+        if "near_snr_in_db" in r:
+            line += f"{r['near_snr_in_db']:>7.1f}dB{r['near_snr_out_db']:>7.1f}dB"
+        print(line)
+    print("(CPU/s: processing time per second of audio; DT: candidate-to-echo ratio during double talk)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"filter_seconds": args.filter_seconds, "step": args.step, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+from capture_buffer import CaptureBuffer
+
+# ====== CONFIG ======
+SAMPLE_RATE = 44100
+CHANNELS = 1
+CHUNK_SIZE = 1024
+# ====================
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_blocks(seconds):
+    """Synthetic float32 mic blocks, generated once and reused every block."""
+    rng = np.random.default_rng(0)
+    block = (rng.standard_normal((CHUNK_SIZE, CHANNELS)) * 0.1).astype(np.float32)
+    count = int(seconds * SAMPLE_RATE / CHUNK_SIZE)
+    return block, count
+
+
+def write_wav(filename, frames_bytes):
+    with wave.open(filename, "wb") as wf:
+        wf.setnchannels(CHANNELS)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(frames_bytes)
+
+
+def run_list(seconds, filename):
+    """Current path: locked list of float32 copies, concatenate + convert at mute."""
+    recording = []
+    lock = threading.Lock()
+    block, count = make_blocks(seconds)
+
+    callback_start = time.perf_counter()
+    for _ in range(count):
+        with lock:
+            recording.append(block.copy())
+    callback_time = time.perf_counter() - callback_start
+
+    mute = time.perf_counter()
+    with lock:
+        audio_data = np.concatenate(recording, axis=0)
+        write_wav(filename, (audio_data * 32767).astype(np.int16).tobytes())
+        recording = []
+    with open(filename, "rb") as f:
+        audio_bytes = f.read()
+    return callback_time / count, time.perf_counter() - mute, len(audio_bytes)
+
+
+def run_ring(seconds, filename):
+    """New path: lock-free int16 ring, zero-copy view handed to the WAV writer."""
+    capture = CaptureBuffer(SAMPLE_RATE, CHANNELS)
+    block, count = make_blocks(seconds)
+
+    callback_start = time.perf_counter()
+    for _ in range(count):
+        capture.write(block)
+    callback_time = time.perf_counter() - callback_start
+
+    mute = time.perf_counter()
+    audio_data = capture.snapshot()
+    write_wav(filename, audio_data)
+    capture.release(len(audio_data))
+    with open(filename, "rb") as f:
+        audio_bytes = f.read()
+    return callback_time / count, time.perf_counter() - mute, len(audio_bytes)
+
+
+def run_child(mode, seconds):
+    """Run one capture path in this process and print its metrics as JSON."""
+    baseline = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "bench.wav")
+        runner = run_ring if mode == "ring" else run_list
+        per_block, mute_to_upload, size = runner(seconds, filename)
+    print(json.dumps({
+        "mode": mode,
+        "seconds": seconds,
+        "callback_us_per_block": per_block * 1e6,
+        "mute_to_upload_ms": mute_to_upload * 1000,
+        "upload_kb": size / 1024,
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_delta_mb": peak_rss_mb() - baseline,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mic capture buffering: list-of-chunks vs ring buffer")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[4, 30, 180],
+                        help="Answer lengths to simulate (default: 4 30 180)")
+    parser.add_argument("--child", choices=["list", "ring"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.seconds[0])
+        return
+
+    # Each path runs in a fresh interpreter so peak RSS is not shared between them
+    print(f"{'mode':<6}{'answer':>9}{'callback':>12}{'mute→upload':>14}{'peak RSS':>11}{'Δ RSS':>10}")
+    for seconds in args.seconds:
+        for mode in ("list", "ring"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--seconds", str(seconds)],
+                capture_output=True, text=True, check=True,
+            )
+            r = json.loads(out.stdout)
+            print(f"{mode:<6}{seconds:>8.0f}s{r['callback_us_per_block']:>10.1f}us"
+                  f"{r['mute_to_upload_ms']:>12.1f}ms{r['peak_rss_mb']:>9.1f}MB{r['peak_rss_delta_mb']:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import glob
+import time
+import wave
+
+import numpy as np
+
+from audio_codec import ENCODERS, get_encoder
+from resample import StreamingResampler
+
+# ====== CONFIG ======
+DEFAULT_FILES = "audio_2025*.wav"
+DEFAULT_RATE = 16000       # Match TARGET_SAMPLE_RATE used by the clone_* scripts
+DEFAULT_UPLINK_KBPS = 1000  # Modelled candidate uplink for the payload transfer
+REPEATS = 5
+# ====================
+
+
+def load_wav(path, rate):
+    """Read a 16-bit WAV and resample it the same way the capture path does."""
+    with wave.open(path, "rb") as wf:
+        src_rate = wf.getframerate()
+        channels = wf.getnchannels()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).reshape(-1, channels)
+
+    if src_rate == rate:
+        return pcm, channels
+
+    resampler = StreamingResampler(src_rate, rate, channels)
+    audio = resampler.process(pcm.astype(np.float32) / 32767)
+    return (audio * 32767).astype(np.int16), channels
+
+
+def live_round_trip(client, data, mime_type):
+    """Time one real generate_content call carrying the encoded payload."""
+    from google.genai import types
+
+    start = time.perf_counter()
+    client.models.generate_content(
+        model="gemini-2.5-flash",
+        contents=[
+            "Transcribe this user audio clearly.",
+            types.Part.from_bytes(data=data, mime_type=mime_type),
+        ],
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare upload codecs on the recorded turn WAVs")
+    parser.add_argument("files", nargs="*", help=f"WAV files to replay (default: {DEFAULT_FILES})")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE, help="Sample rate to encode at")
+    parser.add_argument("--uplink-kbps", type=float, default=DEFAULT_UPLINK_KBPS,
+                        help="Uplink bandwidth used to model payload transfer time")
+    parser.add_argument("--codecs", nargs="+", default=list(ENCODERS), choices=list(ENCODERS))
+    parser.add_argument("--live", action="store_true",
+                        help="Also send each payload to Gemini and time the real round trip")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(DEFAULT_FILES))
+    if not files:
+        print("No WAV files found.")
+        return
+
+    client = None
+    if args.live:
+        from dotenv import load_dotenv
+        from google import genai
+        load_dotenv()
+        client = genai.Client()
+
+    encoders = [get_encoder(name) for name in args.codecs]
+    header = f"{'file':<28}{'codec':<7}{'audio':>8}{'encode':>10}{'size':>11}{'ratio':>8}{'upload':>10}{'e2e':>10}"
+    if args.live:
+        header += f"{'live':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for path in files:
+        pcm, channels = load_wav(path, args.rate)
+        duration = len(pcm) / args.rate
+        wav_size = None
+
+        for encoder in encoders:
+            timings = []
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                data = encoder.encode(pcm, args.rate, channels)
+                timings.append(time.perf_counter() - start)
+            encode_time = min(timings)
+
+            if wav_size is None:
+                wav_size = len(get_encoder("wav").encode(pcm, args.rate, channels))
+            upload_time = len(data) * 8 / (args.uplink_kbps * 1000)
+
+            line = (f"{path:<28}{encoder.name:<7}{duration:>7.1f}s{encode_time*1000:>8.1f}ms"
+                    f"{len(data)/1024:>9.1f}KB{wav_size/len(data):>7.1f}x"
+                    f"{upload_time*1000:>8.0f}ms{(encode_time + upload_time)*1000:>8.0f}ms")
+            if client is not None:
+                line += f"{live_round_trip(client, data, encoder.mime_type)*1000:>8.0f}ms"
+            print(line)
+        print()
+
+
+if __name__ == "__main__":
+    main()
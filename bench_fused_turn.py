@@ -0,0 +1,112 @@
+import argparse
+import glob
+import threading
+import time
+
+from dotenv import load_dotenv
+from google import genai
+from google.genai import types
+
+from audio_codec import get_encoder
+from bench_codec import load_wav
+from fused_turn import fused_turn, usage_summary
+from prompt import prompt_template, interviewer_prompt
+from turn_audio import TurnAudio
+
+# ====== CONFIG ======
+DEFAULT_FILES = "audio_2025*.wav"
+MODEL = "gemini-2.5-flash"
+RATE = 16000
+# ====================
+
+
+def two_call_turn(client, turn):
+    """Current mode: transcription in a background thread, reply on the caller's thread."""
+    transcription = {}
+
+    def transcribe():
+        response = client.models.generate_content(
+            model=MODEL,
+            contents=[prompt_template, types.Part.from_bytes(data=turn.data, mime_type=turn.mime_type)],
+        )
+        transcription["usage"] = usage_summary(response)
+        transcription["done"] = time.perf_counter()
+
+    start = time.perf_counter()
+    worker = threading.Thread(target=transcribe)
+    worker.start()
+
+    response = client.models.generate_content(
+        model=MODEL,
+        contents=[interviewer_prompt, types.Part.from_bytes(data=turn.data, mime_type=turn.mime_type)],
+    )
+    question_ready = time.perf_counter()
+    worker.join()
+
+    reply_usage = usage_summary(response)
+    return {
+        "question_latency": question_ready - start,
+        "turn_latency": max(question_ready, transcription["done"]) - start,
+        "calls": 2,
+        "prompt_tokens": reply_usage["prompt_tokens"] + transcription["usage"]["prompt_tokens"],
+        "total_tokens": reply_usage["total_tokens"] + transcription["usage"]["total_tokens"],
+    }
+
+
+def fused_call_turn(client, turn):
+    """Fused mode: one structured call for transcript and next question."""
+    start = time.perf_counter()
+    result = fused_turn(client, turn, model=MODEL)
+    elapsed = time.perf_counter() - start
+    return {
+        "question_latency": elapsed,
+        "turn_latency": elapsed,
+        "calls": 1,
+        "prompt_tokens": result["usage"]["prompt_tokens"],
+        "total_tokens": result["usage"]["total_tokens"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two-call and fused turn modes against Gemini")
+    parser.add_argument("files", nargs="*", help=f"WAV files to replay (default: {DEFAULT_FILES})")
+    parser.add_argument("--codec", default="flac", help="Upload codec (wav, flac, opus)")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per file and mode")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = genai.Client()
+    encoder = get_encoder(args.codec)
+    files = args.files or sorted(glob.glob(DEFAULT_FILES))
+
+    modes = {"two-call": two_call_turn, "fused": fused_call_turn}
+    totals = {name: [] for name in modes}
+
+    print(f"{'file':<28}{'mode':<10}{'question':>10}{'turn':>10}{'calls':>7}{'prompt tok':>12}{'total tok':>11}")
+    for path in files:
+        pcm, channels = load_wav(path, RATE)
+        turn = TurnAudio(pcm, RATE, channels, encoder=encoder)
+        for _ in range(args.repeats):
+            # Alternate modes so both see the same network conditions
+            for name, run in modes.items():
+                try:
+                    r = run(client, turn)
+                except Exception as e:
+                    print(f"{path:<28}{name:<10} failed: {e}")
+                    continue
+                totals[name].append(r)
+                print(f"{path:<28}{name:<10}{r['question_latency']:>9.2f}s{r['turn_latency']:>9.2f}s"
+                      f"{r['calls']:>7}{r['prompt_tokens']:>12}{r['total_tokens']:>11}")
+
+    print("\nMean per turn:")
+    for name, runs in totals.items():
+        if not runs:
+            continue
+        n = len(runs)
+        print(f"  {name:<10} question {sum(r['question_latency'] for r in runs)/n:.2f}s"
+              f"  turn {sum(r['turn_latency'] for r in runs)/n:.2f}s"
+              f"  tokens {sum(r['total_tokens'] for r in runs)/n:.0f}")
+
+
+if __name__ == "__main__":
+    main()
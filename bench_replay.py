@@ -0,0 +1,347 @@
+import argparse
+import ast
+import asyncio
+import builtins
+import functools
+import glob
+import importlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import virtual_audio
+from perf_log import iter_records
+
+# ====== CONFIG ======
+DEFAULT_FILES = "audio_2025*.wav"
+DEFAULT_SCRIPT = "clone_update5"
+TAIL_SECONDS = 0.5          # Silence after each answer before "m" is pressed
+BASELINE_FILE = "performance_data.json"  # Manual clone_with_report.py runs (.jsonl logs work too)
+# Per-turn fields, named like performance_data.json where the stage exists there;
+# turn_time runs until the loop asks for the next key, so it includes playback
+# barge_in_reaction runs from speech onset to the playback cut; only meaningful at --speed 1
+STAGES = ("audio_save_time", "upload_time", "response_first_chunk_time", "tts_time",
+          "playback_start_time", "turn_time", "transcription_duration", "barge_in_reaction")
+# ====================
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TurnRecorder:
+    """Collects per-stage timestamps of the turn currently being processed.
+
+    Every mark is stored once per turn, in seconds since the simulated
+    "m" key press, so the first chunk, first TTS render and first
+    playback of a turn are what gets recorded.
+    """
+
+    def __init__(self):
+        self.turns = []
+        self.current = None
+        self._by_turn = {}
+        self._lock = threading.Lock()
+
+    def begin(self, path, duration):
+        with self._lock:
+            self.current = {"audio_file": os.path.basename(path), "audio_duration": duration,
+                            "muted_at": time.perf_counter()}
+            self.turns.append(self.current)
+
+    def mark(self, stage, at=None):
+        with self._lock:
+            turn = self.current
+            if turn is not None and stage not in turn:
+                turn[stage] = (at or time.perf_counter()) - turn["muted_at"]
+
+    def set(self, **values):
+        with self._lock:
+            if self.current is not None:
+                self.current.update(values)
+
+    def bind(self, turn_audio):
+        """Remember which recorded turn a TurnAudio belongs to."""
+        with self._lock:
+            self._by_turn[id(turn_audio)] = self.current
+
+    def set_for(self, turn_audio, **values):
+        with self._lock:
+            record = self._by_turn.get(id(turn_audio))
+            if record is not None:
+                record.update(values)
+
+    def end(self):
+        self.mark("turn_time")
+        with self._lock:
+            self.current = None
+
+
+class ScriptedKeyboard:
+    """Replaces ``input()``: plays each WAV into the virtual mic, then presses "m"; finally "q".
+
+    With ``barge_in`` (seconds) each answer instead starts that long after
+    the interviewer begins speaking, talking over the question.
+    """
+
+    def __init__(self, app, source, clips, recorder, speed, barge_in=None):
+        self.app = app
+        self.source = source
+        self.clips = list(clips)
+        self.recorder = recorder
+        self.speed = speed
+        self.barge_in = barge_in
+        self.waiting_for_turn = False
+        self.pending = None  # (path, clip, done) of an answer started over the interviewer
+        self._timer = None
+
+    def playback_started(self):
+        """Called when the interviewer starts speaking; schedules the next answer in barge-in mode."""
+        if self.barge_in is None or self.pending or self._timer or not self.clips:
+            return
+        self._timer = threading.Timer(self.barge_in / self.speed, self._start_next)
+        self._timer.start()
+
+    def _start_next(self):
+        path, clip = self.clips.pop(0)
+        print(f"\n▶️ [replay] {os.path.basename(path)} ({len(clip) / self.app.SAMPLE_RATE:.1f}s), "
+              f"over the interviewer")
+        self.pending = (path, clip, self.source.play(clip))
+
+    def __call__(self, prompt=""):
+        if self.waiting_for_turn:
+            self.recorder.end()
+            self.waiting_for_turn = False
+
+        if getattr(self.app, "is_muted", False):
+            # Last turn failed and left the mic muted: unmute before the next answer
+            return "m"
+        if self._timer:
+            self._timer.join()
+            self._timer = None
+        if self.pending:
+            path, clip, done = self.pending
+            self.pending = None
+            done.wait()
+        elif not self.clips:
+            return "q"
+        else:
+            path, clip = self.clips.pop(0)
+            print(f"\n▶️ [replay] {os.path.basename(path)} ({len(clip) / self.app.SAMPLE_RATE:.1f}s)")
+            self.source.play(clip).wait()
+        duration = len(clip) / self.app.SAMPLE_RATE
+        time.sleep(TAIL_SECONDS / self.speed)
+        self.recorder.begin(path, duration)
+        self.waiting_for_turn = True
+        return "m"
+
+
+def instrument(app, recorder):
+    """Wrap the pipeline's stage functions so they report into ``recorder``."""
+    save_audio = app.save_audio
+
+    @functools.wraps(save_audio)
+    def timed_save_audio(*args, **kwargs):
+        turn = save_audio(*args, **kwargs)
+        recorder.mark("audio_save_time")
+        if turn is not None:
+            recorder.bind(turn)
+            recorder.set(audio_size_kb=turn.size_kb, encode_time=turn.encode_time)
+        else:
+            recorder.set(dropped=True)  # Empty, or rejected by the VAD: never reaches the model
+        return turn
+    app.save_audio = timed_save_audio
+
+    transcribe = app.transcribe_audio_background
+
+    @functools.wraps(transcribe)
+    def timed_transcribe(turn, *args):
+        start = time.perf_counter()
+        try:
+            return transcribe(turn, *args)
+        finally:
+            recorder.set_for(turn, transcription_duration=time.perf_counter() - start)
+    app.transcribe_audio_background = timed_transcribe
+
+    if hasattr(app, "synthesize_speech"):
+        synthesize = app.synthesize_speech
+
+        @functools.wraps(synthesize)
+        def timed_synthesize(text):
+            start = time.perf_counter()
+            result = synthesize(text)
+            with recorder._lock:
+                turn = recorder.current
+                if turn is not None and "tts_time" not in turn:
+                    turn["tts_time"] = time.perf_counter() - start
+            return result
+        app.synthesize_speech = timed_synthesize
+
+    pool = app.gemini
+    iterate_sync = pool.iterate_sync
+
+    def timed_iterate(agen):
+        for i, item in enumerate(iterate_sync(agen)):
+            if i == 0:
+                recorder.mark("response_first_chunk_time")
+            yield item
+    pool.iterate_sync = timed_iterate
+
+    run_sync = pool.run_sync
+
+    def timed_run_sync(coro, timeout=None):
+        name = getattr(coro, "__qualname__", "")
+        result = run_sync(coro, timeout)
+        if name.endswith(("reply", "fused")):
+            # Non-streaming reply: the whole answer is the first chunk
+            recorder.mark("response_first_chunk_time")
+        return result
+    pool.run_sync = timed_run_sync
+
+
+def start_mock(args, recorder):
+    """Run MockGemini on a background loop and point this process at it."""
+    from mock_gemini import MockGemini, LatencyModel, use_mock
+    import random
+
+    mock = MockGemini(latency=LatencyModel(args.latency, args.jitter, args.distribution,
+                                           random.Random(args.seed)),
+                      seed=args.seed)
+    route = mock._route
+
+    async def recording_route(conn, writer, method, target, body):
+        if method == "POST" and ":" in target and "generatecontent" in target.lower():
+            recorder.mark("request_received")
+        return await route(conn, writer, method, target, body)
+    mock._route = recording_route
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="mock-gemini", daemon=True).start()
+    asyncio.run_coroutine_threadsafe(mock.start(port=0), loop).result()
+    use_mock(mock.url)
+    return mock
+
+
+def summarize(turns):
+    summary = {}
+    for stage in STAGES:
+        values = [t[stage] for t in turns if t.get(stage) is not None]
+        if values:
+            summary[stage] = {
+                "n": len(values),
+                "mean": float(np.mean(values)),
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+            }
+    return summary
+
+
+def load_baseline(path):
+    """Summary of the manual runs in performance_data.json, for the stages it records."""
+    if path.endswith(".jsonl"):
+        return summarize([r for r in iter_records(path) if r.get("response_success")])
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        runs = json.load(f)
+    return summarize([r for r in runs if r.get("response_success")])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded answers through a turn loop, headless")
+    parser.add_argument("files", nargs="*", help=f"WAV answers to replay in order (default: {DEFAULT_FILES})")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="Pipeline module with the m/q turn loop")
+    parser.add_argument("--speed", type=float, default=1.0, help="Virtual mic/speaker speed-up (model calls are not sped up)")
+    parser.add_argument("--live", action="store_true", help="Use the real Gemini API and gTTS instead of local stand-ins")
+    parser.add_argument("--barge-in", type=float, metavar="SECONDS",
+                        help="Start each answer this far into the interviewer's speech instead of after it")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Override a runtime flag of the script, e.g. FUSED_TURN=True")
+    parser.add_argument("--latency", type=float, default=0.6, help="Mock time to first byte (s)")
+    parser.add_argument("--jitter", type=float, default=0.25)
+    parser.add_argument("--distribution", default="lognormal")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="replay_timings.json")
+    args = parser.parse_args()
+
+    files = [os.path.abspath(f) for f in (args.files or sorted(glob.glob(os.path.join(REPO_DIR, DEFAULT_FILES))))]
+    output = os.path.abspath(args.output)
+    recorder = TurnRecorder()
+    source = virtual_audio.ClipSource()
+
+    keyboard = None
+
+    def on_play():
+        recorder.mark("playback_start_time")
+        if keyboard:
+            keyboard.playback_started()
+
+    virtual_audio.install(source, args.speed, on_play=on_play, virtual_tts=not args.live)
+    mock = None if args.live else start_mock(args, recorder)
+
+    # Transcripts, reports and archives land in a scratch directory
+    sys.path.insert(0, REPO_DIR)
+    workdir = tempfile.mkdtemp(prefix="replay_")
+    os.chdir(workdir)
+    app = importlib.import_module(args.script)
+
+    app.archive = None
+    for override in args.set:
+        name, value = override.split("=", 1)
+        setattr(app, name, ast.literal_eval(value))
+
+    clips = [(path, virtual_audio.load_clip(path, app.SAMPLE_RATE, app.CHANNELS)) for path in files]
+    instrument(app, recorder)
+    if hasattr(app, "barge_in"):
+        app.barge_in.on_barge_in = lambda event: recorder.set(barge_in_reaction=event["reaction"])
+    keyboard = ScriptedKeyboard(app, source, clips, recorder, args.speed, args.barge_in)
+    builtins.input = keyboard
+
+    started = time.perf_counter()
+    app.main()
+    wall = time.perf_counter() - started
+
+    turns = []
+    for t in recorder.turns:
+        t = dict(t)
+        t.pop("muted_at")
+        if "request_received" in t and "audio_save_time" in t:
+            t["upload_time"] = t.pop("request_received") - t["audio_save_time"]
+        turns.append(t)
+
+    report = {
+        "script": args.script,
+        "mode": "live" if args.live else "mock",
+        "speed": args.speed,
+        "overrides": args.set,
+        "mock": None if args.live else {"latency": args.latency, "jitter": args.jitter,
+                                        "distribution": args.distribution, "seed": args.seed,
+                                        "requests": mock.requests},
+        "wall_seconds": wall,
+        "turns": turns,
+        "summary": summarize(turns),
+        "baseline": load_baseline(os.path.join(REPO_DIR, BASELINE_FILE)),
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n📊 Replay timings ({len(turns)} turns, seconds after 'm'):")
+    for stage, s in report["summary"].items():
+        line = f"  {stage:<27} mean {s['mean']:.3f}  p50 {s['p50']:.3f}  p95 {s['p95']:.3f}"
+        base = report["baseline"].get(stage)
+        if base:
+            line += f"   (recorded runs: mean {base['mean']:.3f})"
+        print(line)
+    print(f"💾 Saved to {output}")
+
+    dropped = [t["audio_file"] for t in turns if t.get("dropped")]
+    if dropped:
+        print(f"❌ {len(dropped)} recorded answer(s) dropped before upload (VAD found no speech): {', '.join(dropped)}")
+    os._exit(1 if dropped else 0)  # Daemon workers and the mock loop don't need a clean shutdown
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from google import genai
+from google.genai import types
+
+from gemini_pool import GeminiPool
+from resilience import Resilience
+
+# ====== CONFIG ======
+MODEL = "gemini-2.5-flash"
+BASE_LATENCY = 0.15   # Seconds every stub answer takes
+# ====================
+
+
+class FaultProfile:
+    """What the stub does to each request."""
+
+    def __init__(self, error_rate=0.2, slow_rate=0.03, slow_seconds=2.0, outage=False):
+        self.error_rate = error_rate      # Share of requests answered 429/503
+        self.slow_rate = slow_rate        # Share of requests stalled for slow_seconds
+        self.slow_seconds = slow_seconds
+        self.outage = outage              # Every request fails with 503
+        self.fail_next = 0                # The next this many requests fail with fail_code ...
+        self.fail_code = 503
+        self.slow_next = 0                # ... or are stalled for slow_seconds
+        self.requests = 0                 # Requests received
+
+
+class FaultyGeminiHandler(BaseHTTPRequestHandler):
+    """Answers ``:generateContent`` like the Gemini API, with injected faults."""
+
+    profile = FaultProfile()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up on it (hedge loser)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        profile = self.profile
+        profile.requests += 1
+        roll = random.random()
+
+        if profile.fail_next:
+            profile.fail_next -= 1
+            time.sleep(BASE_LATENCY / 3)
+            self._send(profile.fail_code, {"error": {"code": profile.fail_code, "message": "injected fault",
+                                                     "status": "INJECTED"}})
+            return
+        if profile.outage or roll < profile.error_rate:
+            code, status = random.choice([(429, "RESOURCE_EXHAUSTED"), (503, "UNAVAILABLE")])
+            time.sleep(BASE_LATENCY / 3)
+            self._send(code, {"error": {"code": code, "message": "injected fault", "status": status}})
+            return
+
+        delay = BASE_LATENCY * random.uniform(0.8, 1.2)
+        if profile.slow_next:
+            profile.slow_next -= 1
+            delay += profile.slow_seconds
+        elif roll < profile.error_rate + profile.slow_rate:
+            delay += profile.slow_seconds
+        time.sleep(delay)
+        self._send(200, {
+            "candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}, "finishReason": "STOP"}],
+            "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 1, "totalTokenCount": 11},
+        })
+
+
+def start_stub(profile):
+    FaultyGeminiHandler.profile = profile
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FaultyGeminiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_calls(pool, n, concurrency):
+    """Fire ``n`` interactive calls, ``concurrency`` at a time; return (latencies, failures)."""
+    latencies, failures = [], []
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            await pool.generate(["ping"], model=MODEL)
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            failures.append(type(e).__name__)
+
+    async def main():
+        sem = asyncio.Semaphore(concurrency)
+
+        async def bounded():
+            async with sem:
+                await one()
+        await asyncio.gather(*(bounded() for _ in range(n)))
+
+    asyncio.run(main())
+    return latencies, failures
+
+
+def percentile(values, q):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the retry/breaker/hedging layer against a faulty local stub")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    args = parser.parse_args()
+
+    profile = FaultProfile(error_rate=args.error_rate, slow_rate=args.slow_rate)
+    server = start_stub(profile)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def make_pool(resilience):
+        client = genai.Client(api_key="stub", http_options=types.HttpOptions(base_url=base_url))
+        # Rate limiting is not under test here
+        pool = GeminiPool(client, max_concurrency=args.concurrency, resilience=resilience)
+        pool.start()
+        pool.scheduler.bucket.rate = pool.scheduler.bucket.capacity = 1e6
+        pool.scheduler.bucket.tokens = 1e6
+        return pool
+
+    modes = {
+        "no retries": Resilience(attempts=1, hedging=False),
+        "retries": Resilience(hedging=False),
+        "retries+hedge": Resilience(),
+    }
+    print(f"Stub: {args.error_rate:.0%} errors, {args.slow_rate:.0%} slow (+{profile.slow_seconds:.0f}s), "
+          f"{args.calls} calls x {args.concurrency} concurrent\n")
+    print(f"{'mode':<16}{'ok':>6}{'failed':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'retries':>9}{'hedged':>8}{'hedge wins':>12}")
+    for name, resilience in modes.items():
+        pool = make_pool(resilience)
+        latencies, failures = run_calls(pool, args.calls, args.concurrency)
+        s = resilience.stats
+        print(f"{name:<16}{len(latencies):>6}{len(failures):>8}"
+              f"{percentile(latencies, 0.5):>7.2f}s{percentile(latencies, 0.95):>7.2f}s{percentile(latencies, 0.99):>7.2f}s"
+              f"{s['retries']:>9}{s['hedged']:>8}{s['hedge_wins']:>12}")
+
+    # Hard outage: the breaker should open and later calls fail fast without reaching the stub
+    profile.outage = True
+    resilience = Resilience(hedging=False)
+    pool = make_pool(resilience)
+    start = time.perf_counter()
+    latencies, failures = run_calls(pool, 20, 1)
+    elapsed = time.perf_counter() - start
+    print(f"\nOutage: {len(failures)} failed in {elapsed:.1f}s, "
+          f"{resilience.stats['short_circuited']} short-circuited by the breaker "
+          f"({resilience.breakers[MODEL].state})")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
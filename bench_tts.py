@@ -0,0 +1,92 @@
+import argparse
+import io
+import json
+import statistics
+import time
+
+import soundfile as sf
+
+from prompt import interviewer_phrases
+from tts_backends import BACKENDS, available_backends, fix_wav_sizes, get_backend
+from tts_pipeline import split_units
+
+# ====== CONFIG ======
+# Interviewer-style lines of the lengths speak_text sees: the fixed phrases plus typical questions
+EXTRA_PHRASES = [
+    "Great, thanks.",
+    "Could you walk me through a machine learning project you're proud of?",
+    "How would you handle a dataset where one class is much rarer than the others, "
+    "and how would you evaluate the model afterwards?",
+    "What is the difference between bagging and boosting?",
+]
+REPEATS = 3
+# ====================
+
+
+def measure(backend, text):
+    """Synthesize once; returns time to first sample, total time and audio length (seconds)."""
+    start = time.perf_counter()
+    first = None
+    chunks = []
+    for chunk in backend.stream(text):
+        if first is None and chunk:
+            first = time.perf_counter() - start
+        chunks.append(chunk)
+    total = time.perf_counter() - start
+    info = sf.info(io.BytesIO(fix_wav_sizes(b"".join(chunks))))
+    return {"ttfs": first, "total": total, "audio": info.frames / info.samplerate}
+
+
+def summarize(runs):
+    ttfs = sorted(r["ttfs"] for r in runs)
+    return {
+        "units": len(runs),
+        "ttfs_p50": statistics.median(ttfs),
+        "ttfs_max": ttfs[-1],
+        "total_p50": statistics.median(r["total"] for r in runs),
+        "audio_seconds": sum(r["audio"] for r in runs),
+        # Real-time factor: seconds of synthesis per second of speech (< 1 keeps ahead of playback)
+        "rtf": sum(r["total"] for r in runs) / sum(r["audio"] for r in runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare TTS backends on the interviewer phrase set")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS),
+                        help="Backends to run (default: every one installed here)")
+    parser.add_argument("--repeat", type=int, default=REPEATS)
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    names = args.backends or available_backends()
+    if not names:
+        print("No TTS backend installed (pip install gTTS, or apt install espeak-ng).")
+        return
+
+    # The same units SpeechPipeline would hand to speak_text's synthesizer
+    units = [u for phrase in interviewer_phrases + EXTRA_PHRASES for u in split_units(phrase)]
+    print(f"🗣️ {len(units)} units x {args.repeat} repeats")
+
+    header = f"{'backend':<10}{'ttfs p50':>10}{'ttfs max':>10}{'synth p50':>11}{'audio':>9}{'RTF':>7}"
+    print(header)
+    print("-" * len(header))
+    results = {}
+    for name in names:
+        backend = get_backend(name)
+        try:
+            backend.render(units[0])  # Warm-up: imports, DNS/TLS, voice data load
+            runs = [measure(backend, u) for _ in range(args.repeat) for u in units]
+        except Exception as e:
+            print(f"{name:<10}failed: {e}")
+            continue
+        s = results[name] = summarize(runs)
+        print(f"{name:<10}{s['ttfs_p50']:>9.3f}s{s['ttfs_max']:>9.3f}s{s['total_p50']:>10.3f}s"
+              f"{s['audio_seconds'] / args.repeat:>8.1f}s{s['rtf']:>7.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"units": units, "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
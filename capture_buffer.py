@@ -0,0 +1,127 @@
+import numpy as np
+
+# ====== CONFIG ======
+INITIAL_SECONDS = 60  # Preallocated capacity before the ring has to grow
+# ====================
+
+
+class CaptureBuffer:
+    """Single-producer/single-consumer int16 ring buffer for mic capture.
+
+    The PortAudio callback is the only writer and the main loop is the only
+    reader, so no Python lock is needed: each side owns its own position
+    counter and only ever reads the other one. Positions are absolute frame
+    counts; the storage index is ``position % capacity``. Any other thread
+    may only take checked copies with :meth:`peek`.
+
+    The writer converts float32 blocks to int16 in place as they arrive, so
+    nothing is left to convert when the turn ends. When the ring is full it
+    grows by publishing a bigger array before advancing its position, which
+    keeps any view the reader already holds valid.
+    """
+
+    def __init__(self, sample_rate, channels=1, initial_seconds=INITIAL_SECONDS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        capacity = max(1, int(sample_rate * initial_seconds))
+        self._buffer = np.zeros((capacity, channels), dtype=np.int16)
+        self._write_pos = 0  # Owned by the producer
+        self._read_pos = 0   # Owned by the consumer
+        self.grow_count = 0  # Number of times the producer had to reallocate
+
+    # ---------- producer side (audio thread) ----------
+
+    def write(self, indata):
+        """Append a float32 (frames, channels) block, converting to int16."""
+        frames = len(indata)
+        if frames == 0:
+            return
+
+        write_pos = self._write_pos
+        if write_pos + frames - self._read_pos > len(self._buffer):
+            self._grow(write_pos + frames - self._read_pos)
+
+        buffer = self._buffer
+        capacity = len(buffer)
+        start = write_pos % capacity
+        first = min(frames, capacity - start)
+
+        # Scale straight into the int16 slice: no block-sized float temporary
+        np.multiply(indata[:first], 32767, out=buffer[start:start + first], casting="unsafe")
+        if first < frames:
+            np.multiply(indata[first:], 32767, out=buffer[:frames - first], casting="unsafe")
+
+        # Publish only after the samples are in place
+        self._write_pos = write_pos + frames
+
+    def _grow(self, needed):
+        """Reallocate the ring to hold at least ``needed`` unread frames."""
+        old = self._buffer
+        capacity = len(old)
+        while capacity < needed:
+            capacity *= 2
+
+        new = np.empty((capacity, self.channels), dtype=np.int16)
+        read_pos = self._read_pos
+        # Copy the unread region so every absolute position keeps its samples
+        src = self._linear(old, read_pos, self._write_pos)
+        start = read_pos % capacity
+        first = min(len(src), capacity - start)
+        new[start:start + first] = src[:first]
+        new[:len(src) - first] = src[first:]
+
+        self._buffer = new
+        self.grow_count += 1
+
+    # ---------- consumer side (main loop) ----------
+
+    def __len__(self):
+        return self._write_pos - self._read_pos
+
+    @property
+    def duration(self):
+        """Seconds of audio waiting to be consumed."""
+        return len(self) / self.sample_rate
+
+    def snapshot(self):
+        """Return the unread frames as an int16 (frames, channels) array.
+
+        The result is a view into the ring whenever the unread region is
+        contiguous, which is the normal case for a single turn. It stays
+        valid until :meth:`release` hands the frames back to the producer.
+        """
+        # Read the producer position before the buffer reference: a buffer
+        # published later always contains every frame before that position.
+        write_pos = self._write_pos
+        return self._linear(self._buffer, self._read_pos, write_pos)
+
+    def peek(self):
+        """Return a copy of the unread frames; unlike :meth:`snapshot`, safe from any thread.
+
+        The copy is checked against the consumer's position afterwards: if
+        the consumer released frames meanwhile (so the producer may have
+        reused them), None is returned instead.
+        """
+        read_pos = self._read_pos
+        write_pos = self._write_pos
+        frames = np.array(self._linear(self._buffer, read_pos, write_pos))
+        if self._read_pos != read_pos:
+            return None
+        return frames
+
+    def release(self, frames=None):
+        """Mark ``frames`` (default: everything captured so far) as consumed."""
+        if frames is None:
+            self._read_pos = self._write_pos
+        else:
+            self._read_pos = min(self._read_pos + frames, self._write_pos)
+
+    @staticmethod
+    def _linear(buffer, start_pos, end_pos):
+        capacity = len(buffer)
+        frames = end_pos - start_pos
+        start = start_pos % capacity
+        if start + frames <= capacity:
+            return buffer[start:start + frames]
+        # Wrapped around the end of the ring: stitch the two halves together
+        return np.concatenate((buffer[start:], buffer[:frames - (capacity - start)]))
@@ -3,14 +3,17 @@ import numpy as np
 import wave
 import threading
 from datetime import datetime
+from resample import StreamingResampler
  
-SAMPLE_RATE = 44100
+SAMPLE_RATE = 44100  # Device capture rate
+TARGET_SAMPLE_RATE = 16000  # Rate of the uploaded WAV, resampled while recording
 CHANNELS = 1
 CHUNK_SIZE = 1024
  
 is_muted = False
 recording = []
 lock = threading.Lock()
+resampler = StreamingResampler(SAMPLE_RATE, TARGET_SAMPLE_RATE, CHANNELS)
  
 # transcribing audio with gemini
 from google import genai
@@ -61,7 +64,7 @@ def save_audio(audio_data):
     with wave.open(filename, 'wb') as wf:
         wf.setnchannels(CHANNELS)
         wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
+        wf.setframerate(TARGET_SAMPLE_RATE)
         wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
     t1 = datetime.now()
     transcribe_audio(filename)
@@ -74,7 +77,7 @@ def audio_callback(indata, frames, time, status):
     global recording, is_muted
     if not is_muted:
         with lock:
-            recording.append(indata.copy())
+            recording.append(resampler.process(indata))
  
  
 def main():
@@ -89,6 +92,7 @@ def main():
                     print("🎤 unmuted: Recording started...")
                     with lock:
                         recording = []
+                        resampler.reset()
                     is_muted = False
                 else:
                     print("🔇 Muted: Saving audio...")
@@ -96,6 +100,7 @@ def main():
                     with lock:
                         save_audio(recording)
                         recording = []
+                        resampler.reset()
             elif cmd == 'q':
                 print("🛑 Exiting...")
                 if not is_muted:
@@ -11,9 +11,12 @@ import os
 import time
 import json
 from prompt import prompt_template
+from prompt_cache import PromptCache
+from resample import StreamingResampler
 
 # ====== CONFIG ======
-SAMPLE_RATE = 44100
+SAMPLE_RATE = 44100  # Device capture rate
+TARGET_SAMPLE_RATE = 16000  # Rate of the uploaded WAV, resampled while recording
 CHANNELS = 1
 CHUNK_SIZE = 1024
 TRANSCRIPT_FILE = "conversation.txt"
@@ -25,10 +28,12 @@ load_dotenv()
 is_muted = True
 recording = []
 lock = threading.Lock()
+resampler = StreamingResampler(SAMPLE_RATE, TARGET_SAMPLE_RATE, CHANNELS)
 stop_threads = False
 audio_queue = queue.Queue()
 
 client = genai.Client()
+transcription_prompt = PromptCache(client, "gemini-2.5-flash", prompt_template)  # Static prefix sent by handle
 
 # ========== GEMINI LOGIC ==========
 
@@ -38,13 +43,9 @@ def transcribe_audio_background(filename, ai_question):
         with open(filename, "rb") as f:
             audio_bytes = f.read()
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                prompt_template,
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        response = transcription_prompt.generate_content([
+            types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
+        ])
         
         text = response.text.strip()
         
@@ -125,7 +126,7 @@ def save_audio(audio_data):
     with wave.open(filename, "wb") as wf:
         wf.setnchannels(CHANNELS)
         wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
+        wf.setframerate(TARGET_SAMPLE_RATE)
         wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
 
     print(f"💾 Saved: {filename}")
@@ -137,7 +138,7 @@ def audio_callback(indata, frames, time, status):
     global recording
     if not is_muted:
         with lock:
-            recording.append(indata.copy())
+            recording.append(resampler.process(indata))
 
 
 # ========== BACKGROUND THREAD ==========
@@ -185,6 +186,7 @@ def main():
                     print("🎤 Unmuted: Ready to record again...")
                     with lock:
                         recording = []
+                        resampler.reset()
                     is_muted = False
 
                 else:
@@ -195,6 +197,7 @@ def main():
                     with lock:
                         filename = save_audio(recording)
                         recording = []
+                        resampler.reset()
 
                     if filename:
                         # Add filename and current AI question to queue
@@ -210,6 +213,7 @@ def main():
                             print("🎤 Auto-unmuted: You can speak again.\n")
                             with lock:
                                 recording = []
+                                resampler.reset()
                             is_muted = False
 
             elif cmd == "q":
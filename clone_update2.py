@@ -9,9 +9,11 @@ from google import genai
 from google.genai import types
 import os
 import time
+from resample import StreamingResampler
 
 # ====== CONFIG ======
-SAMPLE_RATE = 44100
+SAMPLE_RATE = 44100  # Device capture rate
+TARGET_SAMPLE_RATE = 16000  # Rate of the uploaded WAV, resampled while recording
 CHANNELS = 1
 CHUNK_SIZE = 1024
 TRANSCRIPT_FILE = "conversation.txt"
@@ -23,6 +25,7 @@ load_dotenv()
 is_muted = True
 recording = []
 lock = threading.Lock()
+resampler = StreamingResampler(SAMPLE_RATE, TARGET_SAMPLE_RATE, CHANNELS)
 stop_threads = False
 audio_queue = queue.Queue()
 
@@ -97,7 +100,7 @@ def save_audio(audio_data):
     with wave.open(filename, "wb") as wf:
         wf.setnchannels(CHANNELS)
         wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
+        wf.setframerate(TARGET_SAMPLE_RATE)
         wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
 
     print(f"💾 Saved: {filename}")
@@ -109,7 +112,7 @@ def audio_callback(indata, frames, time, status):
     global recording
     if not is_muted:
         with lock:
-            recording.append(indata.copy())
+            recording.append(resampler.process(indata))
 
 
 # ========== BACKGROUND THREAD ==========
@@ -154,6 +157,7 @@ def main():
                     print("🎤 Unmuted: Ready to record again...")
                     with lock:
                         recording = []
+                        resampler.reset()
                     is_muted = False
 
                 else:
@@ -164,6 +168,7 @@ def main():
                     with lock:
                         filename = save_audio(recording)
                         recording = []
+                        resampler.reset()
 
                     if filename:
                         # Start background transcription (non-blocking)
@@ -179,6 +184,7 @@ def main():
                             print("🎤 Auto-unmuted: You can speak again.\n")
                             with lock:
                                 recording = []
+                                resampler.reset()
                             is_muted = False
 
             elif cmd == "q":
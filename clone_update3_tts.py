@@ -7,16 +7,16 @@ from datetime import datetime
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-import os
-import time
 import json
 from prompt import prompt_template
-from gtts import gTTS
-import pygame
-import tempfile
+from prompt_cache import PromptCache
+from tts_backends import get_backend
+from tts_player import SpeechPlayer
+from resample import StreamingResampler
 
 # ====== CONFIG ======
-SAMPLE_RATE = 16000
+SAMPLE_RATE = 16000  # Device capture rate
+TARGET_SAMPLE_RATE = 16000  # Rate of the uploaded WAV, resampled while recording
 CHANNELS = 1
 CHUNK_SIZE = 1024
 TRANSCRIPT_FILE = "conversation_latin.txt"
@@ -28,38 +28,27 @@ load_dotenv()
 is_muted = True
 recording = []
 lock = threading.Lock()
+resampler = StreamingResampler(SAMPLE_RATE, TARGET_SAMPLE_RATE, CHANNELS)
 stop_threads = False
 audio_queue = queue.Queue()
 
 client = genai.Client()
+transcription_prompt = PromptCache(client, "gemini-2.5-pro", prompt_template)  # Static prefix sent by handle
 
-# Initialize pygame mixer for audio playback
-pygame.mixer.init()
+# One output stream for all speech, opened on first playback
+player = SpeechPlayer()
+tts_backend = get_backend()  # TTS_BACKEND=espeak for an offline deployment
 
 # ========== TEXT-TO-SPEECH ==========
 
 def speak_text(text):
     """Convert text to speech and play it."""
     try:
-        # Create a temporary file for the audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-            temp_filename = fp.name
+        # Generate speech in memory
+        clip = tts_backend.render(text)
         
-        # Generate speech
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(temp_filename)
-        
-        # Play the audio
-        pygame.mixer.music.load(temp_filename)
-        pygame.mixer.music.play()
-        
-        # Wait for playback to finish
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
-        
-        # Clean up
-        pygame.mixer.music.unload()
-        os.remove(temp_filename)
+        # Play it on the shared output stream and wait until it has been heard
+        player.play_bytes(clip).wait()
         
         print("🔊 Speech playback completed")
         
@@ -75,14 +64,9 @@ def transcribe_audio_background(filename, ai_question):
             audio_bytes = f.read()
         # myfile = client.files.upload(file="path/to/sample.mp3")
 
-        response = client.models.generate_content(
-            model="gemini-2.5-pro",
-            contents=[
-                prompt_template,
-                # myfile
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        response = transcription_prompt.generate_content([
+            types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
+        ])
         
         text = response.text.strip()
         
@@ -168,7 +152,7 @@ def save_audio(audio_data):
     with wave.open(filename, "wb") as wf:
         wf.setnchannels(CHANNELS)
         wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
+        wf.setframerate(TARGET_SAMPLE_RATE)
         wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
 
     print(f"💾 Saved: {filename}")
@@ -180,7 +164,7 @@ def audio_callback(indata, frames, time, status):
     global recording
     if not is_muted:
         with lock:
-            recording.append(indata.copy())
+            recording.append(resampler.process(indata))
 
 
 # ========== BACKGROUND THREAD ==========
@@ -228,6 +212,7 @@ def main():
                     print("🎤 Unmuted: Ready to record again...")
                     with lock:
                         recording = []
+                        resampler.reset()
                     is_muted = False
 
                 else:
@@ -238,6 +223,7 @@ def main():
                     with lock:
                         filename = save_audio(recording)
                         recording = []
+                        resampler.reset()
 
                     if filename:
                         # Add filename and current AI question to queue
@@ -253,6 +239,7 @@ def main():
                             print("🎤 Auto-unmuted: You can speak again.\n")
                             with lock:
                                 recording = []
+                                resampler.reset()
                             is_muted = False
 
             elif cmd == "q":
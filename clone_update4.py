@@ -7,16 +7,18 @@ from datetime import datetime
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
-import os
 import time
 import json
 from prompt import prompt_template
-from gtts import gTTS
-import pygame
-import tempfile
+from prompt_cache import PromptCache
+from tts_backends import get_backend
+from tts_player import SpeechPlayer, decode_audio
+from tts_pipeline import speak, print_report
+from resample import StreamingResampler
 
 # ====== CONFIG ======
-SAMPLE_RATE = 44100
+SAMPLE_RATE = 44100  # Device capture rate
+TARGET_SAMPLE_RATE = 16000  # Rate of the uploaded WAV, resampled while recording
 CHANNELS = 1
 CHUNK_SIZE = 1024
 TRANSCRIPT_FILE = "english_latin_spanish.txt"
@@ -28,6 +30,7 @@ load_dotenv()
 is_muted = True
 recording = []
 lock = threading.Lock()
+resampler = StreamingResampler(SAMPLE_RATE, TARGET_SAMPLE_RATE, CHANNELS)
 stop_threads = False
 audio_queue = queue.Queue()
 shutdown_requested = False
@@ -35,12 +38,19 @@ active_tasks = {"generate_response": False, "tts": False}
 tasks_lock = threading.Lock()
 
 client = genai.Client()
+transcription_prompt = PromptCache(client, "gemini-2.5-flash", prompt_template)  # Static prefix sent by handle
 
-# Initialize pygame mixer for audio playback
-pygame.mixer.init()
+# One output stream for all speech, opened on first playback
+player = SpeechPlayer()
+tts_backend = get_backend()  # TTS_BACKEND=espeak for an offline deployment
 
 # ========== TEXT-TO-SPEECH ==========
 
+def synthesize_speech(text):
+    """Render text to speech in memory; returns decoded (audio, rate)."""
+    return decode_audio(tts_backend.render(text))
+
+
 def speak_text(text):
     """Convert text to speech and play it."""
     global active_tasks
@@ -48,25 +58,8 @@ def speak_text(text):
         with tasks_lock:
             active_tasks["tts"] = True
         
-        # Create a temporary file for the audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-            temp_filename = fp.name
-        
-        # Generate speech
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(temp_filename)
-        
-        # Play the audio
-        pygame.mixer.music.load(temp_filename)
-        pygame.mixer.music.play()
-        
-        # Wait for playback to finish
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
-        
-        # Clean up
-        pygame.mixer.music.unload()
-        os.remove(temp_filename)
+        # Sentence/clause units: the next one is synthesized while the current one plays
+        print_report(speak(text, synthesize_speech, player))
         
         print("🔊 Speech playback completed")
         
@@ -85,13 +78,9 @@ def transcribe_audio_background(filename, ai_question):
         with open(filename, "rb") as f:
             audio_bytes = f.read()
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                prompt_template,
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        response = transcription_prompt.generate_content([
+            types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
+        ])
         
         text = response.text.strip()
         
@@ -187,7 +176,7 @@ def save_audio(audio_data):
     with wave.open(filename, "wb") as wf:
         wf.setnchannels(CHANNELS)
         wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
+        wf.setframerate(TARGET_SAMPLE_RATE)
         wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
 
     print(f"💾 Saved: {filename}")
@@ -199,7 +188,7 @@ def audio_callback(indata, frames, time, status):
     global recording
     if not is_muted:
         with lock:
-            recording.append(indata.copy())
+            recording.append(resampler.process(indata))
 
 
 # ========== BACKGROUND THREAD ==========
@@ -292,6 +281,7 @@ def main():
                         print("🎤 Unmuted: Ready to record again...")
                         with lock:
                             recording = []
+                            resampler.reset()
                         is_muted = False
 
                     else:
@@ -302,6 +292,7 @@ def main():
                         with lock:
                             filename = save_audio(recording)
                             recording = []
+                            resampler.reset()
 
                         if filename:
                             # Add filename and current AI question to queue
@@ -317,6 +308,7 @@ def main():
                                 print("🎤 Auto-unmuted: You can speak again.\n")
                                 with lock:
                                     recording = []
+                                    resampler.reset()
                                 is_muted = False
 
                 elif cmd == "q":
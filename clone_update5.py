@@ -1,35 +1,56 @@
 import sounddevice as sd
-import numpy as np
-import wave
 import threading
-import queue
 from datetime import datetime
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
 import os
 import time
 import json
-from prompt import prompt_template
-from gtts import gTTS
-import pygame
-import tempfile
+from fused_turn import candidate_text
+from gemini_pool import get_pool
+from scheduler import TTS
+from streaming_reply import stream_reply
+from speculative import SpeculativeDrafter
+from transcription_pool import TranscriptionPool
+from tts_player import SpeechPlayer, decode_audio, PLAYBACK_RATE
+from tts_backends import get_backend
+from tts_cache import TTSCache
+from prompt import welcome_message
+from tts_pipeline import SpeechPipeline, print_report
+from capture_buffer import CaptureBuffer
+from resample import StreamingResampler
+from turn_audio import TurnAudio
+from audio_codec import get_encoder
+from session_archive import SessionArchive
+from vad import trim_silence
+from barge_in import BargeInMonitor
+from echo_canceller import EchoCanceller, EchoReference
+import tracing
 
 # ====== CONFIG ======
-SAMPLE_RATE = 44100
+SAMPLE_RATE = 44100  # Device capture rate
+TARGET_SAMPLE_RATE = 16000  # Rate of the uploaded WAV, resampled while recording
 CHANNELS = 1
 CHUNK_SIZE = 1024
 TRANSCRIPT_FILE = "english_latin_spanish.txt"
+UPLOAD_CODEC = "flac"  # "wav", "flac" (lossless) or "opus" (lossy, smallest)
+FUSED_TURN = False  # One structured call returns both transcript and next question
+STREAM_REPLY = True  # Speak the next question sentence by sentence while it streams in
+SPECULATE = False  # Draft the next question while the candidate is still answering (extra API calls)
+TRIM_SILENCE = True  # Cut silence and skip turns without speech before any model call
+ARCHIVE_TURNS = True  # Append every turn to one session archive (see session_archive.py)
+TRANSCRIPTION_WORKERS = 3  # Background transcriptions that may run at once
+BARGE_IN = True  # Talking over the interviewer cuts the speech and starts recording the answer
+ECHO_CANCEL = True  # Subtract the interviewer's own voice from the mic, so speakers don't trigger barge-in
 # ====================
 
 load_dotenv()
 
 # Global state
 is_muted = True
-recording = []
-lock = threading.Lock()
+capture = CaptureBuffer(TARGET_SAMPLE_RATE, CHANNELS)  # Written by audio_callback, no lock needed
+resampler = StreamingResampler(SAMPLE_RATE, TARGET_SAMPLE_RATE, CHANNELS)
 stop_threads = False
-audio_queue = queue.Queue()
+audio_queue = TranscriptionPool(TRANSCRIPTION_WORKERS)  # Results land by question index, in any order
 shutdown_requested = False
 active_tasks = {"generate_response": False, "tts": False}
 tasks_lock = threading.Lock()
@@ -37,41 +58,47 @@ conversation_log = []  # Store conversation in order
 conversation_lock = threading.Lock()
 current_question_index = -1  # Track which question we're on
 
-client = genai.Client()
+gemini = get_pool()  # Shared async client: one connection pool, bounded concurrency
+upload_encoder = get_encoder(UPLOAD_CODEC)
+archive = SessionArchive(sample_rate=TARGET_SAMPLE_RATE, channels=CHANNELS) if ARCHIVE_TURNS else None
 
-# Initialize pygame mixer for audio playback
-pygame.mixer.init()
+# One output stream for all speech, opened on first playback; what it plays is the reference for
+# the echo canceller and for barge-in, which must not take the interviewer's own voice for the candidate
+echo_reference = EchoReference(TARGET_SAMPLE_RATE, PLAYBACK_RATE) if ECHO_CANCEL or BARGE_IN else None
+echo_canceller = EchoCanceller(TARGET_SAMPLE_RATE) if ECHO_CANCEL else None
+player = SpeechPlayer(reference=echo_reference)
+tts_backend = get_backend()  # TTS_BACKEND=espeak for an offline deployment
+tts_cache = TTSCache()  # Recurring phrases (welcome, re-prompts) are synthesized once across sessions
+# Listens on the muted (echo-cancelled) mic while the interviewer speaks
+barge_in = BargeInMonitor(TARGET_SAMPLE_RATE, CHANNELS, enabled=BARGE_IN)
 
 # ========== TEXT-TO-SPEECH ==========
 
+def synthesize_speech(text):
+    """Render text to speech in memory (from the phrase cache when possible); returns decoded (audio, rate)."""
+    with tracing.span("tts.synthesize", chars=len(text)):
+        # Scheduled so synthesis queues behind question generation, ahead of transcription
+        clip = tts_cache.get_or_render(
+            text, tts_backend, lambda: gemini.run_sync(gemini.call(tts_backend.render, text, priority=TTS)))
+    return decode_audio(clip)
+
+
 def speak_text(text):
-    """Convert text to speech and play it."""
+    """Convert text to speech and play it; returns what was spoken if the candidate cut it off, else None."""
     global active_tasks
     try:
         with tasks_lock:
             active_tasks["tts"] = True
         
-        # Create a temporary file for the audio
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-            temp_filename = fp.name
-        
-        # Generate speech
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(temp_filename)
-        
-        # Play the audio
-        pygame.mixer.music.load(temp_filename)
-        pygame.mixer.music.play()
-        
-        # Wait for playback to finish
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
-        
-        # Clean up
-        pygame.mixer.music.unload()
-        os.remove(temp_filename)
+        # Sentence/clause units: the next one is synthesized while the current one plays
+        pipeline = SpeechPipeline(synthesize_speech, player)
+        with barge_in.watch(pipeline):
+            pipeline.say(text)
+            pipeline.finish()
+        print_report(pipeline.report())
         
-        print("🔊 Speech playback completed")
+        print("✋ Speech cut off by the candidate" if barge_in.fired else "🔊 Speech playback completed")
+        return pipeline.spoken_text() if pipeline.stopped else None
         
     except Exception as e:
         print(f"⚠️ Text-to-speech failed: {e}")
@@ -81,69 +108,56 @@ def speak_text(text):
 
 # ========== GEMINI LOGIC ==========
 
-def transcribe_audio_background(filename, question_index):
+def transcribe_audio_background(turn, question_index):
     """Background transcription (non-blocking) that maps response to correct question."""
     try:
         print(f"📝 [Background] Starting transcription for Q{question_index + 1}...")
-        with open(filename, "rb") as f:
-            audio_bytes = f.read()
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                prompt_template,
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        response = gemini.run_sync(gemini.transcribe(turn))
         
         text = response.text.strip()
         
         # Parse JSON response
         try:
-            # Remove markdown code blocks if present
-            if text.startswith("```json"):
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif text.startswith("```"):
-                text = text.split("```")[1].split("```")[0].strip()
-            
-            parsed_response = json.loads(text)
-            
-            # Extract candidate responses
-            candidate_text = []
-            for item in parsed_response.get("conversation", []):
-                speaker = item.get("speaker", "")
-                # Look for candidate/Speaker2 responses
-                if "candidate" in speaker.lower() or speaker == "Speaker2" or speaker == "Speaker1":
-                    text_content = item.get('text', '')
-                    if text_content:
-                        candidate_text.append(text_content)
-            
-            # Map response to the question
-            if candidate_text:
-                full_response = " ".join(candidate_text)
+            with tracing.span("parse"):
+                # Remove markdown code blocks if present
+                if text.startswith("```json"):
+                    text = text.split("```json")[1].split("```")[0].strip()
+                elif text.startswith("```"):
+                    text = text.split("```")[1].split("```")[0].strip()
                 
-                with conversation_lock:
-                    if question_index < len(conversation_log):
-                        conversation_log[question_index]["response"] = full_response
-                        conversation_log[question_index]["response_timestamp"] = datetime.now().strftime('%H:%M:%S')
-                        
-                        # Save transcript immediately after mapping
-                        save_formatted_transcript()
-                        
-                        print(f"✅ [Background] Response mapped to Q{question_index + 1}")
-                    else:
-                        print(f"⚠️ [Background] Invalid question index: {question_index}")
-            else:
-                print(f"⚠️ [Background] No candidate speech detected")
+                parsed_response = json.loads(text)
+            map_response_to_question(parsed_response.get("conversation", []), question_index)
             
         except json.JSONDecodeError as e:
             print(f"⚠️ [Background] JSON parsing failed: {e}")
             
     except Exception as e:
-        print(f"⚠️ [Background] Transcription failed: {e}")
+        # Retries are exhausted at this point; the raw answer is still in the session archive
+        kept = f" (audio kept as {turn.archive_ref})" if turn.archive_ref else ""
+        print(f"⚠️ [Background] Transcription failed: {e}{kept}")
+
+
+def map_response_to_question(conversation, question_index):
+    """Store the candidate's transcribed answer under the question it answers."""
+    full_response = candidate_text(conversation)
+    if not full_response:
+        print(f"⚠️ [Background] No candidate speech detected")
+        return
+
+    with conversation_lock:
+        if question_index < len(conversation_log):
+            conversation_log[question_index]["response"] = full_response
+            conversation_log[question_index]["response_timestamp"] = datetime.now().strftime('%H:%M:%S')
+            
+            # Save transcript immediately after mapping
+            save_formatted_transcript()
+            
+            print(f"✅ [Background] Response mapped to Q{question_index + 1}")
+        else:
+            print(f"⚠️ [Background] Invalid question index: {question_index}")
 
 
-def generate_response(filename, question_index):
+def generate_response(turn, question_index, started_at=None):
     """Generate conversational reply (blocking until response is ready) and speak it."""
     global active_tasks, conversation_log, current_question_index
     try:
@@ -151,93 +165,190 @@ def generate_response(filename, question_index):
             active_tasks["generate_response"] = True
         
         print("🧠 Generating AI response...")
-        with open(filename, "rb") as f:
-            audio_bytes = f.read()
-
+        if STREAM_REPLY:
+            return generate_response_stream(turn, started_at)
+        
         # Generate the next question
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                "Act like a interviewer who is interviewing the candidate for ai/ml intern position. You will always ask the question in english no matter what language user is speaking. Keep your responses concise and conversational.",
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        response = gemini.run_sync(gemini.reply(turn))
 
         ai_reply = response.text.strip()
-        print(f"\n🤖 Interviewer: {ai_reply}\n")
+        ask_question(ai_reply)
+        return ai_reply
+    except Exception as e:
+        print(f"❌ Gemini response failed: {e}")
+        return None
+    finally:
+        with tasks_lock:
+            active_tasks["generate_response"] = False
+
+
+def generate_response_stream(turn, started_at=None):
+    """Speak the next question sentence by sentence while Gemini is still generating it."""
+    global active_tasks
+    stream = gemini.iterate_sync(gemini.reply_stream(turn))
+    chunks = (chunk.text for chunk in stream)
+    
+    print("\n🤖 Interviewer: ", end="", flush=True)
+    with tasks_lock:
+        active_tasks["tts"] = True
+    pipeline = SpeechPipeline(synthesize_speech, player, started_at=started_at)
+    try:
+        with barge_in.watch(pipeline):
+            ai_reply, metrics = stream_reply(
+                chunks, pipeline,
+                started_at=started_at,
+                on_text=lambda text: print(text, end="", flush=True),
+            )
+    finally:
+        stream.close()  # Ends the Gemini stream if a barge-in stopped reading it
+        with tasks_lock:
+            active_tasks["tts"] = False
+    print("\n")
+    
+    if metrics["cut_off"]:
+        # Only what was heard becomes the question the candidate is answering
+        print(f"✋ Cut off after: {ai_reply}" if ai_reply else "✋ Cut off before anything was spoken")
+        log_question(ai_reply, metrics)
+        return ai_reply
+    if not ai_reply:
+        print("❌ Gemini returned an empty response")
+        return None
+    
+    log_question(ai_reply, metrics)
+    if metrics["time_to_first_audio"] is not None:
+        print(f"⏱️ Time to first audio: {metrics['time_to_first_audio']:.2f}s "
+              f"(first chunk {metrics['time_to_first_chunk']:.2f}s, "
+              f"{metrics['sentences']} units, {metrics['total']:.2f}s total)")
+        print_report(metrics["tts"])
+    print("✅ AI response completed")
+    return ai_reply
+
+
+def generate_fused_turn(turn, question_index):
+    """Fused mode: one call transcribes the answer and returns the next question."""
+    global active_tasks
+    try:
+        with tasks_lock:
+            active_tasks["generate_response"] = True
         
-        # Add new question to conversation log
-        with conversation_lock:
-            current_question_index += 1
-            conversation_log.append({
-                "question": ai_reply,
-                "question_timestamp": datetime.now().strftime('%H:%M:%S'),
-                "response": None,
-                "response_timestamp": None
-            })
+        print("🧠 Transcribing and generating next question in one call...")
+        result = gemini.run_sync(gemini.fused(turn))
+        print(f"📊 Tokens: {result['usage']['total_tokens']} (prompt {result['usage']['prompt_tokens']})")
         
-        # Speak the AI response
-        print("🔊 Playing AI response...")
-        speak_text(ai_reply)
+        map_response_to_question(result["conversation"], question_index)
         
-        print("✅ AI response completed")
+        ai_reply = result["next_question"]
+        if not ai_reply:
+            print("❌ Fused response had no next question")
+            return None
+        ask_question(ai_reply)
         return ai_reply
     except Exception as e:
-        print(f"❌ Gemini response failed: {e}")
+        print(f"❌ Fused Gemini call failed: {e}")
         return None
     finally:
         with tasks_lock:
             active_tasks["generate_response"] = False
 
 
+def log_question(ai_reply, metrics=None):
+    """Add the interviewer's next question to the conversation log."""
+    global current_question_index
+    with conversation_lock:
+        current_question_index += 1
+        conversation_log.append({
+            "question": ai_reply,
+            "question_timestamp": datetime.now().strftime('%H:%M:%S'),
+            "response": None,
+            "response_timestamp": None,
+            "metrics": metrics,
+            "cut_off": bool(metrics and metrics.get("cut_off")),
+        })
+
+
+def ask_question(ai_reply):
+    """Log the interviewer's next question and speak it."""
+    print(f"\n🤖 Interviewer: {ai_reply}\n")
+    
+    # Add new question to conversation log
+    log_question(ai_reply)
+    
+    # Speak the AI response
+    print("🔊 Playing AI response...")
+    spoken = speak_text(ai_reply)
+    if spoken is not None:
+        # Only what was heard is the question the candidate is answering
+        with conversation_lock:
+            entry = conversation_log[current_question_index]
+            entry["question"], entry["cut_off"] = spoken, True
+        return
+    
+    print("✅ AI response completed")
+
+
 # ========== AUDIO HANDLING ==========
-def save_audio(audio_data):
-    """Save audio chunks to a WAV file."""
+def save_audio(audio_data, question_index=-1):
+    """Encode captured int16 frames into an in-memory turn and archive the raw PCM."""
     if len(audio_data) == 0:
         return None
 
-    filename = f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-    audio_data = np.concatenate(audio_data, axis=0)
+    if TRIM_SILENCE:
+        with tracing.span("vad.trim"):
+            audio_data = trim_silence(audio_data, TARGET_SAMPLE_RATE)
+        if audio_data is None:
+            print("🤫 No speech detected in this turn, skipping upload")
+            return None
+
+    turn = TurnAudio(audio_data, TARGET_SAMPLE_RATE, CHANNELS, encoder=upload_encoder)
+    if archive:
+        with tracing.span("archive"):
+            record = archive.append_turn(audio_data, question_index)
+        turn.archive_ref = archive.label(record)
+        print(f"💾 Archived: {turn.archive_ref}")
+    return turn
 
-    with wave.open(filename, "wb") as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
 
-    print(f"💾 Saved: {filename}")
-    return filename
+def encode_partial(audio_data):
+    """Trim and encode an answer in progress for speculative drafting (not archived)."""
+    if TRIM_SILENCE:
+        audio_data = trim_silence(audio_data, TARGET_SAMPLE_RATE)
+        if audio_data is None:
+            return None
+    return TurnAudio(audio_data, TARGET_SAMPLE_RATE, CHANNELS, encoder=upload_encoder)
+
+
+drafter = SpeculativeDrafter(gemini, capture, encode_partial) if SPECULATE else None
 
 
 def audio_callback(indata, frames, time, status):
-    """Capture mic input when unmuted."""
-    global recording
+    """Capture mic input when unmuted; while muted, watch for the candidate talking over the interviewer."""
+    # Resampling (and echo cancelling) run on every block, muted or not, so both stay continuous
+    block = resampler.process(indata)
+    reference = echo_reference.read(len(block)) if echo_reference else None
+    if echo_canceller:
+        block = echo_canceller.process(block, reference)
     if not is_muted:
-        with lock:
-            recording.append(indata.copy())
+        capture.write(block)
+        return
+    barge_in.feed(block, start_answer, reference)
 
 
-# ========== BACKGROUND THREAD ==========
-def background_transcription_worker():
-    """Handles transcription tasks from the queue asynchronously."""
-    global stop_threads
-    while not stop_threads:
-        try:
-            task = audio_queue.get(timeout=1)
-        except queue.Empty:
-            continue
-
-        filename, question_index = task
-        transcribe_audio_background(filename, question_index)
-        audio_queue.task_done()
-    
-    print("🔄 Background transcription worker finished")
+def start_answer(preroll):
+    """Barge-in (audio thread): record from here, including the words that cut the interviewer off."""
+    global is_muted
+    capture.write(preroll)
+    is_muted = False
 
 
 # ========== UTILITIES ==========
 def save_formatted_transcript():
-    """Save conversation in a clean, readable format."""
-    with open(TRANSCRIPT_FILE, "w", encoding="utf-8") as f:
+    """Save conversation in a clean, readable format.
+
+    Call with conversation_lock held. The file is replaced atomically, so
+    readers never see a half-written transcript.
+    """
+    temp_file = TRANSCRIPT_FILE + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
         f.write("=" * 80 + "\n")
         f.write("INTERVIEW TRANSCRIPT\n")
         f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
@@ -246,7 +357,8 @@ def save_formatted_transcript():
         for i, entry in enumerate(conversation_log, 1):
             # Write the question
             q_time = entry.get("question_timestamp", "")
-            f.write(f"Q{i}. [{q_time}] INTERVIEWER:\n")
+            cut = " (cut off)" if entry.get("cut_off") else ""
+            f.write(f"Q{i}. [{q_time}] INTERVIEWER{cut}:\n")
             f.write(f"{entry['question']}\n\n")
             
             # Write the response if available
@@ -259,19 +371,13 @@ def save_formatted_transcript():
                 f.write(f"[Transcription in progress...]\n\n")
             
             f.write("-" * 80 + "\n\n")
+    os.replace(temp_file, TRANSCRIPT_FILE)
 
 
 def welcome_candidate():
     """Welcome the candidate at the start of the interview."""
     global conversation_log, current_question_index
     
-    welcome_message = (
-        "Hello! Welcome to your AI/ML internship interview. "
-        "I'm excited to learn more about you today. "
-        "Let's begin with a quick introduction. "
-        "Could you please tell me about yourself and your background in AI and machine learning?"
-    )
-    
     print("\n" + "=" * 80)
     print("🎯 INTERVIEW STARTING")
     print("=" * 80)
@@ -294,6 +400,16 @@ def welcome_candidate():
     return welcome_message
 
 
+def note_barge_in():
+    """Attach the last barge-in to the question it cut off and report it."""
+    event = barge_in.events[-1]
+    with conversation_lock:
+        if 0 <= current_question_index < len(conversation_log):
+            conversation_log[current_question_index]["barge_in"] = event
+    print(f"✋ Barge-in {event['after_seconds']:.1f}s into the question: playback cut "
+          f"{event['reaction']*1000:.0f}ms after you started, recording your answer...")
+
+
 # ========== MAIN LOOP ==========
 def wait_for_active_tasks():
     """Wait for all active tasks to complete."""
@@ -311,11 +427,35 @@ def wait_for_active_tasks():
     # Wait for queue to be empty
     print("⏳ Waiting for transcription queue to empty...")
     audio_queue.join()
+    audio_queue.print_summary()
+    print_scheduler_summary()
+    tts_cache.print_stats()
+    barge_in.print_summary()
+    if echo_canceller:
+        print(f"🔁 Echo canceller: adapted on {echo_canceller.adapted}/{echo_canceller.blocks} blocks, "
+              f"{echo_canceller.divergences} reset(s), {echo_reference.underruns} reference underrun(s), "
+              f"clock drift {echo_reference.drift_ppm:+.0f} ppm")
     print("✅ All tasks completed!")
 
 
+def print_scheduler_summary():
+    """Queueing delay per priority class of model calls."""
+    for priority, s in gemini.scheduler.summary().items():
+        if s["admitted"]:
+            print(f"📊 {priority:<12} {s['admitted']:>4} calls, "
+                  f"queued {s['mean_wait']*1000:.0f}ms avg / {s['max_wait']*1000:.0f}ms max")
+
+
+def print_speculation_summary():
+    """Report how often speculative drafts were used and the latency they saved."""
+    s = drafter.summary()
+    print(f"🎯 Speculation: {s['hits']}/{s['turns']} turns answered from a draft "
+          f"({s['hit_rate']:.0%} hit rate, {s['misses']} discarded, {s['no_draft']} without draft), "
+          f"{s['drafts']} drafts requested, ~{s['mean_saved_seconds']:.2f}s saved per hit")
+
+
 def main():
-    global is_muted, recording, stop_threads, shutdown_requested, conversation_log, current_question_index
+    global is_muted, stop_threads, shutdown_requested, conversation_log, current_question_index
 
     print("\n" + "=" * 80)
     print("🎙️  AI/ML INTERNSHIP INTERVIEW SYSTEM")
@@ -331,18 +471,25 @@ def main():
     if os.path.exists(TRANSCRIPT_FILE):
         os.remove(TRANSCRIPT_FILE)
     
-    # Start background transcription worker
-    transcription_thread = threading.Thread(target=background_transcription_worker, daemon=True)
-    transcription_thread.start()
+    # Start background transcription workers
+    audio_queue.start(transcribe_audio_background)
+    
+    # Open the Gemini connection and register the static prompt while the welcome message plays
+    gemini.submit(gemini.warm_up())
     
-    # Welcome the candidate and get the initial question
-    welcome_candidate()
-
     try:
         with sd.InputStream(channels=CHANNELS, samplerate=SAMPLE_RATE,
                             blocksize=CHUNK_SIZE, callback=audio_callback):
 
+            # Welcome the candidate with the mic open (muted), so they can barge in
+            welcome_candidate()
+
+            if not is_muted:
+                note_barge_in()  # The candidate cut the welcome short and is already being recorded
             is_muted = False
+            if drafter:
+                drafter.start()
+                drafter.begin_turn()
             print("\n🎤 Recording started... Please introduce yourself.\n")
 
             while True:
@@ -371,37 +518,64 @@ def main():
                         
                     if is_muted:
                         print("🎤 Unmuted: Ready to record again...")
-                        with lock:
-                            recording = []
+                        capture.release()
                         is_muted = False
+                        if drafter:
+                            drafter.begin_turn()
 
                     else:
                         print("🔇 Muted: Processing your response...")
                         is_muted = True
-
-                        # Save audio
-                        with lock:
-                            filename = save_audio(recording)
-                            recording = []
-
-                        if filename:
-                            # Get the current question index for this response
-                            response_question_index = current_question_index
-                            
-                            # Queue transcription in background (non-blocking)
-                            print(f"📤 Queued transcription for Q{response_question_index + 1} (running in background)")
-                            audio_queue.put((filename, response_question_index))
+                        muted_at = time.perf_counter()
+                        # Root span of the turn: encode, model calls, TTS and the queued transcription nest under it
+                        with tracing.span("turn", question=current_question_index + 1):
+                            # Save audio
+                            audio_data = capture.snapshot()
+                            turn = save_audio(audio_data, current_question_index)
+                            draft = drafter.end_turn(audio_data) if drafter and turn and not FUSED_TURN else None
+                            capture.release(len(audio_data))
+
+                            if turn:
+                                # Get the current question index for this response
+                                response_question_index = current_question_index
                             
-                            # Generate next question immediately (doesn't wait for transcription)
-                            print("🧠 Generating next question (transcription continues in background)...")
-                            response_text = generate_response(filename, response_question_index)
-
-                            if response_text:
-                                print("🎤 Auto-unmuted: You can answer the question now.")
-                                print("💡 Your previous response is being transcribed in the background.\n")
-                                with lock:
-                                    recording = []
+                                if FUSED_TURN:
+                                    response_text = generate_fused_turn(turn, response_question_index)
+                                else:
+                                    # Queue transcription in background (non-blocking)
+                                    print(f"📤 Queued transcription for Q{response_question_index + 1} (running in background)")
+                                    audio_queue.put((turn, response_question_index))
+                                
+                                    if draft:
+                                        # Speculative draft confirmed: skip the full reply round trip
+                                        ask_question(draft)
+                                        response_text = draft
+                                    else:
+                                        # Generate next question immediately (doesn't wait for transcription)
+                                        print("🧠 Generating next question (transcription continues in background)...")
+                                        response_text = generate_response(turn, response_question_index, muted_at)
+
+                                if not is_muted:
+                                    # Barge-in unmuted the mic mid-question (perhaps before any of it was
+                                    # spoken): keep what it has recorded
+                                    note_barge_in()
+                                    if drafter:
+                                        drafter.begin_turn()
+                                elif response_text:
+                                    print("🎤 Auto-unmuted: You can answer the question now.")
+                                    if not FUSED_TURN:
+                                        print("💡 Your previous response is being transcribed in the background.\n")
+                                    capture.release()
+                                    is_muted = False
+                                    if drafter:
+                                        drafter.begin_turn()
+                            else:
+                                # Nothing to send: re-prompt right away instead of waiting on two model calls
+                                print("🎤 I didn't catch that. Please answer again, then type 'm'.")
+                                capture.release()
                                 is_muted = False
+                                if drafter:
+                                    drafter.begin_turn()
 
                 elif cmd == "q":
                     print("\n🛑 Ending interview. Waiting for all tasks to complete...")
@@ -410,20 +584,25 @@ def main():
                     
                     # Save any remaining recording
                     if not is_muted:
-                        with lock:
-                            filename = save_audio(recording)
-                            recording = []
-                        if filename and current_question_index >= 0:
+                        audio_data = capture.snapshot()
+                        turn = save_audio(audio_data, current_question_index)
+                        capture.release(len(audio_data))
+                        if turn and current_question_index >= 0:
                             print(f"📤 Queuing final transcription for Q{current_question_index + 1}")
-                            audio_queue.put((filename, current_question_index))
+                            audio_queue.put((turn, current_question_index))
                     
                     # Wait for all tasks
                     wait_for_active_tasks()
+                    if drafter:
+                        drafter.stop()
+                        print_speculation_summary()
                     
                     # Save final transcript
                     with conversation_lock:
                         save_formatted_transcript()
                     print(f"\n✅ Interview completed! Transcript saved to: {TRANSCRIPT_FILE}")
+                    if tracing.tracer.enabled:
+                        print(f"🧭 Turn trace saved to: {tracing.export()} (open in ui.perfetto.dev)")
                     break
 
     except KeyboardInterrupt:
@@ -433,12 +612,12 @@ def main():
         
         # Save any remaining recording
         if not is_muted:
-            with lock:
-                filename = save_audio(recording)
-                recording = []
-            if filename and current_question_index >= 0:
+            audio_data = capture.snapshot()
+            turn = save_audio(audio_data, current_question_index)
+            capture.release(len(audio_data))
+            if turn and current_question_index >= 0:
                 print(f"📤 Queuing final transcription for Q{current_question_index + 1}")
-                audio_queue.put((filename, current_question_index))
+                audio_queue.put((turn, current_question_index))
         
         # Wait for all tasks to complete
         wait_for_active_tasks()
@@ -449,6 +628,8 @@ def main():
         print(f"✅ Safe shutdown completed! Transcript saved to: {TRANSCRIPT_FILE}")
     
     finally:
+        if archive:
+            archive.close()
         print("\n" + "=" * 80)
         print("👋 Thank you for participating in the interview!")
         print("=" * 80 + "\n")
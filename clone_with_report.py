@@ -1,42 +1,65 @@
 import sounddevice as sd
-import numpy as np
 import wave
 import threading
 import queue
 from datetime import datetime
 from dotenv import load_dotenv
-from google import genai
 from google.genai import types
 import os
 import time
-import json
+from capture_buffer import CaptureBuffer
+from resample import StreamingResampler
+from turn_audio import TurnAudio
+from audio_codec import get_encoder
+from session_archive import SessionArchive
+from vad import trim_silence
+from gemini_pool import get_pool, DEFAULT_MODEL
+from latency_histogram import HistogramSet
+from perf_log import PerformanceSink, iter_records, aggregate
+import tracing
+from scheduler import BACKGROUND
 
 # ====== CONFIG ======
-SAMPLE_RATE = 44100
+SAMPLE_RATE = 44100  # Device capture rate
+TARGET_SAMPLE_RATE = 16000  # Rate of the uploaded WAV, resampled while recording
 CHANNELS = 1
 CHUNK_SIZE = 1024
 TRANSCRIPT_FILE = "conversation.txt"
 PERFORMANCE_LOG = "performance_report.txt"
-PERFORMANCE_JSON = "performance_data.json"
+PERFORMANCE_JSONL = "performance_data.jsonl"  # One record per turn, appended by a background writer
+PERFORMANCE_HISTOGRAMS = "performance_histograms.json"  # Latency histograms merged across sessions
+UPLOAD_CODEC = "flac"  # "wav", "flac" (lossless) or "opus" (lossy, smallest)
+TRIM_SILENCE = True  # Cut silence and skip turns without speech before any model call
+ARCHIVE_TURNS = True  # Append every turn to one session archive (see session_archive.py)
 # ====================
 
 load_dotenv()
 
 # Global state
 is_muted = True
-recording = []
-lock = threading.Lock()
+capture = CaptureBuffer(TARGET_SAMPLE_RATE, CHANNELS)  # Written by audio_callback, no lock needed
+resampler = StreamingResampler(SAMPLE_RATE, TARGET_SAMPLE_RATE, CHANNELS)
 stop_threads = False
 audio_queue = queue.Queue()
-performance_data = []
+perf_sink = PerformanceSink(PERFORMANCE_JSONL)
 session_start_time = None
+run_id = None  # Tags this run's records in the shared JSONL log
 
-client = genai.Client()
+gemini = get_pool()  # Shared async client: one connection pool, bounded concurrency
+upload_encoder = get_encoder(UPLOAD_CODEC)
+archive = SessionArchive(sample_rate=TARGET_SAMPLE_RATE, channels=CHANNELS) if ARCHIVE_TURNS else None
 
 # ========== PERFORMANCE TRACKING ==========
 
 class PerformanceTracker:
-    """Track timing for various operations."""
+    """Track timing for various operations.
+
+    Every finished stage is also recorded into the class-wide
+    ``histograms`` (per stage and model), which back the percentile
+    tables of the aggregate report.
+    """
+
+    histograms = HistogramSet()
     
     def __init__(self):
         self.data = {
@@ -45,9 +68,11 @@ class PerformanceTracker:
             'audio_save_time': 0,
             'audio_duration': 0,
             'audio_size_kb': 0,
+            'transcription_model': None,
             'transcription_start': None,
             'transcription_end': None,
             'transcription_duration': 0,
+            'response_model': None,
             'response_start': None,
             'response_end': None,
             'response_duration': 0,
@@ -65,20 +90,25 @@ class PerformanceTracker:
         self.data['audio_duration'] = duration
         self.data['audio_size_kb'] = size_kb
     
-    def start_transcription(self):
+    def start_transcription(self, model=DEFAULT_MODEL):
+        self.data['transcription_model'] = model
         self.data['transcription_start'] = time.time()
     
     def end_transcription(self, success=True):
         self.data['transcription_end'] = time.time()
         self.data['transcription_duration'] = self.data['transcription_end'] - self.data['transcription_start']
         self.data['transcription_success'] = success
+        if success:
+            self.histograms.record('transcription', self.data['transcription_model'], self.data['transcription_duration'])
     
-    def start_response(self):
+    def start_response(self, model=DEFAULT_MODEL):
+        self.data['response_model'] = model
         self.data['response_start'] = time.time()
     
     def mark_first_chunk(self):
         if self.data['response_first_chunk_time'] == 0:
             self.data['response_first_chunk_time'] = time.time() - self.data['response_start']
+            self.histograms.record('first_chunk', self.data['response_model'], self.data['response_first_chunk_time'])
     
     def increment_chunk(self):
         self.data['response_chunk_count'] += 1
@@ -91,6 +121,8 @@ class PerformanceTracker:
             self.data['transcription_duration'],
             self.data['response_duration']
         )
+        if success:
+            self.histograms.record('response', self.data['response_model'], self.data['response_duration'])
     
     def add_error(self, error_msg):
         self.data['errors'].append(error_msg)
@@ -101,12 +133,8 @@ class PerformanceTracker:
 
 def save_performance_report(tracker_data):
     """Save detailed performance report to files."""
-    global performance_data
-    performance_data.append(tracker_data)
-    
-    # Save JSON for machine-readable data
-    with open(PERFORMANCE_JSON, 'w') as f:
-        json.dump(performance_data, f, indent=2)
+    # Machine-readable record: queued for the background JSONL writer
+    perf_sink.write(dict(tracker_data, run_id=run_id))
     
     # Generate human-readable report
     with open(PERFORMANCE_LOG, 'a') as f:
@@ -174,20 +202,15 @@ def save_performance_report(tracker_data):
 
 # ========== GEMINI LOGIC ==========
 
-def transcribe_audio_background(filename, tracker):
+def transcribe_audio_background(turn, tracker):
     """Background transcription (non-blocking) - runs in parallel."""
     tracker.start_transcription()
     try:
-        with open(filename, "rb") as f:
-            audio_bytes = f.read()
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                "Transcribe this user audio clearly.",
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        # Prompt is far below the cacheable size, so it goes inline
+        response = gemini.run_sync(gemini.generate([
+            "Transcribe this user audio clearly.",
+            types.Part.from_bytes(data=turn.data, mime_type=turn.mime_type),
+        ], priority=BACKGROUND))
         text = response.text.strip()
         tracker.end_transcription(success=True)
         append_to_log("USER (transcribed)", text)
@@ -198,21 +221,15 @@ def transcribe_audio_background(filename, tracker):
         print(f"\n⚠️ Background transcription failed: {e}")
 
 
-def generate_response_stream(filename, tracker):
+def generate_response_stream(turn, tracker):
     """Generate conversational reply with streaming (blocking until complete)."""
     tracker.start_response()
     try:
-        with open(filename, "rb") as f:
-            audio_bytes = f.read()
-
         # Stream the response
-        response = client.models.generate_content_stream(
-            model="gemini-2.5-flash",
-            contents=[
-                "Listen to the user audio and generate an appropriate, natural response.",
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        response = gemini.iterate_sync(gemini.reply_stream(
+            turn,
+            prompt="Listen to the user audio and generate an appropriate, natural response.",
+        ))
 
         print("\n🤖 Gemini: ", end="", flush=True)
         full_response = ""
@@ -242,36 +259,31 @@ def generate_response_stream(filename, tracker):
 
 # ========== AUDIO HANDLING ==========
 def save_audio(audio_data):
-    """Save audio chunks to a WAV file and return timing info."""
+    """Encode captured int16 frames into an in-memory turn and archive the raw PCM."""
     if len(audio_data) == 0:
-        return None, 0, 0, 0
-
-    start_time = time.time()
-    filename = f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-    audio_data = np.concatenate(audio_data, axis=0)
+        return None
 
-    with wave.open(filename, "wb") as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
+    if TRIM_SILENCE:
+        with tracing.span("vad.trim"):
+            audio_data = trim_silence(audio_data, TARGET_SAMPLE_RATE)
+        if audio_data is None:
+            print("🤫 No speech detected in this turn, skipping upload")
+            return None
 
-    save_time = time.time() - start_time
-    
-    # Calculate audio duration and file size
-    audio_duration = len(audio_data) / SAMPLE_RATE
-    file_size_kb = os.path.getsize(filename) / 1024
-
-    print(f"💾 Saved: {filename} ({file_size_kb:.2f} KB, {audio_duration:.2f}s) in {save_time*1000:.2f}ms")
-    return filename, save_time, audio_duration, file_size_kb
+    turn = TurnAudio(audio_data, TARGET_SAMPLE_RATE, CHANNELS, encoder=upload_encoder)
+    print(f"💾 Encoded: {turn.size_kb:.2f} KB, {turn.duration:.2f}s in {turn.encode_time*1000:.2f}ms")
+    if archive:
+        with tracing.span("archive"):
+            record = archive.append_turn(audio_data)
+        turn.archive_ref = archive.label(record)
+        print(f"💾 Archived: {turn.archive_ref}")
+    return turn
 
 
 def audio_callback(indata, frames, time, status):
     """Capture mic input when unmuted."""
-    global recording
     if not is_muted:
-        with lock:
-            recording.append(indata.copy())
+        capture.write(resampler.process(indata))
 
 
 # ========== BACKGROUND THREAD ==========
@@ -279,11 +291,12 @@ def background_transcription_worker():
     """Handles transcription tasks from the queue asynchronously."""
     while not stop_threads:
         try:
-            filename, tracker = audio_queue.get(timeout=1)
+            turn, tracker, parent = audio_queue.get(timeout=1)
         except queue.Empty:
             continue
 
-        transcribe_audio_background(filename, tracker)
+        with tracing.attach(parent):
+            transcribe_audio_background(turn, tracker)
         audio_queue.task_done()
 
 
@@ -295,112 +308,134 @@ def append_to_log(speaker, text):
 
 
 def generate_aggregate_report():
-    """Generate aggregate statistics from all sessions."""
-    if not performance_data:
+    """Generate aggregate statistics: this session's turns plus latency percentiles over all stored sessions."""
+    perf_sink.flush()
+    session = aggregate(iter_records(PERFORMANCE_JSONL, run_id=run_id))
+    if not session.turns:
         return
+
+    # Fold this session into the stored histograms so the all-time table covers every run
+    session_histograms = PerformanceTracker.histograms
+    all_histograms = HistogramSet.load(PERFORMANCE_HISTOGRAMS).merge(session_histograms)
+    all_histograms.save(PERFORMANCE_HISTOGRAMS)
     
     with open(PERFORMANCE_LOG, 'a') as f:
         f.write("\n" + "=" * 80 + "\n")
         f.write("📈 AGGREGATE STATISTICS\n")
         f.write("=" * 80 + "\n\n")
         
-        total_sessions = len(performance_data)
-        successful_transcriptions = sum(1 for d in performance_data if d['transcription_success'])
-        successful_responses = sum(1 for d in performance_data if d['response_success'])
-        
-        avg_transcription_time = np.mean([d['transcription_duration'] for d in performance_data if d['transcription_duration'] > 0])
-        avg_response_time = np.mean([d['response_duration'] for d in performance_data if d['response_duration'] > 0])
-        avg_first_chunk_time = np.mean([d['response_first_chunk_time'] for d in performance_data if d['response_first_chunk_time'] > 0])
+        total_sessions = session.turns
+        successful_transcriptions = session.transcriptions_ok
+        successful_responses = session.responses_ok
         
         f.write(f"Total Sessions: {total_sessions}\n")
         f.write(f"Successful Transcriptions: {successful_transcriptions}/{total_sessions} ({successful_transcriptions/total_sessions*100:.1f}%)\n")
         f.write(f"Successful Responses: {successful_responses}/{total_sessions} ({successful_responses/total_sessions*100:.1f}%)\n\n")
         
-        f.write(f"Average Transcription Time: {avg_transcription_time:.3f}s\n")
-        f.write(f"Average Response Time: {avg_response_time:.3f}s\n")
-        f.write(f"Average Time to First Chunk: {avg_first_chunk_time*1000:.2f}ms\n\n")
+        f.write("Latency (this session):\n")
+        f.write("\n".join(session_histograms.report_lines()) + "\n\n")
+        f.write(f"Latency (all sessions, {PERFORMANCE_HISTOGRAMS}):\n")
+        f.write("\n".join(all_histograms.report_lines()) + "\n\n")
         
         f.write("=" * 80 + "\n\n")
 
 
 # ========== MAIN LOOP ==========
 def main():
-    global is_muted, recording, stop_threads, session_start_time
+    global is_muted, stop_threads, session_start_time, run_id
 
     session_start_time = time.time()
+    run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    perf_sink.start()
     
     print("🎙️ Type 'm' to toggle mute/unmute. Type 'q' to quit.")
     print(f"📊 Performance logs will be saved to: {PERFORMANCE_LOG}")
-    print(f"📊 Performance data will be saved to: {PERFORMANCE_JSON}\n")
+    print(f"📊 Performance data will be saved to: {PERFORMANCE_JSONL}\n")
     
     transcription_thread = threading.Thread(target=background_transcription_worker, daemon=True)
     transcription_thread.start()
+    gemini.submit(gemini.warm_up(prompts=()))
 
-    with sd.InputStream(channels=CHANNELS, samplerate=SAMPLE_RATE,
-                        blocksize=CHUNK_SIZE, callback=audio_callback):
-
-        is_muted = False
-        print("🎤 Listening... Speak now.")
-
-        while True:
-            cmd = input("> ").strip().lower()
+    try:
+        with sd.InputStream(channels=CHANNELS, samplerate=SAMPLE_RATE,
+                            blocksize=CHUNK_SIZE, callback=audio_callback):
 
-            if cmd == "m":
-                if is_muted:
-                    print("🎤 Unmuted: Ready to record again...")
-                    with lock:
-                        recording = []
-                    is_muted = False
+            is_muted = False
+            print("🎤 Listening... Speak now.")
 
-                else:
-                    print("🔇 Muted: Saving audio...")
-                    is_muted = True
+            while True:
+                cmd = input("> ").strip().lower()
 
-                    # Create performance tracker for this session
-                    tracker = PerformanceTracker()
+                if cmd == "m":
+                    if is_muted:
+                        print("🎤 Unmuted: Ready to record again...")
+                        capture.release()
+                        resampler.reset()
+                        is_muted = False
 
-                    # Save audio
-                    with lock:
-                        filename, save_time, duration, size_kb = save_audio(recording)
-                        recording = []
+                    else:
+                        print("🔇 Muted: Saving audio...")
+                        is_muted = True
 
-                    if filename:
-                        tracker.set_audio_info(filename, save_time, duration, size_kb)
-                        
-                        # Start background transcription (non-blocking)
-                        audio_queue.put((filename, tracker))
-                        print("📝 Transcription started in background...")
-
-                        # Generate streaming response (blocking - suspends program)
-                        print("🧠 Generating response (streaming)...")
-                        response_text = generate_response_stream(filename, tracker)
-
-                        # Save performance report
-                        save_performance_report(tracker.get_summary())
-
-                        # After response completes, automatically unmute
-                        if response_text:
-                            print("🎤 Auto-unmuted: You can speak again.\n")
-                            with lock:
-                                recording = []
-                            is_muted = False
-
-            elif cmd == "q":
-                print("🛑 Exiting gracefully...")
-                stop_threads = True
-                if not is_muted:
-                    with lock:
-                        filename, save_time, duration, size_kb = save_audio(recording)
-                    if filename:
+                        # Create performance tracker for this session
                         tracker = PerformanceTracker()
-                        tracker.set_audio_info(filename, save_time, duration, size_kb)
-                        audio_queue.put((filename, tracker))
+                        with tracing.span("turn", session=tracker.data['session_id']):
+                            # Save audio
+                            audio_data = capture.snapshot()
+                            turn = save_audio(audio_data)
+                            capture.release(len(audio_data))
+
+                            if turn:
+                                tracker.set_audio_info(turn.archive_ref, turn.encode_time, turn.duration, turn.size_kb)
+                        
+                                # Start background transcription (non-blocking)
+                                audio_queue.put((turn, tracker, tracing.current()))
+                                print("📝 Transcription started in background...")
+
+                                # Generate streaming response (blocking - suspends program)
+                                print("🧠 Generating response (streaming)...")
+                                response_text = generate_response_stream(turn, tracker)
+
+                                # Save performance report
+                                save_performance_report(tracker.get_summary())
+
+                                # After response completes, automatically unmute
+                                if response_text:
+                                    print("🎤 Auto-unmuted: You can speak again.\n")
+                                    capture.release()
+                                    resampler.reset()
+                                    is_muted = False
+                            else:
+                                # Nothing to send: re-prompt right away instead of waiting on two model calls
+                                print("🎤 Nothing heard, please speak again.\n")
+                                capture.release()
+                                resampler.reset()
+                                is_muted = False
+
+                elif cmd == "q":
+                    print("🛑 Exiting gracefully...")
+                    stop_threads = True
+                    if not is_muted:
+                        audio_data = capture.snapshot()
+                        turn = save_audio(audio_data)
+                        if turn:
+                            tracker = PerformanceTracker()
+                            tracker.set_audio_info(turn.archive_ref, turn.encode_time, turn.duration, turn.size_kb)
+                            audio_queue.put((turn, tracker, tracing.current()))
                 
-                # Generate aggregate report
-                time.sleep(2)  # Wait for background tasks to complete
-                generate_aggregate_report()
-                print(f"\n📊 Performance reports saved to:\n  - {PERFORMANCE_LOG}\n  - {PERFORMANCE_JSON}")
-                break
+                    # Generate aggregate report
+                    time.sleep(2)  # Wait for background tasks to complete
+                    generate_aggregate_report()
+                    if tracing.tracer.enabled:
+                        print(f"🧭 Turn trace saved to: {tracing.export()} (open in ui.perfetto.dev)")
+                    print(f"\n📊 Performance reports saved to:\n  - {PERFORMANCE_LOG}\n  - {PERFORMANCE_JSONL}\n  - {PERFORMANCE_HISTOGRAMS}")
+                    break
+
+    finally:
+        # Any exit, Ctrl+C included: both writers are daemon threads and would drop what is still queued
+        perf_sink.close()
+        if archive:
+            archive.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,219 @@
+import collections
+import threading
+
+import numpy as np
+
+from resample import StreamingResampler
+
+# ====== CONFIG ======
+BLOCK_SIZE = 256            # Samples per adaptation step (16 ms at 16 kHz); also the added latency
+FILTER_SECONDS = 0.2        # Echo path length covered: device latencies plus room reverberation
+STEP_SIZE = 0.5             # Normalized step (0..1): faster convergence vs. less misadjustment
+POWER_SMOOTHING = 0.9       # Per-bin reference power (summed over the filter span) average normalizing the step
+REGULARIZATION = 0.1        # Fraction of the mean bin power added to every bin; doubled after each divergence
+MAX_REGULARIZATION = 4.0
+DIVERGENCE_RATIO = 4.0      # Output this many times the mic energy means the filter has gone wrong
+DOUBLE_TALK_RATIO = 0.7     # Geigel detector: mic peak above this x recent reference peak freezes adaptation
+MIN_REFERENCE_RMS = 1e-4    # No adaptation while nothing is playing
+REFERENCE_PREFILL = 0.02    # Seconds of playback held back before the capture side reads it
+REFERENCE_MAX_SECONDS = 0.5  # Older playback is dropped if the capture side falls this far behind
+DRIFT_GAIN = 0.2            # Fraction of the fill error corrected per second (input/output clock drift)
+DRIFT_SMOOTHING_SECONDS = 0.5  # Averaging of the fill level, jagged with the two block sizes
+DRIFT_SETTLE_SECONDS = 1.0  # Reading time after priming whose average fill becomes the level to hold
+DRIFT_MAX_PPM = 500.0       # Largest read-rate correction
+# ====================
+
+
+class EchoCanceller:
+    """Removes the interviewer's own voice from the mic with a frequency-domain adaptive filter.
+
+    A partitioned-block FDAF (overlap-save, normalized per frequency bin)
+    models the speaker-to-mic echo path from the playback signal and
+    subtracts its estimate from the capture. The filter is split into
+    ``BLOCK_SIZE`` partitions, so latency stays at one block however long
+    the echo path is, and every partition is updated in one vectorized
+    FFT. Adaptation pauses while nothing plays and while the candidate
+    talks over the playback (double talk), so their voice is not
+    cancelled along with the echo. Narrowband playback (hum, pure tones)
+    leaves most bins unexcited and can make the per-bin normalization
+    diverge; when the output grows louder than the mic the filter is
+    reset with stronger regularization and that block passes through.
+
+    :meth:`process` takes any number of mono samples and returns as many,
+    delayed by ``block_size``.
+    """
+
+    def __init__(self, sample_rate, filter_seconds=FILTER_SECONDS, block_size=BLOCK_SIZE,
+                 step_size=STEP_SIZE):
+        self.sample_rate = sample_rate
+        self.block_size = n = block_size
+        self.partitions = max(1, int(np.ceil(filter_seconds * sample_rate / n)))
+        self.step_size = step_size
+        self.regularization = REGULARIZATION
+        self.divergences = 0
+        self.reset()
+
+    def reset(self):
+        n, p = self.block_size, self.partitions
+        self._weights = np.zeros((p, n + 1), dtype=np.complex128)
+        self._spectra = np.zeros((p, n + 1), dtype=np.complex128)  # Newest reference block first
+        self._power = np.full(n + 1, 1e-6)
+        self._last_ref = np.zeros(n)
+        self._ref_peaks = collections.deque(maxlen=p)
+        self._mic_in = np.zeros(0, dtype=np.float32)
+        self._ref_in = np.zeros(0, dtype=np.float32)
+        self._out = np.zeros(n, dtype=np.float32)  # Primed with one block: output length == input length
+        self.blocks = 0
+        self.adapted = 0
+
+    def _block(self, mic, ref):
+        n = self.block_size
+        spectrum = np.fft.rfft(np.concatenate((self._last_ref, ref)))
+        self._last_ref = ref
+        self._spectra = np.roll(self._spectra, 1, axis=0)
+        self._spectra[0] = spectrum
+
+        echo = np.fft.irfft((self._weights * self._spectra).sum(axis=0))[n:]
+        error = mic - echo
+        self.blocks += 1
+        if np.dot(error, error) > DIVERGENCE_RATIO * np.dot(mic, mic) + 1e-9:
+            self._weights[:] = 0
+            self.regularization = min(2 * self.regularization, MAX_REGULARIZATION)
+            self.divergences += 1
+            return mic
+
+        ref_peak = np.abs(ref).max()
+        self._ref_peaks.append(ref_peak)
+        if np.sqrt(np.mean(ref * ref)) < MIN_REFERENCE_RMS:
+            return error
+        if np.abs(mic).max() > DOUBLE_TALK_RATIO * max(self._ref_peaks):
+            return error
+
+        span_power = (self._spectra.real ** 2 + self._spectra.imag ** 2).sum(axis=0)
+        # Never below the current power, so a sudden loud bin can't take an over-sized step
+        self._power = np.maximum(POWER_SMOOTHING * self._power + (1 - POWER_SMOOTHING) * span_power, span_power)
+        error_spectrum = np.fft.rfft(np.concatenate((np.zeros(n), error)))
+        norm = self._power + self.regularization * self._power.mean()
+        gradient = self._spectra.conj() * (error_spectrum / norm)
+        # Gradient constraint: keep each partition a causal block_size-tap filter
+        taps = np.fft.irfft(gradient, axis=1)[:, :n]
+        self._weights += self.step_size * np.fft.rfft(np.concatenate((taps, np.zeros_like(taps)), axis=1), axis=1)
+        self.adapted += 1
+        return error
+
+    def process(self, mic, ref):
+        """Cancel echo of ``ref`` (the playback, same rate and length) in mono ``mic``; returns float32 like ``mic``."""
+        shape = np.shape(mic)
+        self._mic_in = np.concatenate((self._mic_in, np.asarray(mic, dtype=np.float32).reshape(-1)))
+        self._ref_in = np.concatenate((self._ref_in, np.asarray(ref, dtype=np.float32).reshape(-1)))
+        n = self.block_size
+        done = []
+        while len(self._mic_in) >= n:
+            done.append(self._block(self._mic_in[:n].astype(np.float64), self._ref_in[:n].astype(np.float64)))
+            self._mic_in, self._ref_in = self._mic_in[n:], self._ref_in[n:]
+        if done:
+            self._out = np.concatenate([self._out] + done).astype(np.float32)
+        out, self._out = self._out[:shape[0]], self._out[shape[0]:]
+        return np.clip(out, -1.0, 1.0).reshape(shape)
+
+
+class EchoReference:
+    """What the speaker is playing, handed from the output callback to the capture callback.
+
+    :class:`~tts_player.SpeechPlayer` writes every block it outputs
+    (silence included) and the capture side reads as many samples as it
+    captured, at its own rate. Reading starts once ``REFERENCE_PREFILL``
+    is buffered, which keeps the reference at or ahead of the echo it
+    explains; from then on the reference advances in step with the
+    capture clock:
+
+    - Input and output clocks drift apart by up to a few hundred ppm, so
+      the buffer would slowly drain or fill. The reader consumes
+      ``1 + drift`` samples per captured sample (linear interpolation),
+      with ``drift`` steered by the smoothed fill level back towards the
+      level it settled at after priming, and kept within ``DRIFT_MAX_PPM``.
+    - An underrun (the output callback running late) reads as silence.
+      The samples it missed are skipped once they arrive, rather than
+      re-priming, so the reference keeps its alignment with the echo.
+      Only a stall longer than ``max_seconds`` starts over.
+    """
+
+    def __init__(self, rate, source_rate, prefill=REFERENCE_PREFILL, max_seconds=REFERENCE_MAX_SECONDS):
+        self.rate = rate
+        self.prefill = int(prefill * rate)
+        self.max_samples = int(max_seconds * rate)
+        self.resampler = StreamingResampler(source_rate, rate, 1)
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._pos = 0.0    # Fractional read position in _buffer; runs past its end during an underrun
+        self._fill = 0.0   # Smoothed fill level (samples)
+        self._target = None  # Fill level held by the drift correction, once settled
+        self._since = 0      # Samples read since priming
+        self._primed = False
+        self._lock = threading.Lock()
+        self.drift = 0.0   # Extra samples consumed per captured sample
+        self.underruns = 0
+
+    def write(self, block):
+        """Output side: one (frames, channels) float32 block as sent to the device."""
+        mono = np.asarray(block, dtype=np.float32)
+        if mono.ndim == 2:
+            mono = mono.mean(axis=1)
+        samples = self.resampler.process(mono[:, None])[:, 0]
+        with self._lock:
+            self._buffer = np.concatenate((self._buffer, samples))
+            excess = len(self._buffer) - self.max_samples
+            if excess > 0:
+                # Capture side stalled or not started: keep only the most recent playback
+                self._buffer = self._buffer[excess:]
+                self._pos = max(0.0, self._pos - excess)
+
+    def read(self, frames):
+        """Capture side: the next ``frames`` reference samples (silence until primed or while starved)."""
+        out = np.zeros(frames, dtype=np.float32)
+        with self._lock:
+            if not self._primed:
+                if len(self._buffer) < self.prefill + frames:
+                    return out
+                # Leave the prefill after this read: any more backlog is output-callback jitter, not latency
+                self._primed = True
+                self._pos = float(len(self._buffer) - self.prefill - frames)
+                self._fill = float(self.prefill)
+                self._target = None
+                self._since = 0
+                self.drift = 0.0
+
+            step = 1.0 + self.drift
+            positions = self._pos + step * np.arange(frames)
+            available = int(np.searchsorted(positions, len(self._buffer) - 1, side="left"))
+            if available < frames:
+                self.underruns += 1
+            if available:
+                base = positions[:available].astype(np.int64)
+                frac = (positions[:available] - base).astype(np.float32)
+                out[:available] = self._buffer[base] * (1 - frac) + self._buffer[base + 1] * frac
+            self._pos += step * frames
+
+            if self._pos - len(self._buffer) > self.max_samples:
+                # The output side is gone (stream closed or stalled): start over once it is back
+                self._buffer = self._buffer[:0]
+                self._primed = False
+                return out
+            drop = min(int(self._pos), len(self._buffer))
+            self._buffer = self._buffer[drop:]
+            self._pos -= drop
+
+            # Steer the read rate so the fill level stays where it settled
+            fill = len(self._buffer) - self._pos
+            self._fill += min(1.0, frames / (DRIFT_SMOOTHING_SECONDS * self.rate)) * (fill - self._fill)
+            self._since += frames
+            if self._target is None:
+                if self._since >= DRIFT_SETTLE_SECONDS * self.rate:
+                    self._target = self._fill
+            else:
+                limit = DRIFT_MAX_PPM * 1e-6
+                self.drift = min(limit, max(-limit, DRIFT_GAIN * (self._fill - self._target) / self.rate))
+        return out
+
+    @property
+    def drift_ppm(self):
+        return self.drift * 1e6
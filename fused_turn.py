@@ -0,0 +1,86 @@
+import json
+
+from google.genai import types
+
+from prompt import fused_turn_prompt
+
+# ====== CONFIG ======
+FUSED_MODEL = "gemini-2.5-flash"
+# ====================
+
+FUSED_TURN_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "conversation": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "speaker": {"type": "STRING"},
+                    "text": {"type": "STRING"},
+                },
+                "required": ["speaker", "text"],
+            },
+        },
+        "next_question": {"type": "STRING"},
+    },
+    "required": ["conversation", "next_question"],
+}
+
+
+def usage_summary(response):
+    """Token counts of a generate_content response as a plain dict."""
+    usage = response.usage_metadata
+    if usage is None:
+        return {"prompt_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    return {
+        "prompt_tokens": usage.prompt_token_count or 0,
+        "output_tokens": usage.candidates_token_count or 0,
+        "total_tokens": usage.total_token_count or 0,
+    }
+
+
+def candidate_text(conversation):
+    """Join the candidate's lines out of a transcribed ``conversation`` list."""
+    lines = []
+    for item in conversation:
+        speaker = item.get("speaker", "")
+        # Look for candidate/Speaker2 responses
+        if "candidate" in speaker.lower() or speaker == "Speaker2" or speaker == "Speaker1":
+            text = item.get("text", "")
+            if text:
+                lines.append(text)
+    return " ".join(lines)
+
+
+def fused_turn_request(turn):
+    """``(contents, config)`` for a fused generate_content call on ``turn``."""
+    contents = [
+        fused_turn_prompt,
+        types.Part.from_bytes(data=turn.data, mime_type=turn.mime_type),
+    ]
+    config = types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_schema=FUSED_TURN_SCHEMA,
+    )
+    return contents, config
+
+
+def parse_fused_response(response):
+    """Turn a fused response into ``{"conversation", "next_question", "usage"}``.
+
+    Raises if the model ignored the response schema.
+    """
+    parsed = json.loads(response.text)
+    return {
+        "conversation": parsed.get("conversation", []),
+        "next_question": parsed.get("next_question", "").strip(),
+        "usage": usage_summary(response),
+    }
+
+
+def fused_turn(client, turn, model=FUSED_MODEL):
+    """Transcribe the turn and draft the next question in a single call."""
+    contents, config = fused_turn_request(turn)
+    response = client.models.generate_content(model=model, contents=contents, config=config)
+    return parse_fused_response(response)
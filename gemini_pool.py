@@ -0,0 +1,282 @@
+import asyncio
+import contextlib
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from google import genai
+from google.genai import types
+
+from fused_turn import FUSED_MODEL, fused_turn_request, parse_fused_response
+from prompt import prompt_template, interviewer_prompt
+from prompt_cache import PromptCache
+from resilience import Resilience
+from scheduler import RequestScheduler, INTERACTIVE, BACKGROUND, MAX_CONCURRENCY
+import tracing
+
+# ====== CONFIG ======
+DEFAULT_MODEL = "gemini-2.5-flash"
+# ====================
+
+
+class GeminiPool:
+    """One shared Gemini client, driven through ``client.aio`` on its own loop.
+
+    All requests run on a private event loop thread, so they share one
+    keep-alive HTTP connection pool and one :class:`RequestScheduler`
+    (priority classes, concurrency caps, rate limit) whichever thread or
+    event loop they come from. Every call is retried, circuit-broken and
+    (for interactive calls) hedged by :class:`Resilience`:
+
+    * threaded scripts call ``pool.run_sync(pool.transcribe(turn))``
+    * asyncio apps simply ``await pool.transcribe(turn)``
+    """
+
+    def __init__(self, client=None, max_concurrency=MAX_CONCURRENCY, resilience=None):
+        self.client = client or genai.Client()
+        self.max_concurrency = max_concurrency
+        self.resilience = resilience or Resilience()
+        self._loop = None
+        self._thread = None
+        self.scheduler = None
+        self._start_lock = threading.Lock()
+        self._prompt_caches = {}
+
+    # ---------- event loop plumbing ----------
+
+    def start(self):
+        """Start the private event loop thread (idempotent)."""
+        with self._start_lock:
+            if self._loop is not None:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                self.scheduler = RequestScheduler(self.max_concurrency)
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=_run, name="gemini-pool", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            return loop
+
+    def submit(self, coro):
+        """Schedule ``coro`` on the pool loop and return a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.start())
+
+    def run_sync(self, coro, timeout=None):
+        """Run ``coro`` on the pool loop and block the calling thread for the result."""
+        return self.submit(coro).result(timeout)
+
+    def iterate_sync(self, agen):
+        """Iterate an async generator from a regular thread; closing the iterator closes it."""
+        try:
+            while True:
+                try:
+                    yield self.run_sync(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Left early (e.g. the speech was cut off): end the stream now, releasing its slot
+            self.run_sync(agen.aclose())
+
+    async def _on_pool_loop(self, coro):
+        """Await ``coro`` on the pool loop even when called from another loop."""
+        loop = self.start()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    # ---------- model calls ----------
+
+    async def call(self, fn, *args, priority=INTERACTIVE):
+        """Run a blocking call (e.g. gTTS) in a worker thread under a scheduler slot."""
+        async def _call():
+            with tracing.span("pool.call", fn=getattr(fn, "__qualname__", str(fn)), priority=priority):
+                async with self.scheduler.slot(priority):
+                    return await asyncio.to_thread(fn, *args)
+        return await self._on_pool_loop(_call())
+
+    async def generate(self, contents, model=DEFAULT_MODEL, config=None, priority=INTERACTIVE):
+        """Scheduled ``client.aio.models.generate_content``."""
+        async def _call():
+            with tracing.span("gemini.generate", model=model, priority=priority):
+                return await self.resilience.call(
+                    model,
+                    lambda m: self.client.aio.models.generate_content(
+                        model=m, contents=contents, config=config,
+                    ),
+                    hedge=priority == INTERACTIVE,
+                    slot=lambda: self.scheduler.slot(priority),
+                )
+        return await self._on_pool_loop(_call())
+
+    async def generate_stream(self, contents, model=DEFAULT_MODEL, config=None, priority=INTERACTIVE):
+        """Scheduled ``generate_content_stream``; yields response chunks.
+
+        The scheduler slot is held until the stream is exhausted or closed.
+        """
+        loop = self.start()
+        stream = self._stream(contents, model, config, priority)
+        try:
+            while True:
+                try:
+                    if asyncio.get_running_loop() is loop:
+                        chunk = await stream.__anext__()
+                    else:
+                        chunk = await asyncio.wrap_future(
+                            asyncio.run_coroutine_threadsafe(stream.__anext__(), loop))
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            await self._on_pool_loop(stream.aclose())
+
+    async def _stream(self, contents, model, config, priority):
+        # Each chunk is pulled by a different task, so the span is recorded by hand rather than entered
+        parent = tracing.current()
+        opened = time.perf_counter_ns()
+        first = None
+        held = contextlib.AsyncExitStack()
+
+        async def _open(m):
+            # Each try takes its own slot; the one that opens the stream keeps it until the stream ends
+            await held.enter_async_context(self.scheduler.slot(priority))
+            try:
+                return await self.client.aio.models.generate_content_stream(
+                    model=m, contents=contents, config=config,
+                )
+            except BaseException:
+                await held.aclose()
+                raise
+
+        try:
+            async with held:
+                # Only opening the stream is retried; chunks already yielded can't be replayed
+                response = await self.resilience.call(model, _open, kind="stream_open")
+                async for chunk in response:
+                    if first is None:
+                        first = time.perf_counter_ns()
+                        tracing.record_interval("first_chunk", opened, first, parent, model=model)
+                    yield chunk
+        finally:
+            tracing.record_interval("gemini.stream", opened, time.perf_counter_ns(), parent,
+                                    model=model, priority=priority)
+
+    def prompt_cache(self, prompt, model=DEFAULT_MODEL):
+        """Shared :class:`PromptCache` for a static prompt/model pair."""
+        key = (model, prompt)
+        if key not in self._prompt_caches:
+            self._prompt_caches[key] = PromptCache(self.client, model, prompt)
+        return self._prompt_caches[key]
+
+    async def transcribe(self, turn, prompt=prompt_template, model=DEFAULT_MODEL, priority=BACKGROUND):
+        """Transcription call; the static prompt is sent through the prompt cache."""
+        cache = self.prompt_cache(prompt, model)
+        part = types.Part.from_bytes(data=turn.data, mime_type=turn.mime_type)
+
+        async def _call():
+            with tracing.span("gemini.transcribe", model=model, priority=priority):
+                return await self.resilience.call(model, lambda m: cache.generate_content_async([part]),
+                                                  slot=lambda: self.scheduler.slot(priority))
+        return await self._on_pool_loop(_call())
+
+    async def reply(self, turn, prompt=interviewer_prompt, model=DEFAULT_MODEL, priority=INTERACTIVE):
+        """Interviewer reply to the candidate's turn."""
+        part = types.Part.from_bytes(data=turn.data, mime_type=turn.mime_type)
+        return await self.generate([prompt, part], model=model, priority=priority)
+
+    def reply_stream(self, turn, prompt=interviewer_prompt, model=DEFAULT_MODEL, priority=INTERACTIVE):
+        """Streaming interviewer reply (async generator of chunks)."""
+        part = types.Part.from_bytes(data=turn.data, mime_type=turn.mime_type)
+        return self.generate_stream([prompt, part], model=model, priority=priority)
+
+    async def fused(self, turn, model=FUSED_MODEL):
+        """Transcript and next question from one structured call (see fused_turn.py)."""
+        contents, config = fused_turn_request(turn)
+        response = await self.generate(contents, model=model, config=config)
+        with tracing.span("parse"):
+            return parse_fused_response(response)
+
+    async def warm_up(self, model=DEFAULT_MODEL, prompts=(prompt_template,)):
+        """Open the HTTPS connection (DNS + TLS) and register cached prompts before the first turn."""
+        async def _warm():
+            await self.client.aio.models.get(model=model)
+            for prompt in prompts:
+                await asyncio.to_thread(self.prompt_cache(prompt, model).warm_up)
+        try:
+            await self._on_pool_loop(_warm())
+            print("🔌 Gemini connection warmed up")
+        except Exception as e:
+            print(f"⚠️ Gemini warm-up failed: {e}")
+
+
+# ========== HTTP TRACING ==========
+
+async def _trace_request(request):
+    request.extensions["trace_sent_ns"] = time.perf_counter_ns()
+
+
+async def _trace_response(response):
+    # Runs in the task that made the request, so the current span is the retry attempt
+    sent = response.request.extensions.get("trace_sent_ns")
+    if sent is not None:
+        tracing.record_interval("http.upload+wait", sent, time.perf_counter_ns(), tracing.current(),
+                                status=response.status_code)
+
+
+def traced_http_options(http_options=None):
+    """``http_options`` plus httpx hooks that time each request until its response headers arrive.
+
+    The rest of an attempt span after that interval is reading the body
+    and parsing it in the SDK.
+    """
+    if not tracing.tracer.enabled:
+        return http_options
+    if isinstance(http_options, types.HttpOptions):
+        options = http_options.model_dump(exclude_none=True)
+    else:
+        options = dict(http_options or {})
+    client_args = dict(options.get("async_client_args") or {})
+    hooks = dict(client_args.get("event_hooks") or {})
+    hooks["request"] = list(hooks.get("request", [])) + [_trace_request]
+    hooks["response"] = list(hooks.get("response", [])) + [_trace_response]
+    client_args["event_hooks"] = hooks
+    options["async_client_args"] = client_args
+    return options
+
+
+# ========== SHARED INSTANCE ==========
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(**client_kwargs):
+    """Process-wide :class:`GeminiPool`, created on first use.
+
+    ``client_kwargs`` are passed to ``genai.Client`` by whichever caller
+    creates the pool; later callers get the existing instance. Setting
+    ``GEMINI_MOCK_URL`` points the client at a local mock_gemini server.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            load_dotenv()
+            mock_url = os.environ.get("GEMINI_MOCK_URL")
+            if mock_url:
+                from mock_gemini import use_mock
+                use_mock(mock_url)
+                print(f"🧪 Using mock Gemini at {mock_url}")
+            client_kwargs["http_options"] = traced_http_options(client_kwargs.get("http_options"))
+            _pool = GeminiPool(genai.Client(**client_kwargs))
+        return _pool
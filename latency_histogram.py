@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+
+# ====== CONFIG ======
+SUB_BUCKET_BITS = 7          # 128 linear sub-buckets per power of two: < 1.6% relative error
+HISTOGRAM_MAX_SECONDS = 3600  # Larger values are clamped into the top bucket
+PERCENTILES = (50, 90, 95, 99)
+# ====================
+
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF = SUB_BUCKETS // 2
+
+
+def bucket_index(us):
+    """Log-linear bucket of a non-negative integer microsecond value."""
+    if us < SUB_BUCKETS:
+        return us
+    shift = us.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF + (us >> shift) - HALF
+
+
+def bucket_upper(index):
+    """Highest microsecond value that lands in bucket ``index``."""
+    if index < SUB_BUCKETS:
+        return index
+    shift, offset = divmod(index - SUB_BUCKETS, HALF)
+    shift += 1
+    return ((offset + HALF + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram with fixed memory.
+
+    Values are bucketed in microseconds on a log-linear scale, so every
+    recorded latency up to ``max_seconds`` is kept with under 2% error
+    in a fixed array of counts, no matter how many are recorded.
+    Histograms with the same layout merge by adding counts, which is
+    what makes them safe to combine across sessions.
+    """
+
+    def __init__(self, max_seconds=HISTOGRAM_MAX_SECONDS):
+        self.max_seconds = max_seconds
+        self.counts = [0] * (bucket_index(int(max_seconds * 1e6)) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        seconds = min(max(seconds, 0.0), self.max_seconds)
+        self.counts[bucket_index(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other):
+        if len(other.counts) != len(self.counts):
+            raise ValueError("Cannot merge histograms with different ranges")
+        for i, n in enumerate(other.counts):
+            if n:
+                self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, q):
+        """Value at percentile ``q`` (0-100) in seconds, or None if empty."""
+        if not self.count:
+            return None
+        rank = max(1, int(round(q / 100 * self.count + 0.5 - 1e-9)))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                # Report the bucket's upper edge, but never beyond what was actually seen
+                return min(bucket_upper(i) / 1e6, self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def summary(self):
+        data = {"count": self.count, "mean": self.mean}
+        for q in PERCENTILES:
+            data[f"p{q}"] = self.percentile(q)
+        data["max"] = self.max
+        return data
+
+    def to_dict(self):
+        return {
+            "max_seconds": self.max_seconds,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": {str(i): n for i, n in enumerate(self.counts) if n},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        hist = cls(data["max_seconds"])
+        for i, n in data["buckets"].items():
+            hist.counts[int(i)] = n
+        hist.count = data["count"]
+        hist.total = data["total"]
+        hist.min = data["min"]
+        hist.max = data["max"]
+        return hist
+
+
+class HistogramSet:
+    """Thread-safe histograms keyed by ``(stage, model)``, persisted as JSON."""
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, model, seconds):
+        with self._lock:
+            hist = self.histograms.get((stage, model))
+            if hist is None:
+                hist = self.histograms[(stage, model)] = LatencyHistogram()
+            hist.record(seconds)
+
+    def merge(self, other):
+        with self._lock:
+            for key, hist in other.histograms.items():
+                if key in self.histograms:
+                    self.histograms[key].merge(hist)
+                else:
+                    self.histograms[key] = LatencyHistogram.from_dict(hist.to_dict())
+        return self
+
+    def by_stage(self):
+        """Per-stage histograms with all models merged."""
+        stages = {}
+        for (stage, _), hist in sorted(self.histograms.items()):
+            stages.setdefault(stage, LatencyHistogram()).merge(hist)
+        return stages
+
+    def report_lines(self, unit=1000, label="ms"):
+        """Text table rows: one per stage (all models), then one per stage and model."""
+        header = f"  {'stage':<14}{'model':<24}{'n':>6}" + "".join(f"{f'p{q}':>9}" for q in PERCENTILES) + f"{'max':>9}"
+        lines = [header + f"  ({label})"]
+
+        def row(stage, model, hist):
+            s = hist.summary()
+            values = [s[f"p{q}"] for q in PERCENTILES] + [s["max"]]
+            return f"  {stage:<14}{model:<24}{s['count']:>6}" + "".join(f"{v * unit:>9.0f}" for v in values)
+
+        for stage, hist in self.by_stage().items():
+            lines.append(row(stage, "(all)", hist))
+        for (stage, model), hist in sorted(self.histograms.items()):
+            lines.append(row(stage, model, hist))
+        return lines
+
+    def to_dict(self):
+        with self._lock:
+            return {f"{stage}|{model}": hist.to_dict() for (stage, model), hist in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        hists = cls()
+        for key, value in data.items():
+            stage, model = key.split("|", 1)
+            hists.histograms[(stage, model)] = LatencyHistogram.from_dict(value)
+        return hists
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
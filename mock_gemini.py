@@ -0,0 +1,481 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import re
+import shutil
+import ssl
+import subprocess
+import time
+import wave
+from urllib.parse import urlsplit
+
+import certifi
+import h11
+import numpy as np
+from websockets.frames import Opcode
+from websockets.server import ServerProtocol
+
+# ====== CONFIG ======
+HOST = "127.0.0.1"
+PORT = 8765
+CERT_DIR = ".mock_gemini"       # Self-signed certificate and CA bundle (the SDK only speaks TLS)
+LATENCY = 0.6                   # Mean seconds to first byte
+JITTER = 0.25                   # Spread, meaning depends on the distribution
+DISTRIBUTION = "lognormal"      # fixed, uniform, normal or lognormal
+CHUNK_INTERVAL = 0.05           # Seconds between streamed chunks
+LIVE_TURN_SECONDS = 4.0         # Live API: answer after this much realtime audio
+LIVE_AUDIO_RATE = 24000         # Live API output audio (16-bit mono PCM)
+LIVE_AUDIO_SECONDS = 2.0        # Length of the canned spoken answer
+LIVE_AUDIO_CHUNK_SECONDS = 0.1
+# ====================
+
+# Replies are picked by the first rule whose "match" occurs in the request's
+# text parts; a rule gives "text" or "json" and may override latency.
+DEFAULT_SCRIPT = {
+    "generate": [
+        {"match": "Drafted question", "json": {"keep": True}},
+        {"match": "next_question", "json": {
+            "conversation": [{"speaker": "Candidate", "text": "I built a sentiment classifier with a fine-tuned BERT model."}],
+            "next_question": "How did you evaluate that model, and what would you improve?",
+        }},
+        {"match": '"conversation"', "json": {
+            "conversation": [{"speaker": "Candidate", "text": "I built a sentiment classifier with a fine-tuned BERT model."}],
+        }},
+        {"match": "", "text": "Thanks for sharing. Could you walk me through a project where you "
+                              "trained a model end to end? What was the hardest part?"},
+    ],
+    "live": [
+        {"text": "Sure, I can help with that. What would you like to talk about?"},
+    ],
+}
+
+
+class LatencyModel:
+    """Samples response delays from a configurable distribution."""
+
+    def __init__(self, mean=LATENCY, jitter=JITTER, distribution=DISTRIBUTION, rng=None):
+        self.mean = mean
+        self.jitter = jitter
+        self.distribution = distribution
+        self.rng = rng or random.Random()
+
+    def sample(self):
+        if self.distribution == "fixed" or self.mean <= 0:
+            return max(0.0, self.mean)
+        if self.distribution == "uniform":
+            return max(0.0, self.rng.uniform(self.mean - self.jitter, self.mean + self.jitter))
+        if self.distribution == "normal":
+            return max(0.0, self.rng.gauss(self.mean, self.jitter))
+        if self.distribution == "lognormal":
+            # jitter is sigma of the underlying normal; mean is preserved
+            mu = np.log(self.mean) - self.jitter ** 2 / 2
+            return self.rng.lognormvariate(mu, self.jitter)
+        raise ValueError(f"Unknown latency distribution: {self.distribution}")
+
+
+def canned_speech(seconds=LIVE_AUDIO_SECONDS, rate=LIVE_AUDIO_RATE):
+    """Voice-like int16 PCM: a gliding harmonic tone with syllable-rate amplitude bumps."""
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 25 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4 * t)) * np.minimum(1, np.minimum(t, seconds - t) * 20)
+    return (voice * envelope * 0.25 * 32767).astype(np.int16).tobytes()
+
+
+def load_pcm(path):
+    """Raw int16 frames of a WAV file (used as canned Live audio as-is)."""
+    with wave.open(path, "rb") as wf:
+        return wf.readframes(wf.getnframes())
+
+
+def schema_example(schema):
+    """Minimal object satisfying a response_schema, for unscripted JSON requests."""
+    kind = str(schema.get("type", "object")).lower()
+    if kind == "object":
+        return {k: schema_example(v) for k, v in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [schema_example(schema.get("items", {}))]
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return 0
+    return "mock"
+
+
+def usage(prompt_text, reply_text):
+    prompt_tokens = max(1, len(prompt_text) // 4)
+    reply_tokens = max(1, len(reply_text) // 4)
+    return {"promptTokenCount": prompt_tokens, "candidatesTokenCount": reply_tokens,
+            "totalTokenCount": prompt_tokens + reply_tokens}
+
+
+def camel_keys(obj):
+    """Proto-JSON accepts snake_case too (the SDK's legacy ``session.send`` uses it)."""
+    if isinstance(obj, dict):
+        return {re.sub(r"_([a-z])", lambda m: m.group(1).upper(), k): camel_keys(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [camel_keys(v) for v in obj]
+    return obj
+
+
+def request_text(body):
+    parts = [p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", [])]
+    return "\n".join(parts)
+
+
+class MockGemini:
+    """Local stand-in for the Gemini REST and Live APIs.
+
+    Serves ``generateContent``, ``streamGenerateContent`` (SSE), model
+    lookup, cached contents and the ``BidiGenerateContent`` websocket that
+    ``client.aio.live.connect`` opens, all over TLS on one port. Replies
+    come from a script (see DEFAULT_SCRIPT) with latencies drawn from
+    :class:`LatencyModel`, so benchmarks are repeatable without API keys.
+    """
+
+    def __init__(self, script=None, latency=None, chunk_interval=CHUNK_INTERVAL,
+                 live_audio=None, live_turn_seconds=LIVE_TURN_SECONDS, seed=None):
+        self.script = script or DEFAULT_SCRIPT
+        self.rng = random.Random(seed)
+        self.latency = latency or LatencyModel(rng=self.rng)
+        self.chunk_interval = chunk_interval
+        self.live_audio = live_audio or canned_speech()
+        self.live_turn_seconds = live_turn_seconds
+        self.server = None
+        self.port = None
+        self.requests = 0
+        self._caches = {}
+        self._live_index = 0
+
+    # ---------- lifecycle ----------
+
+    async def start(self, host=HOST, port=PORT):
+        cert, key, _ = ensure_certificate()
+        ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ctx.load_cert_chain(cert, key)
+        self.server = await asyncio.start_server(self._handle, host, port, ssl=ctx)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self):
+        return f"https://localhost:{self.port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    # ---------- scripting ----------
+
+    def _rule(self, text):
+        for rule in self.script.get("generate", []):
+            if rule.get("match", "") in text:
+                return rule
+        return {"text": "mock reply"}
+
+    def _reply(self, body):
+        """(prompt, reply, delay) for a generateContent body."""
+        text = request_text(body)
+        if body.get("cachedContent") in self._caches:
+            # The static prompt lives in the cache, not in the request
+            text = request_text(self._caches[body["cachedContent"]]) + "\n" + text
+        rule = self._rule(text)
+        config = body.get("generationConfig", {})
+        if "json" in rule:
+            reply = json.dumps(rule["json"])
+        elif config.get("responseSchema"):
+            reply = json.dumps(schema_example(config["responseSchema"]))
+        else:
+            reply = rule.get("text", "mock reply")
+        delay = rule["latency"] if "latency" in rule else self.latency.sample()
+        return text, reply, delay
+
+    @staticmethod
+    def _candidate(text, finished=True):
+        candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+        if finished:
+            candidate["finishReason"] = "STOP"
+        return candidate
+
+    # ---------- HTTP ----------
+
+    async def _handle(self, reader, writer):
+        conn = h11.Connection(h11.SERVER)
+        try:
+            while True:
+                event = conn.next_event()
+                if event is h11.NEED_DATA:
+                    data = await reader.read(65536)
+                    conn.receive_data(data)
+                    if not data:
+                        return
+                    continue
+                if isinstance(event, h11.Request):
+                    headers = {k.decode().lower(): v.decode() for k, v in event.headers}
+                    if headers.get("upgrade", "").lower() == "websocket":
+                        await self._websocket(event, conn.trailing_data[0], reader, writer)
+                        return
+                    body = b""
+                    while True:
+                        part = conn.next_event()
+                        if part is h11.NEED_DATA:
+                            conn.receive_data(await reader.read(65536))
+                        elif isinstance(part, h11.Data):
+                            body += part.data
+                        else:
+                            break
+                    await self._route(conn, writer, event.method.decode(), event.target.decode(), body)
+                    if conn.our_state is h11.MUST_CLOSE:
+                        return
+                    conn.start_next_cycle()
+                elif isinstance(event, (h11.ConnectionClosed, h11.PAUSED)):
+                    return
+        except (ConnectionError, h11.RemoteProtocolError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send_json(self, conn, writer, status, payload):
+        data = json.dumps(payload).encode()
+        writer.write(conn.send(h11.Response(status_code=status, headers=[
+            ("content-type", "application/json"), ("content-length", str(len(data)))])))
+        writer.write(conn.send(h11.Data(data=data)))
+        writer.write(conn.send(h11.EndOfMessage()))
+        await writer.drain()
+
+    async def _route(self, conn, writer, method, target, body):
+        self.requests += 1
+        path = urlsplit(target).path
+        payload = json.loads(body) if body else {}
+
+        if method == "POST" and path.endswith(":generateContent"):
+            prompt, reply, delay = self._reply(payload)
+            await asyncio.sleep(delay)
+            await self._send_json(conn, writer, 200, {
+                "candidates": [self._candidate(reply)], "usageMetadata": usage(prompt, reply),
+                "modelVersion": path.rsplit("/", 1)[-1].split(":")[0]})
+        elif method == "POST" and path.endswith(":streamGenerateContent"):
+            await self._stream(conn, writer, payload)
+        elif method == "POST" and path.endswith("/cachedContents"):
+            name = f"cachedContents/mock-{len(self._caches) + 1}"
+            self._caches[name] = payload
+            await self._send_json(conn, writer, 200, {"name": name, "model": payload.get("model"),
+                                                      "usageMetadata": {"totalTokenCount": 0}})
+        elif "/cachedContents/" in path:
+            name = "cachedContents/" + path.rsplit("/", 1)[-1]
+            if method == "DELETE":
+                self._caches.pop(name, None)
+                await self._send_json(conn, writer, 200, {})
+            else:
+                await self._send_json(conn, writer, 200, {"name": name})
+        elif method == "GET" and "/models/" in path:
+            name = "models/" + path.rsplit("/models/", 1)[-1]
+            await self._send_json(conn, writer, 200, {"name": name, "displayName": name})
+        else:
+            await self._send_json(conn, writer, 404, {"error": {
+                "code": 404, "message": f"mock has no {method} {path}", "status": "NOT_FOUND"}})
+
+    async def _stream(self, conn, writer, payload):
+        prompt, reply, delay = self._reply(payload)
+        await asyncio.sleep(delay)
+        writer.write(conn.send(h11.Response(status_code=200, headers=[
+            ("content-type", "text/event-stream"), ("transfer-encoding", "chunked")])))
+        pieces = re.findall(r"\S+\s*", reply) or [reply]
+        step = max(1, len(pieces) // 8)
+        chunks = ["".join(pieces[i:i + step]) for i in range(0, len(pieces), step)]
+        for i, chunk in enumerate(chunks):
+            last = i == len(chunks) - 1
+            event = {"candidates": [self._candidate(chunk, finished=last)]}
+            if last:
+                event["usageMetadata"] = usage(prompt, reply)
+            writer.write(conn.send(h11.Data(data=f"data: {json.dumps(event)}\r\n\r\n".encode())))
+            await writer.drain()
+            if not last:
+                await asyncio.sleep(self.chunk_interval)
+        writer.write(conn.send(h11.EndOfMessage()))
+        await writer.drain()
+
+    # ---------- Live API ----------
+
+    async def _websocket(self, request, trailing, reader, writer):
+        raw = f"{request.method.decode()} {request.target.decode()} HTTP/1.1\r\n".encode()
+        raw += b"".join(k + b": " + v + b"\r\n" for k, v in request.headers) + b"\r\n"
+        protocol = ServerProtocol()
+        protocol.receive_data(raw + trailing)
+        handshake = protocol.events_received()[0]
+        protocol.send_response(protocol.accept(handshake))
+        session = {"audio": False, "transcribe": False, "audio_bytes": 0, "rate": 16000}
+        outbox = asyncio.Queue()
+
+        async def flush():
+            for data in protocol.data_to_send():
+                if data:
+                    writer.write(data)
+            await writer.drain()
+
+        async def send(message):
+            protocol.send_text(json.dumps(message).encode())
+            await flush()
+
+        async def responder():
+            while True:
+                await self._live_answer(await outbox.get(), session, send)
+
+        await flush()
+        task = asyncio.create_task(responder())
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    protocol.receive_eof()
+                    break
+                protocol.receive_data(data)
+                for frame in protocol.events_received():
+                    if frame.opcode in (Opcode.TEXT, Opcode.BINARY):
+                        self._live_message(camel_keys(json.loads(frame.data)), session, outbox, send)
+                    elif frame.opcode is Opcode.CLOSE:
+                        await flush()
+                        return
+                await flush()
+        except ConnectionError:
+            pass
+        finally:
+            task.cancel()
+
+    def _live_message(self, message, session, outbox, send):
+        self.requests += 1
+        if "setup" in message:
+            config = message["setup"].get("generationConfig", {})
+            session["audio"] = "AUDIO" in [m.upper() for m in config.get("responseModalities", [])]
+            session["transcribe"] = "outputAudioTranscription" in message["setup"]
+            asyncio.ensure_future(send({"setupComplete": {}}))
+        elif "clientContent" in message:
+            if message["clientContent"].get("turnComplete"):
+                outbox.put_nowait(time.perf_counter())
+        elif "realtimeInput" in message:
+            realtime = message["realtimeInput"]
+            chunks = realtime.get("mediaChunks", []) + ([realtime["audio"]] if "audio" in realtime else [])
+            for chunk in chunks:
+                match = re.search(r"rate=(\d+)", chunk.get("mimeType", ""))
+                rate = int(match.group(1)) if match else session["rate"]
+                session["audio_bytes"] += len(base64.b64decode(chunk.get("data", "")))
+                if session["audio_bytes"] >= self.live_turn_seconds * rate * 2:
+                    session["audio_bytes"] = 0
+                    outbox.put_nowait(time.perf_counter())
+            if realtime.get("audioStreamEnd"):
+                outbox.put_nowait(time.perf_counter())
+
+    async def _live_answer(self, queued_at, session, send):
+        rules = self.script.get("live") or [{"text": "mock reply"}]
+        rule = rules[self._live_index % len(rules)]
+        self._live_index += 1
+        delay = rule["latency"] if "latency" in rule else self.latency.sample()
+        await asyncio.sleep(max(0.0, delay - (time.perf_counter() - queued_at)))
+
+        if session["audio"]:
+            audio = load_pcm(rule["audio"]) if "audio" in rule else self.live_audio
+            step = int(LIVE_AUDIO_CHUNK_SECONDS * LIVE_AUDIO_RATE) * 2
+            for i in range(0, len(audio), step):
+                await send({"serverContent": {"modelTurn": {"parts": [{"inlineData": {
+                    "mimeType": f"audio/pcm;rate={LIVE_AUDIO_RATE}",
+                    "data": base64.b64encode(audio[i:i + step]).decode()}}]}}})
+                await asyncio.sleep(self.chunk_interval)
+            if session["transcribe"]:
+                await send({"serverContent": {"outputTranscription": {"text": rule.get("text", "")}}})
+        else:
+            for piece in re.findall(r"\S+\s*", rule.get("text", "")):
+                await send({"serverContent": {"modelTurn": {"parts": [{"text": piece}]}}})
+                await asyncio.sleep(self.chunk_interval)
+        await send({"serverContent": {"generationComplete": True}})
+        await send({"serverContent": {"turnComplete": True}})
+
+
+# ========== CLIENT SWITCH ==========
+
+def ensure_certificate(directory=CERT_DIR):
+    """Self-signed localhost certificate plus a CA bundle that trusts it and the public roots."""
+    os.makedirs(directory, exist_ok=True)
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    bundle = os.path.join(directory, "ca-bundle.pem")
+    if not os.path.exists(cert):
+        if not shutil.which("openssl"):
+            raise RuntimeError("openssl is needed once to create the mock server's certificate")
+        subprocess.run([
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key, "-out", cert, "-days", "3650", "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+        ], check=True, capture_output=True)
+    if not os.path.exists(bundle):
+        with open(bundle, "w") as out, open(certifi.where()) as roots, open(cert) as own:
+            out.write(roots.read() + "\n" + own.read())
+    return cert, key, bundle
+
+
+def mock_env(url):
+    """Environment that points every ``genai.Client`` in this process at ``url``."""
+    _, _, bundle = ensure_certificate()
+    return {
+        "GOOGLE_GEMINI_BASE_URL": url,
+        "SSL_CERT_FILE": os.path.abspath(bundle),
+        "GEMINI_API_KEY": "mock",
+        "GOOGLE_API_KEY": "mock",
+    }
+
+
+def use_mock(url):
+    """Switch this process to the mock server; call before any client is created.
+
+    Scripts using :func:`gemini_pool.get_pool` can instead set ``GEMINI_MOCK_URL``.
+    """
+    os.environ.update(mock_env(url))
+
+
+def load_script(path):
+    with open(path, encoding="utf-8") as f:
+        script = json.load(f)
+    return {**DEFAULT_SCRIPT, **script}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini stand-in for offline latency benchmarks")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--script", help="JSON file with 'generate' and/or 'live' reply rules")
+    parser.add_argument("--latency", type=float, default=LATENCY, help="Mean seconds to first byte")
+    parser.add_argument("--jitter", type=float, default=JITTER)
+    parser.add_argument("--distribution", default=DISTRIBUTION, choices=["fixed", "uniform", "normal", "lognormal"])
+    parser.add_argument("--chunk-interval", type=float, default=CHUNK_INTERVAL)
+    parser.add_argument("--live-audio", help="16-bit mono 24 kHz WAV to return for AUDIO responses")
+    parser.add_argument("--seed", type=int, help="Seed for repeatable latency draws")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    mock = MockGemini(
+        script=load_script(args.script) if args.script else None,
+        latency=LatencyModel(args.latency, args.jitter, args.distribution, rng),
+        chunk_interval=args.chunk_interval,
+        live_audio=load_pcm(args.live_audio) if args.live_audio else None,
+        seed=args.seed,
+    )
+
+    async def serve():
+        await mock.start(args.host, args.port)
+        print(f"🧪 Mock Gemini listening on {mock.url}")
+        print("   Point any script at it with:")
+        for key, value in mock_env(mock.url).items():
+            print(f"   export {key}={value}")
+        await mock.server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n🧪 Mock Gemini stopped after {mock.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import queue
+import threading
+
+from latency_histogram import HistogramSet
+
+# ====== CONFIG ======
+BATCH_SIZE = 32          # Records written per fsync at most
+FLUSH_INTERVAL = 1.0     # Seconds a record may wait for its batch to fill
+# ====================
+
+# Tracker fields that feed the latency histograms: (stage, duration field, model field)
+HISTOGRAM_FIELDS = (
+    ("transcription", "transcription_duration", "transcription_model"),
+    ("response", "response_duration", "response_model"),
+    ("first_chunk", "response_first_chunk_time", "response_model"),
+)
+
+
+class PerformanceSink:
+    """Append-only JSONL log written by a background thread.
+
+    ``write(record)`` only enqueues, so the turn loop never waits on disk.
+    The writer appends each record as one line and calls fsync once per
+    batch. A batch is ``batch_size`` records or whatever arrived within
+    ``flush_interval`` seconds. The writer starts with the first record
+    (or :meth:`start`). ``flush()`` blocks until every queued record is on
+    disk; ``close()`` also stops the writer, which as a daemon thread would
+    otherwise drop the last batch at exit.
+    """
+
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the writer thread (idempotent)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="perf-log", daemon=True)
+                self._thread.start()
+        return self
+
+    def write(self, record):
+        self.start()
+        self._queue.put(record)
+
+    def flush(self):
+        # Nothing was ever written without a writer, so there is nothing to wait for
+        self._queue.join()
+
+    def close(self):
+        """Write everything queued and stop the writer (idempotent; a no-op if it never started)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(None)
+        thread.join()
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                batch = [self._queue.get()]
+                while batch[-1] is not None and len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get(timeout=self.flush_interval))
+                    except queue.Empty:
+                        break
+
+                records = [r for r in batch if r is not None]
+                try:
+                    if records:
+                        f.write("".join(json.dumps(r) + "\n" for r in records))
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self.written += len(records)
+                except (OSError, TypeError, ValueError) as e:
+                    print(f"⚠️ Performance log write failed: {e}")
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if batch[-1] is None:
+                    return
+
+
+def iter_records(path, **match):
+    """Stream records from a JSONL log, optionally only those whose fields equal ``match``.
+
+    A torn last line (crash mid-write) is skipped instead of failing the read.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if all(record.get(k) == v for k, v in match.items()):
+                yield record
+
+
+class PerformanceAggregate:
+    """Running totals and latency histograms over a stream of tracker records."""
+
+    def __init__(self):
+        self.turns = 0
+        self.transcriptions_ok = 0
+        self.responses_ok = 0
+        self.histograms = HistogramSet()
+
+    def add(self, record):
+        self.turns += 1
+        self.transcriptions_ok += bool(record.get("transcription_success"))
+        self.responses_ok += bool(record.get("response_success"))
+        for stage, field, model_field in HISTOGRAM_FIELDS:
+            value = record.get(field) or 0
+            if value > 0:
+                self.histograms.record(stage, record.get(model_field) or "unknown", value)
+        return self
+
+
+def aggregate(records):
+    """Fold an iterable of records into a PerformanceAggregate, one record at a time."""
+    totals = PerformanceAggregate()
+    for record in records:
+        totals.add(record)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a JSONL performance log without loading it into memory")
+    parser.add_argument("path", nargs="?", default="performance_data.jsonl")
+    parser.add_argument("--run", help="Only records of this run_id")
+    args = parser.parse_args()
+
+    match = {"run_id": args.run} if args.run else {}
+    totals = aggregate(iter_records(args.path, **match))
+    if not totals.turns:
+        print(f"No records in {args.path}")
+        return
+    print(f"📊 {totals.turns} turns, transcription ok {totals.transcriptions_ok}, "
+          f"response ok {totals.responses_ok}")
+    print("\n".join(totals.histograms.report_lines()))
+
+
+if __name__ == "__main__":
+    main()
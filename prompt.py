@@ -333,4 +333,36 @@ Before returning, verify:
 7. Maintain speaker number consistency throughout
 
 Return ONLY valid JSON with no additional explanations.
-"""
\ No newline at end of file
+"""
+
+interviewer_prompt = "Act like a interviewer who is interviewing the candidate for ai/ml intern position. You will always ask the question in english no matter what language user is speaking. Keep your responses concise and conversational."
+
+
+fused_turn_prompt = prompt_template + """
+# ADDITIONAL TASK: NEXT INTERVIEW QUESTION
+
+After transcribing, act as the interviewer who is interviewing the candidate for an AI/ML intern position.
+Based on what the candidate just said, write the next interview question.
+- Always ask the question in English, no matter what language the candidate is speaking
+- Keep it concise and conversational
+
+Return ONLY valid JSON with exactly two fields:
+- "conversation": the transcription, in the format described above
+- "next_question": the interviewer's next question as plain text
+"""
+
+
+# Fixed interviewer lines; `python tts_cache.py warm` pre-renders them
+welcome_message = (
+    "Hello! Welcome to your AI/ML internship interview. "
+    "I'm excited to learn more about you today. "
+    "Let's begin with a quick introduction. "
+    "Could you please tell me about yourself and your background in AI and machine learning?"
+)
+
+short_welcome_message = (
+    "Hello! Welcome to your AI/ML internship interview. "
+    "Tell me about yourself and your background in AI and machine learning."
+)
+
+interviewer_phrases = [welcome_message, short_welcome_message]
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+
+from google.genai import errors, types
+
+# ====== CONFIG ======
+CACHE_TTL_SECONDS = 3600      # Lifetime requested for the cached prefix
+REFRESH_MARGIN_SECONDS = 300  # Extend the TTL when less than this is left
+# 400 messages meaning the prompt can never be cached (below the model's minimum size, model without caching)
+UNCACHEABLE_HINTS = ("too small", "min_total_token_count", "not supported", "does not support")
+# ====================
+
+
+class PromptCache:
+    """Registers a large static prompt once and references it by handle.
+
+    The prompt is uploaded through Gemini's cached-content API the first
+    time it is needed, so later calls only send the per-turn parts and
+    skip re-tokenizing the prefix. The TTL is extended before it runs out.
+    If the cache cannot be created (e.g. the prompt is below the model's
+    minimum cacheable size) or disappears server-side, calls fall back to
+    sending the prompt inline.
+    """
+
+    def __init__(self, client, model, prompt, ttl_seconds=CACHE_TTL_SECONDS, display_name=None):
+        self.client = client
+        self.model = model
+        self.prompt = prompt
+        self.ttl_seconds = ttl_seconds
+        self.display_name = display_name
+        self.name = None
+        self._expires_at = 0.0
+        self._disabled = False
+        self._pending = False  # A create/refresh round trip is in flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+
+    def _ttl(self):
+        return f"{self.ttl_seconds}s"
+
+    def _ensure(self):
+        """Return a live cache name, creating or refreshing it as needed.
+
+        The lock only guards the bookkeeping; the create/update round trip
+        runs outside it, and callers arriving meanwhile use the current
+        handle while it is still valid (or go inline) instead of waiting.
+        """
+        with self._lock:
+            if self._disabled:
+                return None
+            now = time.monotonic()
+            if self.name and now < self._expires_at - REFRESH_MARGIN_SECONDS:
+                return self.name
+            if self._pending:
+                return self.name if self.name and now < self._expires_at else None
+            self._pending = True
+            name = self.name
+
+        try:
+            if name and self._refresh(name, now):
+                return name
+            return self._create(now)
+        finally:
+            with self._lock:
+                self._pending = False
+
+    def _refresh(self, name, now):
+        try:
+            self.client.caches.update(
+                name=name,
+                config=types.UpdateCachedContentConfig(ttl=self._ttl()),
+            )
+        except errors.APIError as e:
+            print(f"⚠️ Prompt cache refresh failed ({e.code}), re-creating it")
+            self._invalidate(name)
+            return False
+        with self._lock:
+            if self.name == name:
+                self._expires_at = now + self.ttl_seconds
+        return True
+
+    def _create(self, now):
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    contents=[self.prompt],
+                    ttl=self._ttl(),
+                    display_name=self.display_name,
+                ),
+            )
+        except errors.APIError as e:
+            message = str(e.message or "").lower()
+            if e.code == 400 and any(hint in message for hint in UNCACHEABLE_HINTS):
+                # Too small to cache, caching unsupported for the model: stop trying
+                print(f"⚠️ Prompt cache unavailable ({e.code}: {e.message}), sending prompt inline")
+                with self._lock:
+                    self._disabled = True
+                return None
+            # Quota (429/403), server-side hiccup, ...: go inline for this call and try again next turn
+            print(f"⚠️ Prompt cache creation failed ({e.code}), sending prompt inline")
+            return None
+
+        with self._lock:
+            self.name = cache.name
+            self._expires_at = now + self.ttl_seconds
+        print(f"🗄️ Prompt cached as {cache.name} (ttl {self.ttl_seconds}s)")
+        return cache.name
+
+    def warm_up(self):
+        """Register the prompt ahead of the first turn."""
+        return self._ensure()
+
+    def _invalidate(self, name):
+        with self._lock:
+            if self.name == name:
+                self.name = None
+                self._expires_at = 0.0
+
+    @staticmethod
+    def _with_cache(config, name):
+        cached_config = config.model_copy() if config else types.GenerateContentConfig()
+        cached_config.cached_content = name
+        return cached_config
+
+    def _handle_rejection(self, name, e):
+        """Decide whether a failed cached call should be retried inline."""
+        if e.code not in (403, 404) and "cache" not in str(e.message).lower():
+            raise e
+        # Expired or deleted behind our back: send inline now, re-create next turn
+        print(f"⚠️ Cached prompt rejected ({e.code}), falling back to inline prompt")
+        self._invalidate(name)
+
+    def generate_content(self, parts, config=None):
+        """``client.models.generate_content`` with the cached prompt prepended to ``parts``."""
+        name = self._ensure()
+        if name:
+            try:
+                response = self.client.models.generate_content(
+                    model=self.model, contents=parts, config=self._with_cache(config, name),
+                )
+                self.hits += 1
+                return response
+            except errors.ClientError as e:
+                self._handle_rejection(name, e)
+
+        self.fallbacks += 1
+        return self.client.models.generate_content(
+            model=self.model, contents=[self.prompt, *parts], config=config,
+        )
+
+    async def generate_content_async(self, parts, config=None):
+        """Async twin of :meth:`generate_content` built on ``client.aio``."""
+        # Cache creation/refresh is rare and blocking, keep it off the event loop
+        name = await asyncio.to_thread(self._ensure)
+        if name:
+            try:
+                response = await self.client.aio.models.generate_content(
+                    model=self.model, contents=parts, config=self._with_cache(config, name),
+                )
+                self.hits += 1
+                return response
+            except errors.ClientError as e:
+                self._handle_rejection(name, e)
+
+        self.fallbacks += 1
+        return await self.client.aio.models.generate_content(
+            model=self.model, contents=[self.prompt, *parts], config=config,
+        )
+
+    def delete(self):
+        """Drop the server-side cache early instead of waiting for the TTL."""
+        with self._lock:
+            name, self.name = self.name, None
+        if name:
+            try:
+                self.client.caches.delete(name=name)
+            except errors.APIError:
+                pass
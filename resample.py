@@ -0,0 +1,82 @@
+from math import gcd
+
+import numpy as np
+
+# ====== CONFIG ======
+TAPS_PER_PHASE = 32   # FIR length per polyphase branch (quality vs. CPU)
+KAISER_BETA = 8.0     # ~80 dB stopband attenuation
+# ====================
+
+
+class StreamingResampler:
+    """Incremental polyphase rational resampler (e.g. 44.1 kHz -> 16 kHz).
+
+    Feed it the float32 blocks coming out of the audio callback and it
+    returns the resampled block right away, carrying the filter history
+    between calls. All the work happens while the user is speaking, so
+    there is nothing left to do when the turn ends.
+    """
+
+    def __init__(self, in_rate, out_rate, channels=1, taps_per_phase=TAPS_PER_PHASE):
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.channels = channels
+
+        g = gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.taps = taps_per_phase
+        self.passthrough = self.up == self.down
+
+        if not self.passthrough:
+            self._phases = self._design_filter()
+        self.reset()
+
+    def _design_filter(self):
+        """Kaiser-windowed sinc low-pass split into ``up`` polyphase branches."""
+        length = self.up * self.taps
+        # Cutoff relative to the upsampled rate, just below the lower Nyquist
+        cutoff = 0.5 / max(self.up, self.down) * 0.95
+        n = np.arange(length) - (length - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, KAISER_BETA)
+        h *= self.up / h.sum()  # Unity DC gain after zero-stuffing
+        # phases[p, k] = h[p + k * up]
+        return h.reshape(self.taps, self.up).T.astype(np.float32).copy()
+
+    def reset(self):
+        """Forget all history. Only call while the producer is not writing."""
+        self._history = np.zeros((self.taps - 1, self.channels), dtype=np.float32)
+        self._consumed = 0  # Input frames seen so far
+        self._produced = 0  # Output frames emitted so far
+
+    def process(self, block):
+        """Resample one (frames, channels) float32 block.
+
+        Always returns a new float32 array clipped to [-1, 1], so callers
+        can keep it without copying the PortAudio buffer themselves.
+        """
+        if self.passthrough:
+            out = np.array(block, dtype=np.float32).reshape(-1, self.channels)
+            return np.clip(out, -1.0, 1.0, out=out)
+
+        block = np.asarray(block, dtype=np.float32).reshape(-1, self.channels)
+        buf = np.concatenate((self._history, block))
+        first_input = self._consumed - (self.taps - 1)  # Absolute index of buf[0]
+        self._consumed += len(block)
+
+        # Every output m whose newest input sample (m * down // up) has arrived
+        end = (self._consumed * self.up + self.down - 1) // self.down
+        m = np.arange(self._produced, end, dtype=np.int64)
+        self._produced = end
+        self._history = buf[len(buf) - (self.taps - 1):]
+
+        if len(m) == 0:
+            return np.empty((0, self.channels), dtype=np.float32)
+
+        t = m * self.down
+        base = t // self.up - first_input
+        phase = t % self.up
+        # (outputs, taps) gather of the input samples feeding each output
+        idx = base[:, None] - np.arange(self.taps)[None, :]
+        out = np.einsum("nk,nkc->nc", self._phases[phase], buf[idx])
+        return np.clip(out, -1.0, 1.0, out=out)
@@ -0,0 +1,194 @@
+import asyncio
+import collections
+import random
+import time
+
+import httpx
+from google.genai import errors
+
+import tracing
+
+# ====== CONFIG ======
+RETRY_ATTEMPTS = 4             # Tries per call, including the first
+RETRY_BASE_DELAY = 0.5         # Seconds; backoff doubles per retry, with full jitter
+RETRY_MAX_DELAY = 8.0
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+BREAKER_FAILURES = 5           # Consecutive retryable failures that open a model's circuit
+BREAKER_COOLDOWN = 30.0        # Seconds before a half-open probe is let through
+HEDGE_REQUESTS = True          # Fire a backup request when the first is slower than usual
+HEDGE_MODEL = "gemini-2.5-flash"
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20         # Latency samples needed before hedging kicks in
+LATENCY_WINDOW = 200           # Recent calls per model and call kind used for the quantile
+# ====================
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the API while a model's circuit breaker is open."""
+
+
+def is_retryable(error):
+    """Transient server/rate-limit/network errors are worth another try."""
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_CODES
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError))
+
+
+def backoff_delay(retry):
+    """Full-jitter exponential backoff for the ``retry``-th retry (0-based)."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** retry))
+
+
+class CircuitBreaker:
+    """Closed -> open after ``threshold`` consecutive failures -> half-open after ``cooldown``."""
+
+    def __init__(self, threshold=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True  # Exactly one probe until it reports back
+            return True
+        return False
+
+    def release_probe(self):
+        """The half-open probe (if this was it) is over, whatever its outcome."""
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                print(f"⚠️ Circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+class Resilience:
+    """Retries, per-model circuit breakers and hedged requests for async model calls.
+
+    ``call(model, attempt)`` runs ``attempt(model)`` (a coroutine factory)
+    with jittered exponential retries on transient errors. Each model has
+    its own breaker, so an outage of one model fails fast without
+    hammering it. With ``hedge=True``, if an attempt is still running
+    after the model's observed p95 latency, a backup request is sent to
+    ``HEDGE_MODEL`` and the first answer wins. Each attempt, retries and
+    the backup included, runs inside its own ``slot()`` (e.g. a
+    scheduler slot), so it is subject to the same concurrency caps and
+    rate limit as any other request, and no slot is held during the
+    backoff sleep.
+    Latencies are kept per model and call ``kind`` (full calls vs. stream
+    opens); attempts cancelled as hedge losers count with the time they
+    had run. Used from a single event loop (the GeminiPool loop).
+    """
+
+    def __init__(self, attempts=RETRY_ATTEMPTS, hedging=HEDGE_REQUESTS, hedge_model=HEDGE_MODEL):
+        self.attempts = attempts
+        self.hedging = hedging
+        self.hedge_model = hedge_model
+        self.breakers = collections.defaultdict(CircuitBreaker)
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=LATENCY_WINDOW))  # (model, kind)
+        self.stats = collections.Counter()
+
+    def hedge_after(self, model, kind="call"):
+        """Seconds to wait before hedging a ``kind`` call to ``model``, or None if not enough data."""
+        samples = self.latencies[model, kind]
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(HEDGE_QUANTILE * len(ordered)))]
+
+    async def call(self, model, attempt, hedge=False, kind="call", slot=None):
+        breaker = self.breakers[model]
+        for retry in range(self.attempts):
+            if not breaker.allow():
+                self.stats["short_circuited"] += 1
+                raise CircuitOpenError(f"Circuit for {model} is open, not calling the API")
+            try:
+                try:
+                    if hedge and self.hedging:
+                        result = await self._hedged(model, attempt, kind, slot)
+                    else:
+                        result = await self._slotted(model, attempt, kind, slot)
+                finally:
+                    # Cancellation included, or a half-open breaker would wait forever for its probe
+                    breaker.release_probe()
+            except Exception as e:
+                if not is_retryable(e):
+                    raise  # The request was bad; says nothing about the model's health
+                breaker.record_failure()
+                self.stats["failures"] += 1
+                if retry == self.attempts - 1:
+                    raise
+                delay = backoff_delay(retry)
+                print(f"⚠️ {model} call failed ({e}), retry {retry + 1} in {delay:.1f}s")
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    async def _timed(self, model, attempt, kind):
+        with tracing.span("attempt", model=model):
+            start = time.perf_counter()
+            try:
+                result = await attempt(model)
+            except asyncio.CancelledError:
+                # A hedge loser took at least this long; dropping it would pull the quantile down
+                self.latencies[model, kind].append(time.perf_counter() - start)
+                raise
+            self.latencies[model, kind].append(time.perf_counter() - start)
+            return result
+
+    async def _slotted(self, model, attempt, kind, slot):
+        if slot is None:
+            return await self._timed(model, attempt, kind)
+        async with slot():
+            return await self._timed(model, attempt, kind)
+
+    async def _hedged(self, model, attempt, kind, slot):
+        threshold = self.hedge_after(model, kind)
+        primary = asyncio.ensure_future(self._slotted(model, attempt, kind, slot))
+        if threshold is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=threshold)
+        if done:
+            return primary.result()
+
+        self.stats["hedged"] += 1
+        backup = asyncio.ensure_future(self._slotted(self.hedge_model, attempt, kind, slot))
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+            # Both failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,164 @@
+import asyncio
+import collections
+import contextlib
+import time
+
+import tracing
+
+# ====== CONFIG ======
+# Priority classes, most urgent first
+INTERACTIVE = "interactive"  # Next interviewer question: the candidate is waiting on it
+TTS = "tts"                  # Speech synthesis of an answer that is about to play
+BACKGROUND = "background"    # Transcription, speculative drafts
+BATCH = "batch"              # Offline jobs (benchmarks, re-transcribing archives)
+PRIORITIES = (INTERACTIVE, TTS, BACKGROUND, BATCH)
+
+MAX_CONCURRENCY = 4          # Gemini requests in flight across all classes (quota-free ones aside)
+CLASS_CAPS = {INTERACTIVE: 4, TTS: 2, BACKGROUND: 2, BATCH: 1}
+INTERACTIVE_RESERVE = 1      # Slots and rate tokens that only INTERACTIVE may use
+REQUESTS_PER_MINUTE = 60     # Shared Gemini request budget (token bucket refill rate)
+BURST = 8                    # Token bucket size
+QUOTA_FREE = {TTS}           # Classes that don't spend Gemini quota (gTTS has its own)
+# ====================
+
+
+class TokenBucket:
+    """Request-rate limiter: ``rate`` tokens per second, up to ``capacity``."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, keep=0):
+        """Take a token if more than ``keep`` would remain; else return seconds to wait."""
+        self._refill()
+        if self.tokens - 1 >= keep:
+            self.tokens -= 1
+            return 0.0
+        return (keep + 1 - self.tokens) / self.rate
+
+
+class RequestScheduler:
+    """Orders model calls by priority class under concurrency caps and a rate limit.
+
+    Callers wrap each request in ``async with scheduler.slot(priority):``.
+    Waiting requests are admitted strictly by class (INTERACTIVE first),
+    FIFO within a class, subject to the class's cap and the global one.
+    Lower classes can never take the last ``INTERACTIVE_RESERVE`` slots or
+    rate tokens, so background work yields to a question being generated.
+    ``QUOTA_FREE`` classes (TTS) neither spend rate tokens nor count
+    against the global cap, only their own, so a rate-limited or busy
+    Gemini never holds back speech synthesis.
+    Must be used from a single event loop (the GeminiPool loop).
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, caps=None,
+                 requests_per_minute=REQUESTS_PER_MINUTE, burst=BURST):
+        self.max_concurrency = max_concurrency
+        self.caps = dict(CLASS_CAPS if caps is None else caps)
+        self.bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self._waiting = {p: collections.deque() for p in PRIORITIES}
+        self._running = {p: 0 for p in PRIORITIES}
+        self._timer = None
+        self.stats = {p: {"admitted": 0, "wait_total": 0.0, "wait_max": 0.0} for p in PRIORITIES}
+
+    @property
+    def running(self):
+        """Gemini requests in flight (quota-free classes excluded)."""
+        return sum(n for p, n in self._running.items() if p not in QUOTA_FREE)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority=INTERACTIVE):
+        if priority not in self._waiting:
+            raise ValueError(f"Unknown priority class: {priority}")
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[priority].append((future, time.perf_counter()))
+        self._dispatch()
+        try:
+            with tracing.span("queue_wait", priority=priority):
+                await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were cancelled: hand the slot back
+                self._release(priority)
+            raise
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def _release(self, priority):
+        self._running[priority] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit as many waiting requests as caps and the rate limit allow."""
+        rate_limited = set()  # Classes out of tokens this pass; lower (quota-free) ones may still go
+        while True:
+            priority = self._next_class(rate_limited)
+            if priority is None:
+                return
+            if priority not in QUOTA_FREE:
+                keep = 0 if priority == INTERACTIVE else INTERACTIVE_RESERVE
+                delay = self.bucket.try_take(keep)
+                if delay:
+                    self._retry_in(delay)
+                    rate_limited.add(priority)
+                    continue
+            future, queued_at = self._waiting[priority].popleft()
+            self._running[priority] += 1
+            future.set_result(None)
+
+            waited = time.perf_counter() - queued_at
+            s = self.stats[priority]
+            s["admitted"] += 1
+            s["wait_total"] += waited
+            s["wait_max"] = max(s["wait_max"], waited)
+
+    def _next_class(self, skip=()):
+        """Highest class not in ``skip`` with a live waiter and a free slot, or None."""
+        for priority in PRIORITIES:
+            if priority in skip:
+                continue
+            queue = self._waiting[priority]
+            while queue and queue[0][0].cancelled():
+                queue.popleft()
+            if not queue or self._running[priority] >= self.caps[priority]:
+                continue
+            if priority in QUOTA_FREE:
+                return priority
+            limit = self.max_concurrency
+            if priority != INTERACTIVE:
+                limit -= INTERACTIVE_RESERVE
+            if self.running < limit:
+                return priority
+        return None
+
+    def _retry_in(self, delay):
+        if self._timer is None or self._timer.when() > asyncio.get_running_loop().time() + delay:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def summary(self):
+        """Per-class admissions, mean and max queueing delay in seconds."""
+        return {
+            p: {
+                "admitted": s["admitted"],
+                "mean_wait": s["wait_total"] / s["admitted"] if s["admitted"] else 0.0,
+                "max_wait": s["wait_max"],
+                "waiting": len(self._waiting[p]),
+            }
+            for p, s in self.stats.items()
+        }
@@ -0,0 +1,244 @@
+"""Append-only session audio archive.
+
+One interview session is stored as three files in the archive directory:
+
+    <session>.pcm   raw interleaved int16 samples of every turn, appended
+    <session>.idx   fixed-size binary records, one per turn (see RECORD)
+    <session>.json  sample rate / channels / creation time
+
+Readers memory-map the PCM file, so slicing a turn never copies samples.
+
+Usage:
+    python session_archive.py list [--dir sessions]
+    python session_archive.py show SESSION [--dir sessions]
+    python session_archive.py export SESSION [--turn N] [-o OUT] [--dir sessions]
+"""
+import argparse
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import wave
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+# ====== CONFIG ======
+ARCHIVE_DIR = "sessions"
+# ====================
+
+# turn, question_index, offset (frames), length (frames), started_at, ended_at
+RECORD = struct.Struct("<IiQQdd")
+
+TurnRecord = namedtuple("TurnRecord", "turn question_index offset length started_at ended_at")
+
+
+def _paths(directory, session_id):
+    base = os.path.join(directory, session_id)
+    return base + ".pcm", base + ".idx", base + ".json"
+
+
+# ========== WRITER ==========
+
+class SessionArchive:
+    """Appends each turn's int16 PCM to a single per-session file.
+
+    ``append_turn`` assigns the turn its place in the file and returns at
+    once; a background thread does the writes, so the turn loop never
+    waits on disk. ``flush()`` blocks until every queued turn is written,
+    ``close()`` also stops the writer and closes the files.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR, sample_rate=16000, channels=1, session_id=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.session_id = session_id or datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+        pcm_path, idx_path, meta_path = _paths(directory, self.session_id)
+        with open(meta_path, "w") as f:
+            json.dump({
+                "session_id": self.session_id,
+                "sample_rate": sample_rate,
+                "channels": channels,
+                "created": datetime.now().isoformat(timespec="seconds"),
+            }, f)
+
+        self._pcm = open(pcm_path, "ab")
+        self._idx = open(idx_path, "ab")
+        self._frames = self._pcm.tell() // (2 * channels)
+        self._turns = self._idx.tell() // RECORD.size
+        self._lock = threading.Lock()  # Final turns may be appended from worker threads
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="session-archive", daemon=True)
+        self._thread.start()
+
+    def append_turn(self, pcm, question_index=-1, started_at=None, ended_at=None):
+        """Queue one turn of int16 (frames, channels) PCM; returns its index record.
+
+        The samples are copied, so the caller may reuse its buffer (e.g.
+        release the capture ring) as soon as this returns.
+        """
+        ended_at = ended_at or time.time()
+        if started_at is None:
+            started_at = ended_at - len(pcm) / self.sample_rate
+
+        samples = np.array(pcm, dtype=np.int16, order="C")
+        with self._lock:
+            record = TurnRecord(self._turns, question_index, self._frames, len(pcm), started_at, ended_at)
+            self._frames += len(pcm)
+            self._turns += 1
+            self._queue.put((samples, record))
+        return record
+
+    def _run(self):
+        # Samples go to the PCM file before the index record, so a crash can
+        # leave unindexed trailing samples but never an index entry pointing
+        # past the end of the data.
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                samples, record = item
+                self._pcm.write(samples)
+                self._pcm.flush()
+                self._idx.write(RECORD.pack(*record))
+                self._idx.flush()
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Session archive write failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued turn is on disk."""
+        self._queue.join()
+
+    def label(self, record):
+        """Short human-readable reference to a turn, e.g. for reports."""
+        return f"{self.session_id}#{record.turn}"
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._pcm.close()
+        self._idx.close()
+
+
+# ========== READER ==========
+
+class SessionArchiveReader:
+    """Memory-mapped read access to an archived session."""
+
+    def __init__(self, session_id, directory=ARCHIVE_DIR):
+        pcm_path, idx_path, meta_path = _paths(directory, session_id)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        self.session_id = session_id
+        self.sample_rate = meta["sample_rate"]
+        self.channels = meta["channels"]
+
+        self._file = open(pcm_path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.samples = np.frombuffer(self._mmap, dtype=np.int16).reshape(-1, self.channels)
+        else:
+            self._mmap = None
+            self.samples = np.empty((0, self.channels), dtype=np.int16)
+
+        with open(idx_path, "rb") as f:
+            raw = f.read()
+        usable = len(raw) - len(raw) % RECORD.size  # Ignore a torn trailing record
+        self.turns = [
+            record for record in map(TurnRecord._make, RECORD.iter_unpack(raw[:usable]))
+            if record.offset + record.length <= len(self.samples)
+        ]
+
+    def turn(self, n):
+        """Return turn ``n`` as a zero-copy int16 view into the mapped file."""
+        record = self.turns[n]
+        return self.samples[record.offset:record.offset + record.length]
+
+    def export_wav(self, n, filename):
+        with wave.open(filename, "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.turn(n))
+        return filename
+
+    def close(self):
+        # Drop the numpy view first, mmap refuses to close while exported
+        self.samples = None
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+
+def list_sessions(directory=ARCHIVE_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len(".json")] for name in os.listdir(directory) if name.endswith(".json"))
+
+
+# ========== CLI ==========
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and export archived interview audio")
+    parser.add_argument("--dir", default=ARCHIVE_DIR, help=f"Archive directory (default: {ARCHIVE_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List archived sessions")
+
+    show = sub.add_parser("show", help="List the turns of a session")
+    show.add_argument("session")
+
+    export = sub.add_parser("export", help="Export turns of a session to WAV")
+    export.add_argument("session")
+    export.add_argument("--turn", type=int, help="Turn number to export (default: all turns)")
+    export.add_argument("-o", "--output", help="Output file (single turn) or directory (all turns)")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for session_id in list_sessions(args.dir):
+            reader = SessionArchiveReader(session_id, args.dir)
+            total = len(reader.samples) / reader.sample_rate
+            print(f"{session_id}  {len(reader.turns):>4} turns  {total:>8.1f}s")
+            reader.close()
+        return
+
+    reader = SessionArchiveReader(args.session, args.dir)
+    try:
+        if args.command == "show":
+            for r in reader.turns:
+                started = datetime.fromtimestamp(r.started_at).strftime("%H:%M:%S")
+                print(f"turn {r.turn:>3}  Q{r.question_index + 1:<3} {started}  {r.length / reader.sample_rate:>7.2f}s")
+        elif args.command == "export":
+            if args.turn is not None and not 0 <= args.turn < len(reader.turns):
+                print(f"❌ {args.session} has no turn {args.turn} (turns 0-{len(reader.turns) - 1})"
+                      if reader.turns else f"❌ {args.session} has no turns")
+                return
+            numbers = [args.turn] if args.turn is not None else range(len(reader.turns))
+            for n in numbers:
+                if args.turn is not None and args.output:
+                    filename = args.output
+                else:
+                    out_dir = args.output or "."
+                    os.makedirs(out_dir, exist_ok=True)
+                    filename = os.path.join(out_dir, f"{args.session}_turn{n:03d}.wav")
+                reader.export_wav(n, filename)
+                print(f"💾 Exported turn {n}: {filename}")
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
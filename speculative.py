@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+
+from google.genai import types
+
+from prompt import interviewer_prompt
+from scheduler import BACKGROUND
+from vad import trim_silence
+
+# ====== CONFIG ======
+SPECULATE_EVERY_SECONDS = 4.0  # How often a fresh draft is requested while the candidate speaks
+MIN_NEW_AUDIO_SECONDS = 3.0    # Don't re-draft until this much new audio has arrived
+CONFIRM_MODEL = "gemini-2.5-flash-lite"
+MIN_TAIL_SECONDS = 1.0         # Shorter tails after the draft are accepted without a check
+# ====================
+
+CONFIRM_PROMPT = """You are checking a follow-up question drafted by an interviewer \
+before the candidate finished answering. The audio is the part of the answer \
+spoken AFTER the draft was written. Decide whether the drafted question still \
+makes sense as the next question (keep=true), or whether the candidate's \
+final words already answered it or changed the topic so it must be redrafted \
+(keep=false).
+
+Drafted question:
+"""
+
+CONFIRM_SCHEMA = {
+    "type": "object",
+    "properties": {"keep": {"type": "boolean"}},
+    "required": ["keep"],
+}
+
+
+class SpeculativeDrafter:
+    """Drafts the next interviewer question while the candidate is still answering.
+
+    While a turn is open, a background thread periodically copies the
+    capture buffer (:meth:`CaptureBuffer.peek`) and asks Gemini for a next question based on the answer
+    so far. When the turn ends, :meth:`end_turn` checks the latest draft
+    against only the audio that arrived after it (a small, cheap call) and
+    either returns it or discards it, in which case the caller generates
+    the reply as usual.
+
+    ``make_turn(pcm)`` encodes a partial answer into a TurnAudio (or returns
+    None when there is nothing to send); ``pool`` is a :class:`GeminiPool`.
+    """
+
+    def __init__(self, pool, capture, make_turn, prompt=interviewer_prompt,
+                 interval=SPECULATE_EVERY_SECONDS, min_new_seconds=MIN_NEW_AUDIO_SECONDS):
+        self.pool = pool
+        self.capture = capture
+        self.make_turn = make_turn
+        self.prompt = prompt
+        self.interval = interval
+        self.min_new_frames = int(min_new_seconds * capture.sample_rate)
+        self._lock = threading.Lock()
+        self._open = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._generation = 0        # Bumped per turn so late polls can't leak across turns
+        self._inflight = None       # (future, frames, started)
+        self._draft = None          # (question, frames, latency)
+        self.stats = {"turns": 0, "drafts": 0, "hits": 0, "misses": 0, "no_draft": 0,
+                      "saved_seconds": 0.0}
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._open.set()
+
+    def begin_turn(self):
+        """Start drafting for a new answer (call right after the capture buffer is released)."""
+        with self._lock:
+            self._generation += 1
+            self._inflight = None
+            self._draft = None
+        self._open.set()
+
+    # ---------- background drafting ----------
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._open.wait()
+            if self._stop.wait(self.interval):
+                return
+            if self._open.is_set():
+                self._poll()
+
+    def _poll(self):
+        with self._lock:
+            if self._inflight is not None:
+                if not self._inflight[0].done():
+                    return  # Previous draft still running
+                self._collect()
+            drafted = self._draft[1] if self._draft else 0
+            generation = self._generation
+
+        # Not snapshot(): this is not the capture buffer's consumer thread, so take a checked copy
+        pcm = self.capture.peek()
+        if pcm is None or len(pcm) - drafted < self.min_new_frames:
+            return
+        frames = len(pcm)
+        turn = self.make_turn(pcm)
+        if turn is None:
+            return
+
+        with self._lock:
+            if not self._open.is_set() or generation != self._generation:
+                return  # Turn ended while encoding
+            # Drafts are optional work: they must not delay a real reply
+            self._inflight = (self.pool.submit(self.pool.reply(turn, prompt=self.prompt, priority=BACKGROUND)),
+                              frames, time.perf_counter())
+            self.stats["drafts"] += 1
+
+    def _collect(self):
+        """Move a finished in-flight draft into ``_draft`` (lock held)."""
+        future, frames, started = self._inflight
+        self._inflight = None
+        try:
+            question = future.result().text.strip()
+        except Exception as e:
+            print(f"⚠️ [Speculative] Draft failed: {e}")
+            return
+        if question:
+            self._draft = (question, frames, time.perf_counter() - started)
+
+    # ---------- end of turn ----------
+
+    def end_turn(self, pcm):
+        """Close the turn and return a confirmed draft question, or None.
+
+        ``pcm`` is the full (untrimmed) answer as captured.
+        """
+        self._open.clear()
+        with self._lock:
+            self.stats["turns"] += 1
+            if self._inflight is not None and self._inflight[0].done():
+                self._collect()
+            # A draft still in flight is based on stale audio: abandon it
+            self._inflight = None
+            draft, self._draft = self._draft, None
+            if draft is None:
+                self.stats["no_draft"] += 1
+        if draft is None:
+            return None
+
+        question, frames, draft_latency = draft
+        started = time.perf_counter()
+        keep = self._confirm(question, pcm[frames:])
+        confirm_latency = time.perf_counter() - started
+
+        if not keep:
+            with self._lock:
+                self.stats["misses"] += 1
+            print(f"🎲 [Speculative] Draft discarded after {confirm_latency:.2f}s check")
+            return None
+
+        saved = max(0.0, draft_latency - confirm_latency)
+        with self._lock:
+            self.stats["hits"] += 1
+            self.stats["saved_seconds"] += saved
+        print(f"🎯 [Speculative] Draft confirmed, ~{saved:.2f}s of dead air saved")
+        return question
+
+    def _confirm(self, question, tail):
+        """Cheap check of the draft against the audio spoken after it."""
+        rate = self.capture.sample_rate
+        if len(tail) < MIN_TAIL_SECONDS * rate or trim_silence(tail, rate) is None:
+            return True  # Nothing new was said
+        turn = self.make_turn(tail)
+        if turn is None:
+            return True
+        try:
+            response = self.pool.run_sync(self.pool.generate(
+                [CONFIRM_PROMPT + question,
+                 types.Part.from_bytes(data=turn.data, mime_type=turn.mime_type)],
+                model=CONFIRM_MODEL,
+                config=types.GenerateContentConfig(
+                    response_mime_type="application/json",
+                    response_schema=CONFIRM_SCHEMA,
+                ),
+            ))
+            return bool(json.loads(response.text).get("keep"))
+        except Exception as e:
+            print(f"⚠️ [Speculative] Confirmation failed: {e}")
+            return False
+
+    def summary(self):
+        """Hit rate and latency saved so far."""
+        with self._lock:
+            s = dict(self.stats)
+        decided = s["hits"] + s["misses"] + s["no_draft"]
+        s["hit_rate"] = s["hits"] / decided if decided else 0.0
+        s["mean_saved_seconds"] = s["saved_seconds"] / s["hits"] if s["hits"] else 0.0
+        return s
@@ -0,0 +1,90 @@
+import re
+import time
+
+# ====== CONFIG ======
+MIN_SENTENCE_CHARS = 24  # Shorter fragments ("Great.") are merged with the next sentence
+# ====================
+
+# Sentence end: terminal punctuation, optional closing quotes/brackets, then whitespace
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+
+class SentenceSplitter:
+    """Cuts streamed text into sentences as soon as each one is complete."""
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        """Add a chunk; return the sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            if match.end() - start < self.min_chars:
+                continue
+            sentences.append(self._buffer[start:match.end()].strip())
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended."""
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def stream_reply(chunks, speaker, started_at=None, on_text=None):
+    """Speak a streamed reply sentence by sentence while it is still being generated.
+
+    ``chunks`` yields text fragments; each completed sentence goes to
+    ``speaker.say`` (a :class:`tts_pipeline.SpeechPipeline` created with the
+    same ``started_at``). ``on_text`` is called with each fragment (e.g. to
+    print it). Once the speaker is stopped (barge-in), reading ends and
+    ``chunks`` is closed, if it can be. Returns ``(text, metrics)``:
+    the full reply, or what was actually spoken if it was cut off.
+    metrics holds ``time_to_first_chunk``, ``time_to_first_audio`` and
+    ``total`` in seconds, measured from ``started_at``
+    (``time.perf_counter()`` based), the number of units spoken,
+    ``cut_off`` and the speaker's per-unit report.
+    """
+    started_at = started_at if started_at is not None else time.perf_counter()
+    splitter = SentenceSplitter()
+    parts = []
+    first_chunk_at = None
+
+    try:
+        for text in chunks:
+            if speaker.stopped:
+                break
+            if not text:
+                continue
+            if first_chunk_at is None:
+                first_chunk_at = time.perf_counter()
+            parts.append(text)
+            if on_text:
+                on_text(text)
+            for sentence in splitter.feed(text):
+                speaker.say(sentence)
+        if not speaker.stopped:
+            for sentence in splitter.flush():
+                speaker.say(sentence)
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+        # Let already-queued sentences play out even if the stream broke
+        speaker.finish()
+
+    metrics = {
+        "time_to_first_chunk": None if first_chunk_at is None else first_chunk_at - started_at,
+        "time_to_first_audio": speaker.time_to_first_audio,
+        "total": time.perf_counter() - started_at,
+        "sentences": speaker.sentences,
+        "cut_off": speaker.stopped,
+        "tts": speaker.report(),
+    }
+    if speaker.stopped:
+        return speaker.spoken_text(), metrics
+    return "".join(parts).strip(), metrics
@@ -0,0 +1,61 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from barge_in import BargeInDetector
+from bench_aec import CALLBACK_FRAMES, RATE, highpass, load, normalize, room_response
+from echo_canceller import EchoCanceller
+from conftest import ROOT
+
+FIXTURES = sorted(glob.glob(os.path.join(ROOT, "audio_2025*.wav")))
+
+
+def onsets(mic, ref, detector=None):
+    """Stream mic/ref through a detector in callback-sized blocks; returns the onset times (s)."""
+    detector = detector or BargeInDetector(RATE)
+    found = []
+    for i in range(0, len(mic), CALLBACK_FRAMES):
+        block = mic[i:i + CALLBACK_FRAMES, None].astype(np.float32)
+        onset = detector.process(block, arrived_at=(i + len(block)) / RATE,
+                                 reference=ref[i:i + CALLBACK_FRAMES].astype(np.float32))
+        if onset is not None:
+            found.append(onset)
+    return found
+
+
+def echo_of(ref, gain_db, seed=0):
+    rng = np.random.default_rng(seed)
+    echo = np.convolve(ref, room_response(rng, gain_db=gain_db))[:len(ref)]
+    return echo + rng.normal(0, 10 ** (-65 / 20), len(ref))
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+@pytest.mark.parametrize("gain_db", [-6, -12, -20])
+def test_echo_alone_never_starts_an_answer(path, gain_db):
+    # The recording as it was made, hum included, played by the interviewer's speaker
+    ref = normalize(load(path), -20)
+    assert onsets(echo_of(ref, gain_db), ref) == []
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_echo_alone_never_starts_an_answer_while_the_canceller_converges(path):
+    # As in clone_update5: the detector hears the output of a canceller that starts from zero
+    ref = normalize(load(path), -20)
+    mic = echo_of(ref, -6)
+    aec = EchoCanceller(RATE)
+    cancelled = np.concatenate([aec.process(mic[i:i + CALLBACK_FRAMES, None], ref[i:i + CALLBACK_FRAMES, None])
+                                for i in range(0, len(mic), CALLBACK_FRAMES)])[:, 0]
+    assert onsets(cancelled, ref) == []
+
+
+def test_candidate_over_the_echo_is_detected():
+    playback = normalize(highpass(np.concatenate([load(p) for p in FIXTURES])), -20)
+    near = normalize(highpass(load(FIXTURES[1])), -26)
+    start = 3 * RATE
+    mic = echo_of(playback, -20)
+    mic[start:start + len(near)] += near[:len(mic) - start]
+    found = onsets(mic, playback)
+    assert found and all(t >= start / RATE - 0.05 for t in found)
+    assert found[0] < start / RATE + 1.0
@@ -0,0 +1,55 @@
+import heapq
+
+import numpy as np
+
+from echo_canceller import EchoReference
+
+RATE = 16000
+WRITE_FRAMES = 320      # 20 ms output callbacks
+READ_FRAMES = 371       # Capture callbacks, as in bench_aec
+DRIFT_PPM = 200.0       # Output clock faster than the input clock
+STALL_EVERY = 2.0       # Seconds between output-callback stalls ...
+STALL_SECONDS = 0.04    # ... each longer than the prefill, so the reader underruns
+SECONDS = 20.0
+SCALE = 1e-6            # Written sample value per playback sample index
+
+
+def simulate(reference):
+    """Run output and capture callbacks on drifting clocks; returns (read index, value read) pairs."""
+    events = []
+    k = 0
+    while True:
+        at = k * WRITE_FRAMES / (RATE * (1 + DRIFT_PPM * 1e-6))
+        if at > SECONDS:
+            break
+        if at % STALL_EVERY < STALL_SECONDS:
+            at = at - at % STALL_EVERY + STALL_SECONDS  # Held back, then delivered in a burst
+        events.append((at, 0, k))
+        k += 1
+    events += [(j * READ_FRAMES / RATE, 1, j) for j in range(int(SECONDS * RATE / READ_FRAMES))]
+    heapq.heapify(events)
+
+    indices, values = [], []
+    while events:
+        _, is_read, n = heapq.heappop(events)
+        if is_read:
+            indices.append(n * READ_FRAMES + np.arange(READ_FRAMES))
+            values.append(reference.read(READ_FRAMES))
+        else:
+            first = 1000 + n * WRITE_FRAMES  # Offset so no written sample is 0 (silence)
+            reference.write(((first + np.arange(WRITE_FRAMES)) * SCALE).astype(np.float32)[:, None])
+    return np.concatenate(indices), np.concatenate(values).astype(np.float64)
+
+
+def test_reference_keeps_alignment_across_underruns_and_drift():
+    reference = EchoReference(RATE, RATE)
+    indices, values = simulate(reference)
+    assert reference.underruns > 0
+
+    settled = (indices > SECONDS / 2 * RATE) & (values != 0)  # Underruns read as silence
+    # Playback sample written at the moment each capture sample was read, on the output clock
+    written = 1000 + indices[settled] * (1 + DRIFT_PPM * 1e-6)
+    lag = written - values[settled] / SCALE
+    # ... and the one actually read trails it by the same amount throughout (uncorrected: 32 samples)
+    assert lag.max() - lag.min() < 10
+    assert abs(reference.drift_ppm - DRIFT_PPM) < 100
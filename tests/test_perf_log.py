@@ -0,0 +1,19 @@
+import os
+
+from perf_log import PerformanceSink, iter_records
+
+
+def test_unstarted_sink_flushes_and_closes_at_once(tmp_path):
+    sink = PerformanceSink(os.path.join(tmp_path, "perf.jsonl"))
+    sink.flush()
+    sink.close()
+
+
+def test_close_writes_the_last_batch(tmp_path):
+    path = os.path.join(tmp_path, "perf.jsonl")
+    sink = PerformanceSink(path, flush_interval=60)  # The batch would otherwise wait a minute
+    for turn in range(3):
+        sink.write({"turn": turn})
+    sink.close()
+    sink.close()
+    assert [r["turn"] for r in iter_records(path)] == [0, 1, 2]
@@ -0,0 +1,89 @@
+import asyncio
+import contextlib
+import time
+
+import pytest
+from google import genai
+from google.genai import errors, types
+
+from bench_resilience import MODEL, FaultProfile, start_stub
+from resilience import HEDGE_MIN_SAMPLES, CircuitBreaker, CircuitOpenError, Resilience
+
+
+@pytest.fixture
+def stub():
+    profile = FaultProfile(error_rate=0, slow_rate=0)
+    server = start_stub(profile)
+    yield profile, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def call(base_url, resilience, **kwargs):
+    """One ``Resilience.call`` of generate_content against the stub; returns the response text."""
+    async def main():
+        client = genai.Client(api_key="stub", http_options=types.HttpOptions(base_url=base_url))
+        response = await resilience.call(
+            MODEL, lambda m: client.aio.models.generate_content(model=m, contents="ping"), **kwargs)
+        return response.text
+    return asyncio.run(main())
+
+
+def test_retries_then_succeeds(stub, monkeypatch):
+    profile, url = stub
+    monkeypatch.setattr("resilience.backoff_delay", lambda retry: 0.01)
+    profile.fail_next = 2
+    entered = []
+
+    @contextlib.asynccontextmanager
+    async def slot():
+        entered.append(time.perf_counter())
+        yield
+
+    resilience = Resilience(hedging=False)
+    assert call(url, resilience, slot=slot) == "ok"
+    assert profile.requests == 3
+    assert resilience.stats["retries"] == 2
+    assert len(entered) == 3  # A slot (and rate token) per attempt
+
+
+def test_client_error_is_not_retried(stub):
+    profile, url = stub
+    profile.fail_next, profile.fail_code = 1, 400
+    resilience = Resilience(hedging=False)
+    with pytest.raises(errors.APIError):
+        call(url, resilience)
+    assert profile.requests == 1
+    assert resilience.stats["retries"] == 0
+    assert resilience.breakers[MODEL].failures == 0
+
+
+def test_breaker_opens_then_probes(stub):
+    profile, url = stub
+    resilience = Resilience(attempts=1, hedging=False)
+    breaker = resilience.breakers[MODEL] = CircuitBreaker(threshold=2, cooldown=0.3)
+    profile.outage = True
+    for _ in range(2):
+        with pytest.raises(errors.APIError):
+            call(url, resilience)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        call(url, resilience)
+    assert profile.requests == 2  # Short-circuited without reaching the API
+
+    time.sleep(0.3)
+    profile.outage = False
+    assert breaker.state == "half-open"
+    assert call(url, resilience) == "ok"
+    assert profile.requests == 3
+    assert breaker.state == "closed"
+
+
+def test_hedge_beats_a_slow_primary(stub):
+    profile, url = stub
+    resilience = Resilience()
+    resilience.latencies[MODEL, "call"].extend([0.2] * HEDGE_MIN_SAMPLES)
+    profile.slow_next = 1
+    start = time.perf_counter()
+    assert call(url, resilience, hedge=True) == "ok"
+    assert time.perf_counter() - start < profile.slow_seconds
+    assert resilience.stats["hedged"] == resilience.stats["hedge_wins"] == 1
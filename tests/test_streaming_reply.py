@@ -0,0 +1,54 @@
+from streaming_reply import stream_reply
+
+
+class FakeSpeaker:
+    """Records what it is asked to say; stops itself after ``stop_after`` sentences (a barge-in)."""
+
+    def __init__(self, stop_after=None):
+        self.said = []
+        self.stop_after = stop_after
+        self.stopped = False
+        self.sentences = 0
+        self.time_to_first_audio = None
+
+    def say(self, text):
+        self.said.append(text)
+        if self.stop_after is not None and len(self.said) >= self.stop_after:
+            self.stopped = True
+
+    def finish(self):
+        pass
+
+    def spoken_text(self):
+        return " ".join(self.said)
+
+    def report(self):
+        return {}
+
+
+def chunks(read):
+    try:
+        for text in ["Tell me about a project you led. ", "What was the hardest part of it? ",
+                     "And how did you measure success there? ", "Take your time."]:
+            read.append(text)
+            yield text
+    finally:
+        read.append("closed")
+
+
+def test_whole_reply_is_spoken_and_returned():
+    read = []
+    text, metrics = stream_reply(chunks(read), FakeSpeaker())
+    assert text.endswith("Take your time.")
+    assert not metrics["cut_off"]
+    assert read[-1] == "closed"
+
+
+def test_reading_stops_once_the_speaker_is_cut_off():
+    read = []
+    printed = []
+    text, metrics = stream_reply(chunks(read), FakeSpeaker(stop_after=1), on_text=printed.append)
+    assert metrics["cut_off"]
+    assert text == "Tell me about a project you led."
+    assert read == ["Tell me about a project you led. ", "What was the hardest part of it? ", "closed"]
+    assert len(printed) == 1
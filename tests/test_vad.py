@@ -0,0 +1,38 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from bench_codec import load_wav
+from conftest import ROOT
+from vad import trim_silence
+
+FIXTURES = sorted(glob.glob(os.path.join(ROOT, "audio_2025*.wav")))
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+@pytest.mark.parametrize("rate", [16000, 44100])
+def test_recorded_answers_keep_their_speech(path, rate):
+    pcm, _ = load_wav(path, rate)
+    trimmed = trim_silence(pcm, rate)
+    assert trimmed is not None
+    assert len(trimmed) >= 0.25 * rate
+
+
+def test_hum_alone_is_an_empty_turn():
+    rate = 16000
+    t = np.arange(5 * rate) / rate
+    rng = np.random.default_rng(0)
+    hum = 0.01 * np.sin(2 * np.pi * 122 * t) + rng.normal(0, 3e-4, len(t))
+    assert trim_silence((hum * 32767).astype(np.int16)[:, None], rate) is None
+
+
+def test_silence_around_speech_is_cut():
+    rate = 16000
+    rng = np.random.default_rng(1)
+    audio = rng.normal(0, 3e-4, 4 * rate)
+    audio[rate:2 * rate] += rng.normal(0, 0.05, rate)  # One second of loud broadband "speech"
+    trimmed = trim_silence((audio * 32767).astype(np.int16)[:, None], rate)
+    assert trimmed is not None
+    assert 1.0 <= len(trimmed) / rate <= 1.5
@@ -0,0 +1,195 @@
+import collections
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+
+# ====== CONFIG ======
+TRACING = os.environ.get("TRACING", "1") != "0"  # TRACING=0 turns every span into a no-op
+MAX_EVENTS = 100_000      # Ring buffer: the oldest spans are dropped first
+TRACE_FILE = "turn_trace.json"
+# ====================
+
+_current = contextvars.ContextVar("trace_span", default=None)
+_ids = itertools.count(1)
+
+
+class Span:
+    """One timed operation; a context manager that becomes the parent of spans opened inside it.
+
+    The parent is taken from a context variable. Spans nest within a
+    thread and across ``await``s without being passed around. For work
+    handed to another thread, see :func:`current`, :func:`attach` and
+    :func:`wrap`.
+    """
+
+    __slots__ = ("tracer", "name", "args", "id", "parent", "start_ns", "_token")
+
+    def __init__(self, tracer, name, args, parent=None):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.id = next(_ids)
+        self.parent = parent
+        self.start_ns = None
+        self._token = None
+
+    def set(self, **args):
+        """Attach extra arguments (shown in the viewer's detail pane)."""
+        self.args.update(args)
+
+    def start(self):
+        self.parent = _current.get()
+        self.start_ns = time.perf_counter_ns()
+        self._token = _current.set(self)
+        return self
+
+    def end(self):
+        self.tracer.record(self, time.perf_counter_ns())
+        _current.reset(self._token)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.end()
+
+
+class _NoSpan:
+    """Stand-in returned while tracing is disabled."""
+
+    id = None
+
+    def set(self, **args):
+        pass
+
+    def start(self):
+        return self
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class Tracer:
+    """Collects finished spans into a bounded buffer and exports Chrome trace-event JSON.
+
+    Timestamps are ``perf_counter_ns`` (monotonic). Recording a span is
+    one deque append, so tracing can stay on outside benchmarks.
+    """
+
+    def __init__(self, enabled=TRACING, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.origin_ns = time.perf_counter_ns()
+        self.events = collections.deque(maxlen=max_events)
+        self.thread_names = {}
+
+    def span(self, name, **args):
+        return Span(self, name, args) if self.enabled else NO_SPAN
+
+    def record(self, span, end_ns):
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        parent = span.parent
+        self.events.append((span.name, span.start_ns, end_ns, tid, span.id,
+                            parent.id if parent else None, span.args))
+
+    def record_interval(self, name, start_ns, end_ns, parent=None, **args):
+        """Record a span whose start was measured earlier (e.g. time spent in a queue)."""
+        if not self.enabled:
+            return
+        span = Span(self, name, args, parent)
+        span.start_ns = start_ns
+        self.record(span, end_ns)
+
+    def mark(self, name, **args):
+        """Zero-length span: a point in time such as the first streamed chunk."""
+        if self.enabled:
+            now = time.perf_counter_ns()
+            self.record_interval(name, now, now, _current.get(), **args)
+
+    def to_chrome(self):
+        """Trace-event JSON: complete ("X") events, plus flow arrows where a child runs on another thread."""
+        pid = os.getpid()
+        events = list(self.events)
+        where = {span_id: (tid, start) for _, start, _, tid, span_id, _, _ in events}
+        out = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+               for tid, name in list(self.thread_names.items())]
+
+        for name, start, end, tid, span_id, parent_id, args in events:
+            ts = (start - self.origin_ns) / 1000
+            out.append({"name": name, "ph": "X", "pid": pid, "tid": tid, "ts": ts,
+                        "dur": (end - start) / 1000,
+                        "args": dict(args, span=span_id, parent=parent_id)})
+            parent = where.get(parent_id)
+            if parent and parent[0] != tid:
+                out.append({"name": "handoff", "cat": "flow", "ph": "s", "id": span_id,
+                            "pid": pid, "tid": parent[0], "ts": ts})
+                out.append({"name": "handoff", "cat": "flow", "ph": "f", "bp": "e", "id": span_id,
+                            "pid": pid, "tid": tid, "ts": ts})
+        return {"traceEvents": out, "displayTimeUnit": "ms"}
+
+    def export(self, path=TRACE_FILE):
+        """Write the buffered spans for chrome://tracing or ui.perfetto.dev; returns the path."""
+        with open(path, "w") as f:
+            json.dump(self.to_chrome(), f)
+        return path
+
+
+tracer = Tracer()
+
+
+def span(name, **args):
+    """``with span("encode", frames=n):`` times the block under the current span."""
+    return tracer.span(name, **args)
+
+
+def mark(name, **args):
+    tracer.mark(name, **args)
+
+
+def record_interval(name, start_ns, end_ns, parent=None, **args):
+    tracer.record_interval(name, start_ns, end_ns, parent, **args)
+
+
+def current():
+    """The active span of this thread/task, to hand to another thread."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def attach(parent):
+    """Make ``parent`` (from :func:`current` on another thread) the parent of spans opened here."""
+    token = _current.set(parent)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def wrap(fn):
+    """Bind ``fn`` to the caller's current span, for use as a thread target."""
+    parent = _current.get()
+
+    def traced(*args, **kwargs):
+        with attach(parent):
+            return fn(*args, **kwargs)
+    return traced
+
+
+def export(path=TRACE_FILE):
+    return tracer.export(path)
@@ -4,7 +4,7 @@ import threading
 import gradio as gr
 import pyaudio
 import numpy as np
-from google import genai
+from gemini_pool import get_pool
 from google.genai import types
 from google.cloud import speech
 from dotenv import load_dotenv
@@ -48,11 +48,12 @@ class VoiceChatbot:
             print("Falling back to basic audio detection")
             self.use_stt = False
         
-        # Configure Gemini client
-        self.client = genai.Client(
+        # Shared Gemini client (see gemini_pool.py); Live sessions use client.aio directly
+        self.gemini = get_pool(
             http_options={"api_version": "v1beta"},
             api_key=os.environ.get("GEMINI_API_KEY"),
         )
+        self.client = self.gemini.client
         
         # Configure the session for audio responses
         self.config = types.LiveConnectConfig(
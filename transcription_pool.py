@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+
+import tracing
+
+# ====== CONFIG ======
+TRANSCRIPTION_WORKERS = 3  # Concurrent background transcriptions
+# ====================
+
+
+class TranscriptionPool:
+    """Background transcription queue drained by N worker threads.
+
+    Drop-in for the ``audio_queue``/single-worker pair: jobs are
+    ``(turn, question_index)`` tuples passed to ``put`` and handed to
+    ``handler(turn, question_index)``. Jobs finish in any order, so the
+    handler must write its result by question index. ``join`` waits for
+    every queued job, and :meth:`summary` reports queue depth and wait
+    times so a saturated pool is visible.
+    """
+
+    def __init__(self, workers=TRANSCRIPTION_WORKERS):
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._busy = 0
+        self.submitted = 0
+        self.completed = 0
+        self.saturated = 0      # Jobs that arrived with no idle worker left to take them
+        self.max_depth = 0
+        self.wait_times = []    # Seconds between put() and a worker picking the job up
+        self.service_times = []
+
+    def start(self, handler):
+        """Spawn the workers (idempotent)."""
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, args=(handler,), name=f"transcribe-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _run(self, handler):
+        while not self._stop.is_set():
+            try:
+                enqueued_at, parent, task = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            started = time.perf_counter()
+            with self._lock:
+                self._busy += 1
+                self.wait_times.append(started - enqueued_at)
+            try:
+                # The job's spans hang off the turn that queued it
+                tracing.record_interval("transcription.queued", int(enqueued_at * 1e9),
+                                        int(started * 1e9), parent)
+                with tracing.attach(parent), tracing.span("transcription.job"):
+                    handler(*task)
+            except Exception as e:
+                print(f"⚠️ [Background] Transcription worker error: {e}")
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self.completed += 1
+                    self.service_times.append(time.perf_counter() - started)
+                self._queue.task_done()
+
+    def put(self, task):
+        """Queue a ``(turn, question_index)`` job."""
+        with self._lock:
+            self.submitted += 1
+            depth = self._queue.qsize() + 1
+            self.max_depth = max(self.max_depth, depth)
+            saturated = depth > self.workers - self._busy
+            if saturated:
+                self.saturated += 1
+        self._queue.put((time.perf_counter(), tracing.current(), task))
+        if saturated:
+            print(f"⚠️ [Background] Transcription pool saturated: {depth} job(s) queued for {self.workers} workers")
+
+    def empty(self):
+        return self._queue.empty()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def join(self):
+        """Block until every queued job has been processed."""
+        self._queue.join()
+
+    def stop(self):
+        """Let workers exit once they are idle; pending jobs are left in the queue."""
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def summary(self):
+        with self._lock:
+            waits = sorted(self.wait_times)
+            services = self.service_times
+            return {
+                "workers": self.workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "saturated": self.saturated,
+                "max_depth": self.max_depth,
+                "mean_wait": sum(waits) / len(waits) if waits else 0.0,
+                "max_wait": waits[-1] if waits else 0.0,
+                "mean_service": sum(services) / len(services) if services else 0.0,
+            }
+
+    def print_summary(self):
+        s = self.summary()
+        print(f"📊 Transcription pool: {s['completed']}/{s['submitted']} done on {s['workers']} workers, "
+              f"wait mean {s['mean_wait']:.2f}s / max {s['max_wait']:.2f}s, "
+              f"max depth {s['max_depth']}, saturated {s['saturated']}x, "
+              f"transcription {s['mean_service']:.2f}s avg")
@@ -0,0 +1,144 @@
+import io
+import os
+import shutil
+import struct
+import subprocess
+
+# ====== CONFIG ======
+TTS_BACKEND = os.environ.get("TTS_BACKEND", "gtts")  # "gtts" (online) or "espeak" (offline, CPU only)
+ESPEAK_VOICE = "en-us"
+ESPEAK_WORDS_PER_MINUTE = 165
+STREAM_CHUNK_BYTES = 4096
+# ====================
+
+
+class TTSBackend:
+    """A speech synthesizer that turns text into an encoded clip in memory.
+
+    ``render(text)`` returns the complete clip (anything
+    :func:`tts_player.decode_audio` reads). ``stream(text)`` yields it in
+    pieces as they become available, which is what time-to-first-sample
+    is measured on. ``name``, ``voice`` and ``lang`` are part of the
+    :mod:`tts_cache` key, so switching backend never replays another
+    engine's audio.
+    """
+
+    name = None
+    lang = "en"
+    voice = ""
+
+    def render(self, text):
+        return b"".join(self.stream(text))
+
+    def stream(self, text):
+        yield self.render(text)
+
+    @classmethod
+    def available(cls):
+        return True
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS over the network (24 kHz mono mp3)."""
+
+    name = "gtts"
+
+    def __init__(self, lang="en", tld="com"):
+        self.lang = lang
+        self.voice = tld  # The Google domain selects the accent
+
+    def _tts(self, text):
+        from gtts import gTTS
+        return gTTS(text=text, lang=self.lang, tld=self.voice, slow=False)
+
+    def render(self, text):
+        mp3 = io.BytesIO()
+        self._tts(text).write_to_fp(mp3)
+        return mp3.getvalue()
+
+    def stream(self, text):
+        tts = self._tts(text)
+        if not hasattr(tts, "stream"):
+            yield self.render(text)
+            return
+        # One mp3 piece per <=100-char request gTTS makes
+        yield from tts.stream()
+
+    @classmethod
+    def available(cls):
+        try:
+            import gtts  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+
+def fix_wav_sizes(data):
+    """Fill in the RIFF/data sizes that a WAV streamed to a pipe leaves as placeholders."""
+    data = bytearray(data)
+    pos = data.find(b"data", 12)
+    if data[:4] != b"RIFF" or pos < 0:
+        return bytes(data)
+    struct.pack_into("<I", data, 4, len(data) - 8)
+    struct.pack_into("<I", data, pos + 4, len(data) - pos - 8)
+    return bytes(data)
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng formant synthesizer: offline, CPU only, 22.05 kHz mono WAV on stdout."""
+
+    name = "espeak"
+
+    def __init__(self, voice=ESPEAK_VOICE, words_per_minute=ESPEAK_WORDS_PER_MINUTE):
+        self.voice = voice
+        self.lang = voice.split("-")[0]
+        self.words_per_minute = words_per_minute
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def _command(self):
+        if self.binary is None:
+            raise RuntimeError("espeak-ng is not installed (apt install espeak-ng)")
+        # Text goes in on stdin: as an argument, a unit starting with "-" would be read as an option
+        return [self.binary, "--stdout", "--stdin", "-v", self.voice, "-s", str(self.words_per_minute)]
+
+    def render(self, text):
+        result = subprocess.run(self._command(), input=text.encode("utf-8"), capture_output=True, check=True)
+        return fix_wav_sizes(result.stdout)
+
+    def stream(self, text):
+        # espeak-ng writes audio as it synthesizes, so the first chunk arrives before the end of the text
+        with subprocess.Popen(self._command(), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL) as proc:
+            proc.stdin.write(text.encode("utf-8"))
+            proc.stdin.close()
+            while True:
+                chunk = proc.stdout.read1(STREAM_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+            if proc.wait():
+                raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
+    @classmethod
+    def available(cls):
+        return bool(shutil.which("espeak-ng") or shutil.which("espeak"))
+
+
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    EspeakBackend.name: EspeakBackend,
+}
+
+
+def get_backend(name=None, **kwargs):
+    """Backend by name; defaults to TTS_BACKEND (set per deployment through the environment)."""
+    name = name or TTS_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}' (choose from {', '.join(BACKENDS)})")
+    if not BACKENDS[name].available():
+        print(f"⚠️ TTS backend '{name}' is not installed here; speech will fail until it is")
+    return BACKENDS[name](**kwargs)
+
+
+def available_backends():
+    return [name for name, cls in BACKENDS.items() if cls.available()]
@@ -0,0 +1,219 @@
+import argparse
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+
+from tts_backends import get_backend, BACKENDS
+
+# ====== CONFIG ======
+CACHE_DIR = ".tts_cache"
+DISK_MAX_BYTES = 200 * 1024 * 1024   # Least recently used blobs are evicted above this
+MEMORY_MAX_BYTES = 16 * 1024 * 1024  # In-memory LRU front
+# ====================
+
+
+def normalize(text):
+    """Whitespace-insensitive form of a phrase, so reflowed prompts still hit."""
+    return " ".join(text.split())
+
+
+def cache_key(text, lang="en", voice="", engine="gtts"):
+    """Content address of a rendering: sha256 over (engine, voice, lang, text)."""
+    blob = json.dumps([engine, voice, lang, normalize(text)], ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Content-addressed store of synthesized speech, on disk with an in-memory LRU front.
+
+    Each rendering is an encoded blob named after :func:`cache_key`, so
+    the same phrase in the same voice is synthesized once across
+    sessions. The disk store is held under ``max_bytes`` by evicting the
+    least recently used blobs (hits refresh the file's mtime). Safe to use
+    from several threads; concurrent processes only ever see complete
+    files (writes go through ``os.replace``).
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=DISK_MAX_BYTES, memory_bytes=MEMORY_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.counters = collections.Counter()
+        self._memory = collections.OrderedDict()
+        self._memory_size = 0
+        self._index = {}  # key -> [size, last_used]
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _path(self, key):
+        # Blobs of any engine/format; the key already says what they are
+        return os.path.join(self.directory, key)
+
+    def _scan(self):
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            name = entry.name
+            if len(name) == 68 and name.endswith(".mp3"):
+                # Blob from before engines were pluggable (same key, extension in the name): adopt it
+                name = name[:-4]
+                try:
+                    if os.path.exists(self._path(name)):
+                        os.remove(entry.path)
+                        continue
+                    os.replace(entry.path, self._path(name))
+                except OSError:
+                    continue
+            if len(name) == 64:
+                stat = os.stat(self._path(name))
+                self._index[name] = [stat.st_size, stat.st_mtime]
+
+    @property
+    def disk_bytes(self):
+        return sum(size for size, _ in self._index.values())
+
+    def _remember(self, key, data):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= len(old)
+
+    def get(self, key):
+        """Cached bytes for ``key``, or None."""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return data
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._index.pop(key, None)
+                self.counters["misses"] += 1
+            return None
+        now = time.time()
+        try:
+            os.utime(self._path(key), (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self._index[key] = [len(data), now]
+            self._remember(key, data)
+            self.counters["disk_hits"] += 1
+        return data
+
+    def put(self, key, data):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._index[key] = [len(data), time.time()]
+            self._remember(key, data)
+            self.counters["stores"] += 1
+            self._evict()
+
+    def _evict(self):
+        total = self.disk_bytes
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            del self._index[key]
+            total -= size
+            self.counters["evictions"] += 1
+
+    def get_or_render(self, text, backend, render=None):
+        """Cached ``backend.render(text)``.
+
+        On a miss ``render()`` (default: the backend itself) produces the
+        bytes, which are stored; pass ``render`` to run the call elsewhere,
+        e.g. under the request scheduler.
+        """
+        key = cache_key(text, backend.lang, backend.voice, backend.name)
+        data = self.get(key)
+        if data is None:
+            data = render() if render else backend.render(text)
+            self.put(key, data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return dict(self.counters, entries=len(self._index), disk_bytes=self.disk_bytes,
+                        memory_entries=len(self._memory),
+                        hit_rate=hits / lookups if lookups else 0.0)
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"📊 TTS cache: {s.get('memory_hits', 0)} memory + {s.get('disk_hits', 0)} disk hits, "
+              f"{s.get('misses', 0)} misses ({s['hit_rate']:.0%}), {s['entries']} entries, "
+              f"{s['disk_bytes'] / 1024:.0f} KB on disk, {s.get('evictions', 0)} evicted")
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+            self._index.clear()
+            self._memory.clear()
+            self._memory_size = 0
+
+
+def warm(cache, phrases, backend):
+    """Pre-render ``phrases`` unit by unit, exactly as the speech pipeline will request them."""
+    from tts_pipeline import split_units
+
+    misses = cache.counters["misses"]
+    for phrase in phrases:
+        for unit in split_units(phrase):
+            cache.get_or_render(unit, backend)
+    return cache.counters["misses"] - misses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the on-disk TTS phrase cache")
+    parser.add_argument("command", choices=["warm", "stats", "clear"])
+    parser.add_argument("--dir", default=CACHE_DIR)
+    parser.add_argument("--backend", choices=list(BACKENDS), help="Engine to warm (default: TTS_BACKEND)")
+    parser.add_argument("--phrases", help="Text file with one phrase per line (default: prompt.interviewer_phrases)")
+    args = parser.parse_args()
+
+    cache = TTSCache(args.dir)
+    if args.command == "warm":
+        if args.phrases:
+            with open(args.phrases, encoding="utf-8") as f:
+                phrases = [line.strip() for line in f if line.strip()]
+        else:
+            from prompt import interviewer_phrases
+            phrases = interviewer_phrases
+        rendered = warm(cache, phrases, get_backend(args.backend))
+        print(f"🔥 Rendered {rendered} new unit(s) for {len(phrases)} phrase(s)")
+    elif args.command == "clear":
+        cache.clear()
+        print(f"🧹 Cleared {args.dir}")
+    cache.print_stats()
+
+
+if __name__ == "__main__":
+    main()
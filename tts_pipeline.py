@@ -0,0 +1,220 @@
+import queue
+import re
+import threading
+import time
+
+from streaming_reply import SentenceSplitter
+import tracing
+
+# ====== CONFIG ======
+PREFETCH_UNITS = 2        # Synthesized units allowed to wait for playback
+MAX_UNIT_CHARS = 120      # Longer sentences are cut at clause boundaries
+FIRST_UNIT_CHARS = 60     # The first unit is kept short so speech starts sooner
+# ====================
+
+# Clause break: comma, semicolon, colon or dash followed by whitespace
+CLAUSE_END = re.compile(r"[,;:–—]\s+")
+
+
+def split_clauses(sentence, max_chars=MAX_UNIT_CHARS):
+    """Cut one sentence at clause breaks into pieces of at most ``max_chars`` where possible."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+    units = []
+    start = 0
+    last_break = None
+    for match in CLAUSE_END.finditer(sentence):
+        if match.end() - start > max_chars and last_break is not None:
+            units.append(sentence[start:last_break].strip())
+            start = last_break
+        last_break = match.end()
+    if len(sentence) - start > max_chars and last_break is not None and last_break > start:
+        units.append(sentence[start:last_break].strip())
+        start = last_break
+    units.append(sentence[start:].strip())
+    return [u for u in units if u]
+
+
+def split_units(text, max_chars=MAX_UNIT_CHARS, first_chars=FIRST_UNIT_CHARS):
+    """Split any text into speakable units: sentences, and clauses of long sentences."""
+    splitter = SentenceSplitter()
+    sentences = splitter.feed(text + " ") + splitter.flush()
+    units = []
+    for sentence in sentences:
+        units.extend(split_clauses(sentence, first_chars if not units else max_chars))
+    return units
+
+
+class SpeechPipeline:
+    """Speaks text unit by unit, synthesizing unit N+1 while unit N plays.
+
+    A synthesis worker turns queued units into clips with
+    ``synthesize(text) -> (audio, rate)`` and hands them to a playback
+    worker through a queue of at most ``prefetch`` clips. Synthesis
+    therefore runs only a little ahead and little is wasted if the
+    speech is cut off. The playback worker keeps the next clip queued on
+    the :class:`~tts_player.SpeechPlayer` behind the one playing, so
+    units join without a gap whenever synthesis keeps up. :meth:`report`
+    gives per-unit synthesis time and the silence before each unit.
+    """
+
+    def __init__(self, synthesize, player, prefetch=PREFETCH_UNITS, started_at=None,
+                 max_chars=MAX_UNIT_CHARS):
+        self.synthesize = synthesize
+        self.player = player
+        self.max_chars = max_chars
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.units = []           # One stats dict per unit, in order
+        self._said = False
+        self._pending = queue.Queue()
+        self._ready = queue.Queue(maxsize=prefetch)
+        self._stopped = threading.Event()
+        self._synth = threading.Thread(target=tracing.wrap(self._synthesize_units), name="tts-synth", daemon=True)
+        self._playback = threading.Thread(target=tracing.wrap(self._play_units), name="tts-play", daemon=True)
+        self._synth.start()
+        self._playback.start()
+
+    def say(self, text):
+        """Queue text; it is cut into units, the very first of which is kept short."""
+        first_chars = self.max_chars if self._said else FIRST_UNIT_CHARS
+        self._said = True
+        for unit in split_units(text, self.max_chars, first_chars):
+            self._pending.put(unit)
+
+    def _synthesize_units(self):
+        while True:
+            unit = self._pending.get()
+            if unit is None or self._stopped.is_set():
+                self._put_ready(None)
+                return
+            start = time.perf_counter()
+            try:
+                clip = self.synthesize(unit)
+            except Exception as e:
+                print(f"⚠️ Synthesizing '{unit[:30]}' failed: {e}")
+                continue
+            stats = {"text": unit, "chars": len(unit), "synth_time": time.perf_counter() - start}
+            self._put_ready((stats, clip))
+
+    def _put_ready(self, item):
+        # Bounded: blocks while PREFETCH_UNITS clips are waiting, unless speech was stopped
+        while not self._stopped.is_set():
+            try:
+                self._ready.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _play_units(self):
+        previous = None
+        while True:
+            try:
+                item = self._ready.get(timeout=0.1)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    break
+                continue
+            if item is None or self._stopped.is_set():
+                break
+            stats, clip = item
+            stats["utterance"] = utterance = self.player.play(*clip)
+            self.units.append(stats)
+            if self._stopped.is_set():
+                # stop() ran between the check above and play(): its player.stop() missed this clip
+                self.player.cancel(utterance)
+                break
+            if previous is not None and not self._wait_played(previous):
+                break
+            previous = utterance
+        if previous is not None and self._wait_played(previous):
+            previous.wait()  # ... plus the output latency, until it has been heard
+
+    def _wait_played(self, utterance):
+        """Wait until ``utterance`` is done; False if speech was stopped first.
+
+        The next clip is already queued behind it, so there is no gap at
+        the hand-over. player.stop() happens to mark every queued clip
+        done as well; checking ``_stopped`` here means a cut never depends
+        on that.
+        """
+        while not utterance.done.wait(0.05):
+            if self._stopped.is_set():
+                return False
+        return True
+
+    def finish(self):
+        """Block until every queued unit has been spoken."""
+        self._pending.put(None)
+        self._synth.join()
+        self._playback.join()
+        for stats in self.units:
+            u = stats["utterance"]
+            if u.started_ns is not None and u.finished_ns is not None:
+                tracing.record_interval("tts.unit", u.started_ns, u.finished_ns, chars=stats["chars"])
+
+    def stop(self):
+        """Drop pending units and cut playback (e.g. when the candidate talks over the interviewer)."""
+        self._stopped.set()
+        while True:
+            try:
+                self._pending.get_nowait()
+            except queue.Empty:
+                break
+        self._pending.put(None)
+        self.player.stop()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def spoken_text(self):
+        """The units that started playing, i.e. what the listener heard (the last one perhaps only in part)."""
+        return " ".join(s["text"] for s in self.units if s["utterance"].started_at is not None)
+
+    @property
+    def sentences(self):
+        return sum(1 for s in self.units if s["utterance"].started_at is not None)
+
+    @property
+    def time_to_first_audio(self):
+        for stats in self.units:
+            if stats["utterance"].started_at is not None:
+                return stats["utterance"].started_at - self.started_at
+        return None
+
+    def report(self):
+        """Per-unit synth time, audio length and the silence before it (None for the first unit)."""
+        units = []
+        previous_end = None
+        for stats in self.units:
+            u = stats["utterance"]
+            gap = None
+            if previous_end is not None and u.started_at is not None:
+                gap = max(0.0, u.started_at - previous_end)
+            units.append({"chars": stats["chars"], "synth_time": stats["synth_time"],
+                          "audio": u.duration, "gap": gap, "cancelled": u.cancelled})
+            previous_end = u.finished_at
+        gaps = [u["gap"] for u in units if u["gap"] is not None]
+        return {
+            "units": units,
+            "time_to_first_audio": self.time_to_first_audio,
+            "max_gap": max(gaps) if gaps else 0.0,
+            "total_gap": sum(gaps),
+        }
+
+
+def speak(text, synthesize, player, started_at=None):
+    """Speak ``text`` through a pipeline and block until done; returns :meth:`SpeechPipeline.report`."""
+    pipeline = SpeechPipeline(synthesize, player, started_at=started_at)
+    pipeline.say(text)
+    pipeline.finish()
+    return pipeline.report()
+
+
+def print_report(report):
+    units = report["units"]
+    if not units:
+        return
+    synth = ", ".join(f"{u['synth_time']:.2f}s" for u in units)
+    print(f"🔊 {len(units)} unit(s), first audio {report['time_to_first_audio'] or 0:.2f}s, "
+          f"synth [{synth}], gaps max {report['max_gap']*1000:.0f}ms / total {report['total_gap']*1000:.0f}ms")
@@ -0,0 +1,178 @@
+import collections
+import io
+import threading
+import time
+
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+
+from resample import StreamingResampler
+import tracing
+
+# ====== CONFIG ======
+PLAYBACK_RATE = 24000      # gTTS returns 24 kHz mono mp3, so the common path needs no resampling
+PLAYBACK_CHANNELS = 1
+PLAYBACK_BLOCKSIZE = 480   # 20 ms per output callback
+# ====================
+
+
+def decode_audio(data):
+    """Decode an encoded clip (mp3, wav, flac, ogg) from memory; returns (float32 frames x channels, rate)."""
+    with tracing.span("decode", bytes=len(data)):
+        audio, rate = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    return audio, rate
+
+
+class Utterance:
+    """One clip queued on a :class:`SpeechPlayer`.
+
+    ``started`` is set when its first sample goes to the device and
+    ``done`` when its last one has (or when it is cancelled). :meth:`wait`
+    additionally sleeps out the device's output latency, so it returns
+    when the clip has actually been heard.
+    """
+
+    def __init__(self, audio, rate):
+        self.audio = audio
+        self.rate = rate
+        self.pos = 0
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.queued_at = time.perf_counter()
+        self.started_ns = None   # First sample handed to the device (perf_counter_ns)
+        self.finished_ns = None  # Last sample handed to the device
+        self.ends_at = None      # ... and heard, after the output latency (perf_counter)
+        self.cancelled = False
+
+    @property
+    def started_at(self):
+        return None if self.started_ns is None else self.started_ns / 1e9
+
+    @property
+    def finished_at(self):
+        return None if self.finished_ns is None else self.finished_ns / 1e9
+
+    @property
+    def duration(self):
+        return len(self.audio) / self.rate
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            return False
+        if self.ends_at is not None:
+            time.sleep(max(0.0, self.ends_at - time.perf_counter()))
+        return True
+
+
+class SpeechPlayer:
+    """Plays decoded speech clips back to back on one persistent output stream.
+
+    The stream is opened once, on first use. Its callback pulls samples
+    from a queue of :class:`Utterance`\\ s and outputs silence when the
+    queue is empty. Starting a clip costs no file I/O, mixer reload or
+    device open, and callers block on an event rather than polling. Clips
+    at another rate or channel count are converted when queued. Every
+    output block (silence included) is also written to ``reference``, if
+    given, e.g. an :class:`~echo_canceller.EchoReference`.
+    """
+
+    def __init__(self, samplerate=PLAYBACK_RATE, channels=PLAYBACK_CHANNELS, blocksize=PLAYBACK_BLOCKSIZE,
+                 reference=None):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.reference = reference
+        self.output_latency = 0.0
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        self._stream = None
+
+    def start(self):
+        """Open the output stream (idempotent)."""
+        with self._lock:
+            if self._stream is not None:
+                return
+            self._stream = sd.OutputStream(samplerate=self.samplerate, channels=self.channels,
+                                           blocksize=self.blocksize, dtype="float32",
+                                           callback=self._callback)
+            self._stream.start()
+            self.output_latency = float(getattr(self._stream, "latency", 0.0) or 0.0)
+
+    def _callback(self, outdata, frames, time_info, status):
+        filled = 0
+        now = time.perf_counter_ns()
+        with self._lock:
+            while filled < frames and self._queue:
+                utterance = self._queue[0]
+                if utterance.pos == 0:
+                    utterance.started_ns = now + filled * 1_000_000_000 // self.samplerate
+                    utterance.started.set()
+                n = min(frames - filled, len(utterance.audio) - utterance.pos)
+                outdata[filled:filled + n] = utterance.audio[utterance.pos:utterance.pos + n]
+                utterance.pos += n
+                filled += n
+                if utterance.pos >= len(utterance.audio):
+                    self._queue.popleft()
+                    utterance.finished_ns = now + filled * 1_000_000_000 // self.samplerate
+                    utterance.ends_at = utterance.finished_at + self.output_latency
+                    utterance.done.set()
+        outdata[filled:] = 0
+        if self.reference is not None:
+            self.reference.write(outdata)
+
+    def _convert(self, audio, rate):
+        audio = np.asarray(audio, dtype=np.float32)
+        if audio.ndim == 1:
+            audio = audio[:, None]
+        if audio.shape[1] != self.channels:
+            audio = np.repeat(audio.mean(axis=1, keepdims=True), self.channels, axis=1)
+        if rate != self.samplerate:
+            audio = StreamingResampler(rate, self.samplerate, self.channels).process(audio)
+        return audio
+
+    def play(self, audio, rate=None):
+        """Queue a float32 clip behind anything already playing; returns its :class:`Utterance`."""
+        self.start()
+        utterance = Utterance(self._convert(audio, rate or self.samplerate), self.samplerate)
+        with self._lock:
+            self._queue.append(utterance)
+        return utterance
+
+    def play_bytes(self, data):
+        """Decode an encoded clip from memory and queue it."""
+        return self.play(*decode_audio(data))
+
+    @property
+    def busy(self):
+        with self._lock:
+            return bool(self._queue)
+
+    def stop(self):
+        """Cut the current clip and drop the queue; returns how many clips were cancelled."""
+        with self._lock:
+            dropped = list(self._queue)
+            self._queue.clear()
+        for utterance in dropped:
+            utterance.cancelled = True
+            utterance.done.set()
+        return len(dropped)
+
+    def cancel(self, utterance):
+        """Drop one queued clip (cut it if it is playing); returns whether it was still queued."""
+        with self._lock:
+            try:
+                self._queue.remove(utterance)
+            except ValueError:
+                return False
+        utterance.cancelled = True
+        utterance.done.set()
+        return True
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
@@ -0,0 +1,37 @@
+import time
+
+from audio_codec import WavEncoder
+import tracing
+
+
+class TurnAudio:
+    """One candidate turn, encoded once and shared by every consumer.
+
+    Transcription and reply generation both read ``data``/``mime_type``
+    from the same object instead of re-opening a WAV file from disk. The
+    ``encoder`` (see :mod:`audio_codec`) decides the upload format.
+    The raw PCM is kept on disk by :class:`~session_archive.SessionArchive`,
+    whose background writer keeps it off the critical path.
+    """
+
+    def __init__(self, pcm, sample_rate, channels=1, encoder=None):
+        if encoder is None:
+            encoder = WavEncoder()
+        start = time.perf_counter()
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = len(pcm)
+        with tracing.span("encode", codec=encoder.extension, frames=self.frames):
+            self.data = encoder.encode(pcm, sample_rate, channels)
+        self.mime_type = encoder.mime_type
+        self.extension = encoder.extension
+        self.encode_time = time.perf_counter() - start
+        self.archive_ref = None  # "<session>#<turn>" once appended to a SessionArchive
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    @property
+    def size_kb(self):
+        return len(self.data) / 1024
@@ -1,81 +1,90 @@
 import gradio as gr
 import sounddevice as sd
-import numpy as np
-import wave
 import threading
-import queue
 from datetime import datetime
 from dotenv import load_dotenv
-from google import genai
-from google.genai import types
 import os
 import time
 import json
-from prompt import prompt_template
-from gtts import gTTS
-import pygame
-import tempfile
+from gemini_pool import get_pool
+from tts_player import SpeechPlayer, decode_audio, PLAYBACK_RATE
+from tts_backends import get_backend
+from tts_cache import TTSCache
+from prompt import short_welcome_message
+from tts_pipeline import SpeechPipeline
+from capture_buffer import CaptureBuffer
+from turn_audio import TurnAudio
+from audio_codec import get_encoder
+from session_archive import SessionArchive
+from vad import trim_silence
+from transcription_pool import TranscriptionPool
+from barge_in import BargeInMonitor
+from echo_canceller import EchoCanceller, EchoReference
 
 # ====== CONFIG ======
-SAMPLE_RATE = 16000  # Reduced for faster processing
+SAMPLE_RATE = 16000  # Reduced for faster processing; captured at the echo canceller's rate, no resampling
 CHANNELS = 1
 CHUNK_SIZE = 1024
 TRANSCRIPT_FILE = "interview_transcript.txt"
+UPLOAD_CODEC = "flac"  # "wav", "flac" (lossless) or "opus" (lossy, smallest)
+TRIM_SILENCE = True  # Cut silence and skip turns without speech before any model call
+ARCHIVE_TURNS = False  # Turns only live in memory; set True to archive them
+TRANSCRIPTION_WORKERS = 3  # Background transcriptions that may run at once
+BARGE_IN = True  # Talking over a question cuts it short and starts recording the answer
+ECHO_CANCEL = True  # Subtract the interviewer's own voice from the mic, so speakers don't trigger barge-in
 # ====================
 
 load_dotenv()
 
 # Global state
 is_recording = False
-recording = []
-audio_lock = threading.Lock()
+capture = CaptureBuffer(SAMPLE_RATE, CHANNELS)  # Written by audio_callback, no lock needed
 stop_threads = False
-audio_queue = queue.Queue()
+audio_queue = TranscriptionPool(TRANSCRIPTION_WORKERS)  # Results land by question index, in any order
 conversation_log = []
 conversation_lock = threading.Lock()
 current_question_index = -1
 audio_stream = None
 interview_active = False
 
-client = genai.Client()
-pygame.mixer.init()
+gemini = get_pool()  # Shared async client: one connection pool, bounded concurrency
+upload_encoder = get_encoder(UPLOAD_CODEC)
+archive = None  # One SessionArchive per interview, opened in start_interview when ARCHIVE_TURNS
+# One output stream for all speech, opened on first playback; what it plays is the reference for
+# the echo canceller and for barge-in, which must not take the interviewer's own voice for the candidate
+echo_reference = EchoReference(SAMPLE_RATE, PLAYBACK_RATE) if ECHO_CANCEL or BARGE_IN else None
+echo_canceller = EchoCanceller(SAMPLE_RATE) if ECHO_CANCEL else None
+player = SpeechPlayer(reference=echo_reference)
+tts_backend = get_backend()  # TTS_BACKEND=espeak for an offline deployment
+tts_cache = TTSCache()  # The welcome message is synthesized once across sessions
+# Listens on the (echo-cancelled) mic while a question is spoken
+barge_in = BargeInMonitor(SAMPLE_RATE, CHANNELS, enabled=BARGE_IN)
 
 # ========== TEXT-TO-SPEECH (OPTIMIZED) ==========
+def synthesize_speech(text):
+    """Render text to speech in memory (from the phrase cache when possible); returns decoded (audio, rate)."""
+    return decode_audio(tts_cache.get_or_render(text, tts_backend))
+
+
 def speak_text(text):
-    """Convert text to speech and play it - optimized."""
+    """Convert text to speech and play it - optimized. Returns what was spoken if the candidate cut it short, else None."""
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as fp:
-            temp_filename = fp.name
-        
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(temp_filename)
-        
-        pygame.mixer.music.load(temp_filename)
-        pygame.mixer.music.play()
-        
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
-        
-        pygame.mixer.music.unload()
-        os.remove(temp_filename)
+        # Next sentence is synthesized while the current one plays
+        pipeline = SpeechPipeline(synthesize_speech, player)
+        with barge_in.watch(pipeline):
+            pipeline.say(text)
+            pipeline.finish()
+        return pipeline.spoken_text() if pipeline.stopped else None
         
     except Exception as e:
         print(f"TTS Error: {e}")
+        return False
 
 # ========== GEMINI LOGIC (OPTIMIZED) ==========
-def transcribe_audio_background(filename, question_index):
+def transcribe_audio_background(turn, question_index):
     """Background transcription - faster parsing."""
     try:
-        with open(filename, "rb") as f:
-            audio_bytes = f.read()
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                prompt_template,
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        response = gemini.run_sync(gemini.transcribe(turn))
         
         text = response.text.strip()
         
@@ -108,27 +117,15 @@ def transcribe_audio_background(filename, question_index):
             
     except Exception as e:
         print(f"Transcription error: {e}")
-    finally:
-        # Clean up audio file
-        try:
-            os.remove(filename)
-        except:
-            pass
 
-def generate_response(filename, question_index):
+def generate_response(turn, question_index):
     """Generate next question - optimized. Returns question text without speaking."""
     global current_question_index
     try:
-        with open(filename, "rb") as f:
-            audio_bytes = f.read()
-
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=[
-                "Act as an interviewer for an AI/ML intern position. Ask concise, relevant questions in English. Keep responses brief and conversational.",
-                types.Part.from_bytes(data=audio_bytes, mime_type="audio/wav"),
-            ],
-        )
+        response = gemini.run_sync(gemini.reply(
+            turn,
+            prompt="Act as an interviewer for an AI/ML intern position. Ask concise, relevant questions in English. Keep responses brief and conversational.",
+        ))
 
         ai_reply = response.text.strip()
         
@@ -146,53 +143,50 @@ def generate_response(filename, question_index):
         return None
 
 # ========== AUDIO HANDLING ==========
-def save_audio(audio_data):
-    """Save audio chunks to WAV file."""
+def save_audio(audio_data, question_index=-1):
+    """Encode captured int16 frames into an in-memory turn."""
     if len(audio_data) == 0:
         return None
 
-    filename = f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
-    audio_data = np.concatenate(audio_data, axis=0)
-
-    with wave.open(filename, "wb") as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(2)
-        wf.setframerate(SAMPLE_RATE)
-        wf.writeframes((audio_data * 32767).astype(np.int16).tobytes())
+    if TRIM_SILENCE:
+        audio_data = trim_silence(audio_data, SAMPLE_RATE)
+        if audio_data is None:
+            return None
 
-    return filename
+    turn = TurnAudio(audio_data, SAMPLE_RATE, CHANNELS, encoder=upload_encoder)
+    if archive:
+        record = archive.append_turn(audio_data, question_index)
+        turn.archive_ref = archive.label(record)
+    return turn
 
 def audio_callback(indata, frames, time_info, status):
-    """Capture mic input when recording."""
-    global recording
+    """Capture mic input when recording; otherwise watch for the candidate talking over a question."""
+    # Echo cancelling runs on every block, recording or not, so it stays continuous
+    reference = echo_reference.read(len(indata)) if echo_reference else None
+    block = echo_canceller.process(indata, reference) if echo_canceller else indata
     if is_recording:
-        with audio_lock:
-            recording.append(indata.copy())
+        capture.write(block)
+        return
+    barge_in.feed(block, start_answer, reference)
 
-# ========== BACKGROUND WORKER ==========
-def background_transcription_worker():
-    """Handles transcription tasks from queue."""
-    global stop_threads
-    while not stop_threads:
-        try:
-            task = audio_queue.get(timeout=1)
-        except queue.Empty:
-            continue
-
-        filename, question_index = task
-        transcribe_audio_background(filename, question_index)
-        audio_queue.task_done()
+def start_answer(preroll):
+    """Barge-in (audio thread): record from here, including the words that cut the question off."""
+    global is_recording
+    capture.write(preroll)
+    is_recording = True
 
 # ========== UTILITIES ==========
 def save_formatted_transcript():
-    """Save conversation in readable format."""
-    with open(TRANSCRIPT_FILE, "w", encoding="utf-8") as f:
+    """Save conversation in readable format (call with conversation_lock held)."""
+    temp_file = TRANSCRIPT_FILE + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
         f.write("AI/ML INTERVIEW TRANSCRIPT\n")
         f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         f.write("=" * 60 + "\n\n")
         
         for i, entry in enumerate(conversation_log, 1):
-            f.write(f"Q{i}. INTERVIEWER:\n{entry['question']}\n\n")
+            cut = " (cut off)" if entry.get("cut_off") else ""
+            f.write(f"Q{i}. INTERVIEWER{cut}:\n{entry['question']}\n\n")
             
             if entry.get("response"):
                 f.write(f"A{i}. CANDIDATE:\n{entry['response']}\n\n")
@@ -200,6 +194,7 @@ def save_formatted_transcript():
                 f.write(f"A{i}. CANDIDATE:\n[Processing...]\n\n")
             
             f.write("-" * 60 + "\n\n")
+    os.replace(temp_file, TRANSCRIPT_FILE)
 
 def get_display_transcript():
     """Get formatted transcript for display."""
@@ -227,21 +222,23 @@ def get_display_transcript():
 # ========== GRADIO FUNCTIONS ==========
 def start_interview():
     """Initialize and start the interview."""
-    global audio_stream, stop_threads, conversation_log, current_question_index, interview_active
+    global audio_stream, stop_threads, conversation_log, current_question_index, interview_active, archive
     
     # Reset state
     stop_threads = False
     conversation_log = []
     current_question_index = -1
     interview_active = True
+    if ARCHIVE_TURNS:
+        archive = SessionArchive(sample_rate=SAMPLE_RATE, channels=CHANNELS)
     
     # Clear old transcript
     if os.path.exists(TRANSCRIPT_FILE):
         os.remove(TRANSCRIPT_FILE)
     
-    # Start background worker
-    transcription_thread = threading.Thread(target=background_transcription_worker, daemon=True)
-    transcription_thread.start()
+    # Start background workers
+    audio_queue.start(transcribe_audio_background)
+    gemini.submit(gemini.warm_up())
     
     # Start audio stream
     audio_stream = sd.InputStream(
@@ -253,10 +250,7 @@ def start_interview():
     audio_stream.start()
     
     # Get welcome message
-    welcome_message = (
-        "Hello! Welcome to your AI/ML internship interview. "
-        "Tell me about yourself and your background in AI and machine learning."
-    )
+    welcome_message = short_welcome_message
     
     with conversation_lock:
         current_question_index = 0
@@ -278,16 +272,35 @@ def start_interview():
 def speak_current_question():
     """Speak the current question that's already displayed."""
     if conversation_log and current_question_index >= 0:
-        speak_text(conversation_log[current_question_index]["question"])
-    return "✅ Question finished. Click 'Record Answer' when ready."
+        spoken = speak_text(conversation_log[current_question_index]["question"])
+        if spoken is not None:
+            # Only what was heard is the question the candidate is answering
+            with conversation_lock:
+                entry = conversation_log[current_question_index]
+                entry["question"], entry["cut_off"] = spoken, True
+            return barged_in()
+    return (
+        "✅ Question finished. Click 'Record Answer' when ready.",
+        gr.update(visible=True),   # Record button
+        gr.update(visible=False)   # Stop button
+    )
+
+def barged_in():
+    """UI state once the candidate has cut a question short: already recording."""
+    event = barge_in.events[-1]
+    return (
+        f"🔴 Recording (you started answering; playback stopped in {event['reaction']*1000:.0f} ms). "
+        "Click 'Stop Recording' when done.",
+        gr.update(visible=False),  # Record button
+        gr.update(visible=True)    # Stop button
+    )
 
 def start_recording():
     """Start recording user's answer."""
-    global is_recording, recording
+    global is_recording
     
+    capture.release()
     is_recording = True
-    with audio_lock:
-        recording = []
     
     return (
         gr.update(visible=False),  # Record button
@@ -298,26 +311,35 @@ def start_recording():
 
 def stop_recording():
     """Stop recording and process."""
-    global is_recording, recording, current_question_index
+    global is_recording, current_question_index
     
     is_recording = False
     
-    with audio_lock:
-        filename = save_audio(recording)
-        recording = []
+    audio_data = capture.snapshot()
+    turn = save_audio(audio_data, current_question_index)
+    capture.release(len(audio_data))
     
     next_question = ""
     
-    if filename:
+    if turn:
         response_question_index = current_question_index
         
         # Queue transcription
-        audio_queue.put((filename, response_question_index))
+        audio_queue.put((turn, response_question_index))
         
         # Generate next question (text only, no TTS yet)
-        next_question = generate_response(filename, response_question_index)
+        next_question = generate_response(turn, response_question_index)
         if not next_question:
             next_question = ""
+    elif conversation_log and current_question_index >= 0:
+        # No speech in the recording: re-ask the same question without any model call
+        return (
+            gr.update(visible=True),   # Record button
+            gr.update(visible=False),  # Stop button
+            get_display_transcript(),
+            "🤫 No speech detected. Listen again and re-record your answer.",
+            conversation_log[current_question_index]["question"]
+        )
     
     return (
         gr.update(visible=True),   # Record button
@@ -329,24 +351,22 @@ def stop_recording():
 
 def speak_next_question():
     """Speak the next question after it's displayed."""
-    if conversation_log and current_question_index >= 0:
-        speak_text(conversation_log[current_question_index]["question"])
-    return "✅ Question finished. Click 'Record Answer' when ready."
+    return speak_current_question()
 
 def end_interview():
     """End the interview."""
-    global is_recording, recording, stop_threads, audio_stream, interview_active
+    global is_recording, stop_threads, audio_stream, interview_active, archive
     
     interview_active = False
     is_recording = False
     
     # Save final recording if any
-    if len(recording) > 0:
-        with audio_lock:
-            filename = save_audio(recording)
-            recording = []
-        if filename and current_question_index >= 0:
-            audio_queue.put((filename, current_question_index))
+    if len(capture) > 0:
+        audio_data = capture.snapshot()
+        turn = save_audio(audio_data, current_question_index)
+        capture.release(len(audio_data))
+        if turn and current_question_index >= 0:
+            audio_queue.put((turn, current_question_index))
     
     # Stop threads
     stop_threads = True
@@ -354,6 +374,16 @@ def end_interview():
     # Wait for completion
     time.sleep(1)
     audio_queue.join()
+    audio_queue.print_summary()
+    barge_in.print_summary()
+    if echo_canceller:
+        print(f"🔁 Echo canceller: adapted on {echo_canceller.adapted}/{echo_canceller.blocks} blocks, "
+              f"{echo_canceller.divergences} reset(s), {echo_reference.underruns} reference underrun(s), "
+              f"clock drift {echo_reference.drift_ppm:+.0f} ppm")
+    if archive:
+        # Drains the writer thread: a daemon, it would drop queued turns at exit
+        archive.close()
+        archive = None
     
     # Save final transcript
     with conversation_lock:
@@ -445,7 +475,7 @@ def create_interface():
         ).then(
             # FIRST: Display text, THEN: Speak it
             fn=speak_current_question,
-            outputs=[status_box]
+            outputs=[status_box, record_btn, stop_btn]
         )
         
         record_btn.click(
@@ -459,7 +489,7 @@ def create_interface():
         ).then(
             # FIRST: Display next question, THEN: Speak it
             fn=speak_next_question,
-            outputs=[status_box]
+            outputs=[status_box, record_btn, stop_btn]
         )
         
         end_btn.click(
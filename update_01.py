@@ -5,7 +5,7 @@ import io
 import traceback
 import pyaudio
 import argparse
-from google import genai
+from gemini_pool import get_pool
 from google.genai import types
 from dotenv import load_dotenv
 load_dotenv()
@@ -29,11 +29,12 @@ class VoiceChatbot:
         self.session = None
         self.audio_stream = None
         
-        # Configure Gemini client
-        self.client = genai.Client(
+        # Shared Gemini client (see gemini_pool.py); Live sessions use client.aio directly
+        self.gemini = get_pool(
             http_options={"api_version": "v1beta"},
             api_key=os.environ.get("GEMINI_API_KEY"),
         )
+        self.client = self.gemini.client
         
         # Configure the session
         self.config = types.LiveConnectConfig(
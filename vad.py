@@ -0,0 +1,71 @@
+import numpy as np
+
+# ====== CONFIG ======
+FRAME_SECONDS = 0.02        # 20 ms analysis frames
+SPEECH_BAND_HZ = (250, 4000)  # Energy is measured here: below it sit mains hum and rumble
+ABS_THRESHOLD_DBFS = -60.0  # Anything quieter (in the speech band) is never speech
+NOISE_MARGIN_DB = 8.0       # Speech must stand this far above the turn's noise floor
+NOISE_PERCENTILE = 10       # Quietest frames of the turn estimate the noise floor
+MIN_SPEECH_SECONDS = 0.25   # Less voiced audio than this counts as an empty turn
+PAD_SECONDS = 0.2           # Keep a little context around the detected speech
+# ====================
+
+
+def band_energy_db(frames, sample_rate, band=SPEECH_BAND_HZ):
+    """Energy in dBFS of each row of a float (n_frames, frame_len) array, counting only ``band``.
+
+    Hann-windowed rFFT per frame, scaled so a full-band signal reads the
+    same as its plain mean square. Mains hum (50/60 Hz and harmonics)
+    sits below the band, so it no longer sets the noise floor.
+    """
+    frame_len = frames.shape[1]
+    window = np.hanning(frame_len).astype(np.float32)
+    spectrum = np.fft.rfft(frames * window, axis=1)
+    freqs = np.fft.rfftfreq(frame_len, 1.0 / sample_rate)
+    in_band = (freqs >= band[0]) & (freqs <= band[1])
+    power = 2.0 * (np.abs(spectrum[:, in_band]) ** 2).sum(axis=1) / (frame_len * np.dot(window, window))
+    return 10.0 * np.log10(power + 1e-10)
+
+
+def frame_energy_db(pcm, sample_rate, frame_seconds=FRAME_SECONDS):
+    """Per-frame speech-band energy in dBFS of an int16 (frames, channels) buffer.
+
+    Channels are averaged and a trailing partial frame is dropped.
+    """
+    frame_len = max(1, int(sample_rate * frame_seconds))
+    n_frames = len(pcm) // frame_len
+    if n_frames == 0:
+        return np.empty(0, dtype=np.float32)
+
+    samples = np.asarray(pcm[:n_frames * frame_len], dtype=np.float32)
+    if samples.ndim == 2:
+        samples = samples.mean(axis=1)
+    return band_energy_db(samples.reshape(n_frames, frame_len) / 32768.0, sample_rate)
+
+
+def speech_mask(energy_db):
+    """Boolean mask of frames loud enough, absolutely and relative to the noise floor."""
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = np.percentile(energy_db, NOISE_PERCENTILE)
+    threshold = max(ABS_THRESHOLD_DBFS, noise_floor + NOISE_MARGIN_DB)
+    return energy_db > threshold
+
+
+def trim_silence(pcm, sample_rate):
+    """Cut leading and trailing silence from a turn.
+
+    Returns a view of ``pcm`` spanning the detected speech (plus padding),
+    or None when the turn contains no speech worth uploading.
+    """
+    frame_len = max(1, int(sample_rate * FRAME_SECONDS))
+    voiced = speech_mask(frame_energy_db(pcm, sample_rate))
+
+    if voiced.sum() * FRAME_SECONDS < MIN_SPEECH_SECONDS:
+        return None
+
+    indices = np.flatnonzero(voiced)
+    pad = int(PAD_SECONDS * sample_rate)
+    start = max(0, indices[0] * frame_len - pad)
+    end = min(len(pcm), (indices[-1] + 1) * frame_len + pad)
+    return pcm[start:end]
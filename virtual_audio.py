@@ -0,0 +1,200 @@
+import io
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import soundfile as sf
+
+from bench_codec import load_wav
+
+# ====== CONFIG ======
+TTS_RATE = 24000             # gTTS returns 24 kHz mono mp3
+SPEECH_CHARS_PER_SECOND = 15.0  # Speaking rate assumed by the virtual TTS
+TTS_BASE_LATENCY = 0.25      # Seconds per virtual gTTS request
+TTS_LATENCY_PER_CHAR = 0.002
+# ====================
+
+
+class ClipSource:
+    """Feeds queued clips to a virtual input device, silence in between.
+
+    Clips are float32 (frames, channels) at the device rate. :meth:`play`
+    returns an Event that is set once the last frame of the clip has been
+    delivered to the capture callback.
+    """
+
+    def __init__(self, channels=1):
+        self.channels = channels
+        self._clips = []
+        self._pos = 0
+        self._lock = threading.Lock()
+
+    def play(self, clip):
+        done = threading.Event()
+        with self._lock:
+            self._clips.append((np.asarray(clip, dtype=np.float32).reshape(len(clip), -1), done))
+        return done
+
+    def read(self, frames):
+        block = np.zeros((frames, self.channels), dtype=np.float32)
+        filled = 0
+        with self._lock:
+            while filled < frames and self._clips:
+                clip, done = self._clips[0]
+                n = min(frames - filled, len(clip) - self._pos)
+                block[filled:filled + n] = clip[self._pos:self._pos + n, :self.channels]
+                filled += n
+                self._pos += n
+                if self._pos >= len(clip):
+                    self._clips.pop(0)
+                    self._pos = 0
+                    done.set()
+        return block
+
+
+def load_clip(path, device_rate, channels=1):
+    """Read a WAV file as float32 frames at ``device_rate``, mixed to ``channels``."""
+    pcm, file_channels = load_wav(path, device_rate)
+    audio = pcm.astype(np.float32) / 32767
+    if file_channels != channels:
+        audio = np.repeat(audio.mean(axis=1, keepdims=True), channels, axis=1)
+    return audio
+
+
+class VirtualInputStream:
+    """Stand-in for ``sounddevice.InputStream`` that plays a ClipSource in (scaled) real time."""
+
+    def __init__(self, source, speed=1.0, samplerate=None, channels=1, blocksize=1024,
+                 callback=None, **kwargs):
+        self.source = source
+        self.speed = speed
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize or 1024
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        period = self.blocksize / self.samplerate / self.speed
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            block = self.source.read(self.blocksize)
+            if self.callback:
+                self.callback(block, self.blocksize, None, None)
+            next_tick += period
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="virtual-mic", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def close(self):
+        self.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class VirtualOutputStream:
+    """Stand-in for ``sounddevice.OutputStream``: pulls callback blocks in (scaled) real time.
+
+    ``on_play()`` is called whenever sound starts after silence, which is
+    the moment a listener would hear the interviewer begin speaking.
+    """
+
+    latency = 0.0
+
+    def __init__(self, speed=1.0, on_play=None, samplerate=None, channels=1, blocksize=1024,
+                 dtype="float32", callback=None, **kwargs):
+        self.speed = speed
+        self.on_play = on_play
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize or 1024
+        self.callback = callback
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        period = self.blocksize / self.samplerate / self.speed
+        next_tick = time.perf_counter()
+        sounding = False
+        while not self._stop.is_set():
+            block = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+            if self.callback:
+                self.callback(block, self.blocksize, None, None)
+            audible = bool(np.any(block))
+            if audible and not sounding and self.on_play:
+                self.on_play()
+            sounding = audible
+            next_tick += period
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="virtual-speaker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def close(self):
+        self.stop()
+
+
+class VirtualTTS:
+    """``gtts.gTTS`` stand-in with modelled latency; returns a real mp3 of a quiet tone."""
+
+    def __init__(self, text, lang="en", slow=False, **kwargs):
+        self.text = text
+
+    def _payload(self):
+        started = time.perf_counter()
+        seconds = max(0.2, len(self.text) / SPEECH_CHARS_PER_SECOND)
+        t = np.arange(int(seconds * TTS_RATE)) / TTS_RATE
+        buf = io.BytesIO()
+        sf.write(buf, (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32), TTS_RATE, format="MP3")
+        latency = TTS_BASE_LATENCY + TTS_LATENCY_PER_CHAR * len(self.text)
+        time.sleep(max(0.0, latency - (time.perf_counter() - started)))
+        return buf.getvalue()
+
+    def save(self, filename):
+        with open(filename, "wb") as f:
+            f.write(self._payload())
+
+    def write_to_fp(self, fp):
+        fp.write(self._payload())
+
+
+def install(source, speed=1.0, on_play=None, virtual_tts=True):
+    """Register a virtual ``sounddevice`` module (and optionally ``gtts``).
+
+    Must run before the pipeline script is imported. Returns the modules.
+    """
+    sd = types.ModuleType("sounddevice")
+    sd.InputStream = lambda *args, **kwargs: VirtualInputStream(source, speed, *args, **kwargs)
+    sd.OutputStream = lambda *args, **kwargs: VirtualOutputStream(speed, on_play, *args, **kwargs)
+    sd.sleep = lambda ms: time.sleep(ms / 1000 / speed)
+
+    modules = {"sounddevice": sd}
+    if virtual_tts:
+        gtts = types.ModuleType("gtts")
+        gtts.gTTS = VirtualTTS
+        modules["gtts"] = gtts
+    sys.modules.update(modules)
+    return modules